@@ -19,3 +19,11 @@
 # If not, see <http://opensource.org/licenses/MIT>.
 #
 from kado.store._store import *
+from kado.store._manifest import *
+from kado.store._index import *
+from kado.store._journal import *
+from kado.store._pack import *
+from kado.store._cache import *
+from kado.store._prefetch import *
+from kado.store._batch import *
+from kado.store._bundle import *
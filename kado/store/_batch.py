@@ -0,0 +1,186 @@
+# kado/store/_batch.py
+# ====================
+#
+# Copying
+# -------
+#
+# Copyright (c) 2018 kado authors.
+#
+# This file is part of the *kado* project.
+#
+# kado is a free software project. You can redistribute it and/or
+# modify if under the terms of the MIT License.
+#
+# This software project is distributed *as is*, WITHOUT WARRANTY OF ANY
+# KIND; including but not limited to the WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE and NONINFRINGEMENT.
+#
+# You should have received a copy of the MIT License along with kado.
+# If not, see <http://opensource.org/licenses/MIT>.
+#
+import time
+import threading
+
+from concurrent.futures import Future
+
+
+__all__ = [
+    'BatchWriter',
+]
+
+
+class BatchWriter(object):
+    """Collect the chunks stored by many threads and write them in batches,
+    each batch being made durable with a single flush of the store.
+
+    A batch is written once it is large enough or once its first chunk has
+    waited long enough, a chunk being durable when its storage returns.
+
+
+    :param store: Chunk store with a ``put_many`` method storing a batch of
+                  chunks and a ``flush`` method making them durable, such as a
+                  :class:`~kado.store._pack.PackStore`. The batch writer must
+                  be the only writer of the store.
+
+    :param max_delay: Maximum number of seconds a chunk waits for its batch to
+                      be written.
+    :type max_delay: python:float
+
+    :param max_bytes: Size of the chunks' payload above which a batch is
+                      written without waiting.
+    :type max_bytes: python:int
+
+    """
+    __slots__ = (
+        '_closed', '_cond', '_pending', '_pending_bytes', '_thread', 'batches',
+        'max_bytes', 'max_delay', 'store',
+    )
+
+
+    def __init__(self, store, max_delay=0.005, max_bytes=4 << 20):
+        """Constructor for :class:`kado.store.BatchWriter`."""
+        self.store = store
+        self.max_delay = max_delay
+        self.max_bytes = max_bytes
+        self.batches = 0
+
+        self._closed = False
+        self._cond = threading.Condition()
+        self._pending = []
+        self._pending_bytes = 0
+
+        self._thread = threading.Thread(
+            target=self._run, name='kado-batch-writer', daemon=True
+        )
+        self._thread.start()
+
+
+    def __enter__(self):
+        """Enter the runtime context of the batch writer."""
+        return self
+
+
+    def __exit__(self, *exc_info):
+        """Close the batch writer when leaving its runtime context."""
+        self.close()
+
+
+    def close(self):
+        """Write the pending chunks and stop the writing thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+        self._thread.join()
+
+
+    def put(self, chunk):
+        """Store a chunk, waiting for its batch to be durable.
+
+
+        :param chunk: The chunk to be stored.
+        :type chunk: ~kado.store._store.Chunk
+
+
+        :returns: The value returned by the store for the chunk.
+
+
+        :raises ValueError: When the batch writer is closed.
+
+        """
+        return self.submit(chunk).result()
+
+
+    def submit(self, chunk):
+        """Schedule a chunk to be stored with the next batch.
+
+
+        :param chunk: The chunk to be stored.
+        :type chunk: ~kado.store._store.Chunk
+
+
+        :returns: A future resolved with the value returned by the store for
+                  the chunk once its batch is durable.
+        :rtype: ~concurrent.futures.Future
+
+
+        :raises ValueError: When the batch writer is closed.
+
+        """
+        future = Future()
+
+        with self._cond:
+            if self._closed:
+                raise ValueError('batch writer is closed.')
+
+            self._pending.append((chunk, future))
+            self._pending_bytes += len(chunk)
+            if len(self._pending) == 1 or self._pending_bytes >= self.max_bytes:
+                self._cond.notify()
+
+        return future
+
+
+    def _run(self):
+        """Write the pending chunks in batches until closed."""
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+
+                # Give other chunks a chance to join the batch.
+                deadline = time.monotonic() + self.max_delay
+                while not self._closed and self._pending_bytes < self.max_bytes:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    self._cond.wait(timeout)
+
+                batch, self._pending = self._pending, []
+                self._pending_bytes = 0
+
+                if not batch and self._closed:
+                    return
+
+            self._write(batch)
+
+
+    def _write(self, batch):
+        """Store a batch of chunks and resolve their futures.
+
+
+        :param batch: The chunks along their futures.
+        :type batch: ~typing.List[~typing.Tuple]
+
+        """
+        try:
+            results = self.store.put_many([chunk for chunk, _ in batch])
+            self.store.flush()
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+        else:
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+        finally:
+            self.batches += 1
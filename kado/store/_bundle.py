@@ -0,0 +1,428 @@
+# kado/store/_bundle.py
+# =====================
+#
+# Copying
+# -------
+#
+# Copyright (c) 2018 kado authors.
+#
+# This file is part of the *kado* project.
+#
+# kado is a free software project. You can redistribute it and/or
+# modify if under the terms of the MIT License.
+#
+# This software project is distributed *as is*, WITHOUT WARRANTY OF ANY
+# KIND; including but not limited to the WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE and NONINFRINGEMENT.
+#
+# You should have received a copy of the MIT License along with kado.
+# If not, see <http://opensource.org/licenses/MIT>.
+#
+import uuid
+import struct
+
+from collections import namedtuple
+
+from kado import constants as c
+from kado.store._store import Chunk, Index
+
+
+__all__ = [
+    'Bundle',
+    'BundleStore',
+    'Slice',
+]
+
+
+#: Magic bytes identifying bundle payloads.
+_MAGIC = b'KADOBND1'
+#: Bundle header: magic and number of bundled chunks.
+_HEADER = struct.Struct('<8sQ')
+#: Bundle table entry: chunk identifier, payload offset and length.
+_ENTRY = struct.Struct('<16sQQ')
+
+
+#: Position of a small chunk's payload within a bundle chunk.
+Slice = namedtuple('Slice', ['blob', 'offset', 'length'])
+
+
+class Bundle(object):
+    """Builder of a chunk bundling the payload of many small chunks.
+
+    The bundle payload starts with a table giving the identifier, offset and
+    length of each bundled chunk, followed by their payloads.
+
+
+    :param max_size: Maximum size of the bundle payload.
+    :type max_size: python:int
+
+    """
+    __slots__ = ('_chunks', '_size', 'max_size')
+
+
+    def __init__(self, max_size=c.GHASH_CHUNK_HI):
+        """Constructor for :class:`kado.store.Bundle`."""
+        self.max_size = max_size
+
+        self._chunks = {}
+        self._size = _HEADER.size
+
+
+    def __contains__(self, key):
+        """Check if a chunk is bundled.
+
+
+        :param key: Identifier of the chunk.
+        :type key: ~uuid.UUID
+
+
+        :returns: Whether the chunk is bundled.
+        :rtype: python:bool
+
+        """
+        return key in self._chunks
+
+
+    def __len__(self):
+        """Return the number of bundled chunks.
+
+
+        :returns: Number of bundled chunks.
+        :rtype: python:int
+
+        """
+        return len(self._chunks)
+
+
+    @property
+    def size(self):
+        """Get the size of the bundle payload."""
+        return self._size
+
+
+    @staticmethod
+    def table(data):
+        """Read the table of a bundle payload.
+
+
+        :param data: The bundle payload.
+        :type data: python:bytes
+
+
+        :returns: The identifier of each bundled chunk, along the offset and
+                  length of its payload.
+        :rtype: ~typing.List[~typing.Tuple[~uuid.UUID, python:int, python:int]]
+
+
+        :raises ValueError: When data is not a bundle payload.
+
+        """
+        view = memoryview(data).cast('B')
+        try:
+            magic, count = _HEADER.unpack_from(view)
+        except struct.error:
+            raise ValueError('truncated bundle header.') from None
+
+        if magic != _MAGIC:
+            raise ValueError('invalid bundle magic: {!r}.'.format(magic))
+
+        table = []
+        for i in range(count):
+            try:
+                key, offset, length = _ENTRY.unpack_from(
+                    view, _HEADER.size + i * _ENTRY.size
+                )
+            except struct.error:
+                raise ValueError('truncated bundle table.') from None
+
+            if offset + length > len(view):
+                raise ValueError('invalid bundle entry: {}.'.format(i))
+            table.append((uuid.UUID(bytes=key), offset, length))
+
+        return table
+
+
+    def add(self, chunk):
+        """Add a chunk to the bundle.
+
+
+        :param chunk: The chunk to be bundled.
+        :type chunk: ~kado.store._store.Chunk
+
+
+        :returns: Whether the chunk is bundled, ``False`` when the bundle is
+                  full.
+        :rtype: python:bool
+
+        """
+        key = chunk.id
+        if key in self._chunks:
+            return True
+
+        size = _ENTRY.size + len(chunk)
+        if self._chunks and self._size + size > self.max_size:
+            return False
+
+        self._chunks[key] = chunk
+        self._size += size
+
+        return True
+
+
+    def get(self, key):
+        """Get the payload of a bundled chunk.
+
+
+        :param key: Identifier of the chunk.
+        :type key: ~uuid.UUID
+
+
+        :returns: The chunk's payload.
+        :rtype: python:bytes
+
+
+        :raises KeyError: When the chunk is not bundled.
+
+        """
+        return self._chunks[key].data
+
+
+    def seal(self):
+        """Build the bundle chunk.
+
+
+        :returns: The bundle chunk, along the slice of each bundled chunk's
+                  payload within it.
+        :rtype: ~typing.Tuple[~kado.store._store.Chunk, python:dict]
+
+        """
+        offset = _HEADER.size + len(self._chunks) * _ENTRY.size
+        parts = [_HEADER.pack(_MAGIC, len(self._chunks))]
+        payloads = []
+        slices = {}
+
+        for key, chunk in self._chunks.items():
+            view = chunk.view()
+            parts.append(_ENTRY.pack(key.bytes, offset, len(view)))
+            payloads.append(view)
+
+            slices[key] = (offset, len(view))
+            offset += len(view)
+
+        blob = Chunk(b''.join(parts + payloads))
+        return blob, {
+            key: Slice(blob.id, offset, length)
+            for key, (offset, length) in slices.items()
+        }
+
+
+class BundleStore(object):
+    """Chunk store bundling small chunks before storing them into another
+    store.
+
+    Chunks up to ``GHASH_CHUNK_LO`` bytes, such as the single chunk of small
+    items, are gathered into bundles, each stored as a single chunk of the
+    underlying store. Small chunks keep their own identifier, their payload
+    being sliced out of their bundle when read.
+
+    The slices of the bundled chunks are recorded into an index once their
+    bundle was flushed to the underlying store. A persistent index, such as
+    :class:`~kado.store._journal.JournaledIndex`, finds them back when the
+    store is reopened without reading any bundle. Bundles stored but not
+    flushed before a crash are left unreferenced, their chunks being bundled
+    again.
+
+
+    :param store: Chunk store, with a ``put`` method storing a chunk and a
+                  ``get`` method returning a chunk's payload.
+
+    :param max_size: Maximum size of the bundles' payload.
+    :type max_size: python:int
+
+    :param blobs: Identifiers of bundles already stored, as given by
+                  :meth:`~kado.store._bundle.BundleStore.blobs`, to find back
+                  their chunks.
+    :type blobs: ~collections.abc.Iterable
+
+    :param slices: Index of the bundled chunks' slice, committed when the
+                   store is flushed if it has a ``commit`` method. A new
+                   :class:`~kado.store._store.Index` is used when not given.
+
+    """
+    __slots__ = ('_bundle', '_pending', 'max_size', 'slices', 'store')
+
+    #: Size up to which chunks are bundled.
+    SMALL_SIZE = c.GHASH_CHUNK_LO
+
+
+    def __init__(self, store, max_size=c.GHASH_CHUNK_HI, blobs=(),
+                 slices=None):
+        """Constructor for :class:`kado.store.BundleStore`."""
+        self.store = store
+        self.max_size = max_size
+        self.slices = Index() if slices is None else slices
+
+        self._bundle = Bundle(max_size)
+        # Slices of the stored bundles, until the underlying store is flushed.
+        self._pending = {}
+        for blob in blobs:
+            self.register(blob)
+
+
+    def __contains__(self, key):
+        """Check if a chunk is stored.
+
+
+        :param key: Identifier of the chunk.
+        :type key: ~uuid.UUID
+
+
+        :returns: Whether the chunk is stored, bundled or not.
+        :rtype: python:bool
+
+        """
+        return (
+            key in self._bundle or key in self._pending or key in self.slices
+            or key in self.store
+        )
+
+
+    def __enter__(self):
+        """Enter the runtime context of the store."""
+        return self
+
+
+    def __exit__(self, *exc_info):
+        """Close the store when leaving its runtime context."""
+        self.close()
+
+
+    def blobs(self):
+        """Get the identifiers of the stored bundles.
+
+
+        :returns: The bundles' identifier.
+        :rtype: python:set
+
+        """
+        blobs = {loc.blob for loc in self._pending.values()}
+        blobs.update(
+            loc.blob for key in self.slices for loc in self.slices.view(key)
+        )
+        return blobs
+
+
+    def close(self):
+        """Store the pending small chunks, the underlying store and the slices
+        index being left open.
+
+        """
+        self.flush()
+
+
+    def flush(self):
+        """Store the current bundle, then flush the underlying store if it
+        can be and record the slices of the stored bundles.
+
+        """
+        self._bundle_put()
+        if hasattr(self.store, 'flush'):
+            self.store.flush()
+
+        if self._pending:
+            self.slices.add_many(self._pending.items())
+            self._pending.clear()
+        if hasattr(self.slices, 'commit'):
+            self.slices.commit()
+
+
+    def get(self, key):
+        """Read a chunk's payload.
+
+
+        :param key: Identifier of the chunk, or slice of a bundle.
+        :type key: ~uuid.UUID or ~kado.store._bundle.Slice
+
+
+        :returns: The chunk's payload.
+        :rtype: python:bytes
+
+
+        :raises KeyError: When the chunk is not stored.
+
+        """
+        if isinstance(key, Slice):
+            loc = key
+        elif key in self._bundle:
+            return self._bundle.get(key)
+        elif key in self._pending:
+            loc = self._pending[key]
+        elif key in self.slices:
+            loc = next(self.slices.itervalues(key))
+        else:
+            return self.store.get(key)
+
+        data = memoryview(self.store.get(loc.blob))
+        return data[loc.offset:loc.offset + loc.length].tobytes()
+
+
+    def put(self, chunk):
+        """Store a chunk, bundling it if small.
+
+        Bundled chunks are stored along their bundle, once full or once the
+        store is flushed.
+
+
+        :param chunk: The chunk to be stored.
+        :type chunk: ~kado.store._store.Chunk
+
+
+        :returns: The value returned by the underlying store for chunks which
+                  are not bundled, ``None`` for bundled chunks as the bundle
+                  holding them is not stored yet. Their slice is given by
+                  :attr:`slices` once the store is flushed.
+
+        """
+        if len(chunk) > self.SMALL_SIZE:
+            return self.store.put(chunk)
+
+        key = chunk.id
+        if key in self._pending or key in self.slices:
+            return None
+
+        if not self._bundle.add(chunk):
+            self._bundle_put()
+            self._bundle.add(chunk)
+
+        return None
+
+
+    def register(self, blob):
+        """Find back the chunks of a stored bundle.
+
+
+        :param blob: Identifier of the bundle chunk.
+        :type blob: ~uuid.UUID
+
+
+        :raises KeyError: When the bundle is not stored.
+
+        :raises ValueError: When the chunk is not a bundle.
+
+        """
+        self.slices.add_many(
+            (key, Slice(blob, offset, length))
+            for key, offset, length in Bundle.table(self.store.get(blob))
+        )
+
+
+    def _bundle_put(self):
+        """Store the current bundle and start a new one."""
+        if not len(self._bundle):
+            return
+
+        blob, slices = self._bundle.seal()
+        self.store.put(blob)
+        self._pending.update(slices)
+
+        self._bundle = Bundle(self.max_size)
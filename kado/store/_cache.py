@@ -0,0 +1,367 @@
+# kado/store/_cache.py
+# ====================
+#
+# Copying
+# -------
+#
+# Copyright (c) 2018 kado authors.
+#
+# This file is part of the *kado* project.
+#
+# kado is a free software project. You can redistribute it and/or
+# modify if under the terms of the MIT License.
+#
+# This software project is distributed *as is*, WITHOUT WARRANTY OF ANY
+# KIND; including but not limited to the WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE and NONINFRINGEMENT.
+#
+# You should have received a copy of the MIT License along with kado.
+# If not, see <http://opensource.org/licenses/MIT>.
+#
+import array
+import threading
+
+from collections import OrderedDict
+
+
+__all__ = [
+    'ChunkCache',
+    'LRUPolicy',
+    'TinyLFUPolicy',
+]
+
+
+class LRUPolicy(object):
+    """Cache policy admitting every payload, the least recently used payloads
+    being evicted to make room for it.
+
+    """
+    __slots__ = ()
+
+
+    def record(self, key):
+        """Record an access to a cache key.
+
+
+        :param key: The accessed key.
+        :type key: ~collections.abc.Hashable
+
+        """
+
+
+    def admit(self, key, victims):
+        """Check if a payload should be cached at the expense of others.
+
+
+        :param key: Key of the payload to be cached.
+        :type key: ~collections.abc.Hashable
+
+        :param victims: Keys of the payloads to be evicted for it.
+        :type victims: ~collections.abc.Sequence
+
+
+        :returns: Whether the payload should be cached.
+        :rtype: python:bool
+
+        """
+        return True
+
+
+class TinyLFUPolicy(LRUPolicy):
+    """Cache policy admitting a payload only if it is accessed more frequently
+    than the payloads it would evict.
+
+    Access frequencies are estimated from a count-min sketch of small
+    counters, halved periodically so that the estimates follow recent
+    accesses.
+
+
+    :param width: Number of counters of each row of the sketch, rounded up to
+                  a power of two.
+    :type width: python:int
+
+    """
+    __slots__ = ('_additions', '_mask', '_rows', 'sample_size')
+
+    #: Number of rows of the sketch.
+    DEPTH = 4
+    #: Maximum value of a counter.
+    COUNTER_MAX = 15
+
+
+    def __init__(self, width=1 << 16):
+        """Constructor for :class:`kado.store.TinyLFUPolicy`."""
+        size = 1
+        while size < width:
+            size <<= 1
+
+        self._additions = 0
+        self._mask = size - 1
+        self._rows = [array.array('B', bytes(size)) for _ in range(self.DEPTH)]
+        self.sample_size = 10 * size
+
+
+    def record(self, key):
+        """Record an access to a cache key.
+
+
+        :param key: The accessed key.
+        :type key: ~collections.abc.Hashable
+
+        """
+        for row, i in zip(self._rows, self._slots(key)):
+            if row[i] < self.COUNTER_MAX:
+                row[i] += 1
+
+        self._additions += 1
+        if self._additions >= self.sample_size:
+            self._reset()
+
+
+    def admit(self, key, victims):
+        """Check if a payload should be cached at the expense of others.
+
+
+        :param key: Key of the payload to be cached.
+        :type key: ~collections.abc.Hashable
+
+        :param victims: Keys of the payloads to be evicted for it.
+        :type victims: ~collections.abc.Sequence
+
+
+        :returns: Whether the payload is estimated to be more frequently
+                  accessed than each of the victims.
+        :rtype: python:bool
+
+        """
+        freq = self.frequency(key)
+        return all(freq > self.frequency(x) for x in victims)
+
+
+    def frequency(self, key):
+        """Estimate the access frequency of a cache key.
+
+
+        :param key: The cache key.
+        :type key: ~collections.abc.Hashable
+
+
+        :returns: The estimated number of recent accesses.
+        :rtype: python:int
+
+        """
+        return min(row[i] for row, i in zip(self._rows, self._slots(key)))
+
+
+    def _reset(self):
+        """Halve all the counters of the sketch."""
+        for row in self._rows:
+            for i, value in enumerate(row):
+                if value:
+                    row[i] = value >> 1
+
+        self._additions //= 2
+
+
+    def _slots(self, key):
+        """Get the counter of each row of the sketch for a key.
+
+
+        :param key: The cache key.
+        :type key: ~collections.abc.Hashable
+
+
+        :returns: The counter indexes, one for each row.
+        :rtype: ~typing.List[python:int]
+
+        """
+        h = hash(key)
+        step = (h >> 16) | 1
+        return [(h + i * step) & self._mask for i in range(self.DEPTH)]
+
+
+class ChunkCache(object):
+    """Thread-safe cache of chunks' payload in front of a chunk store,
+    bounded by the total size of the cached payloads.
+
+    Payloads are evicted in least recently used order, the policy deciding
+    whether a new payload is worth the ones it would evict.
+
+
+    :param store: Chunk store, any object with a ``get`` method returning a
+                  chunk's payload from its identifier.
+
+    :param size: Maximum size of the cached payloads in bytes.
+    :type size: python:int
+
+    :param policy: Cache admission policy, a
+                   :class:`~kado.store._cache.LRUPolicy` by default.
+    :type policy: ~kado.store._cache.LRUPolicy
+
+    """
+    __slots__ = (
+        '_entries', '_lock', '_size', 'evictions', 'hits', 'maxsize',
+        'misses', 'policy', 'store',
+    )
+
+
+    def __init__(self, store, size=64 << 20, policy=None):
+        """Constructor for :class:`kado.store.ChunkCache`."""
+        self.store = store
+        self.maxsize = size
+        self.policy = LRUPolicy() if policy is None else policy
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._size = 0
+
+        self.evictions = 0
+        self.hits = 0
+        self.misses = 0
+
+
+    def __contains__(self, key):
+        """Check if a chunk's payload is cached.
+
+
+        :param key: Identifier of the chunk.
+        :type key: ~collections.abc.Hashable
+
+
+        :returns: Whether the payload is cached.
+        :rtype: python:bool
+
+        """
+        with self._lock:
+            return key in self._entries
+
+
+    def __len__(self):
+        """Return the number of cached payloads.
+
+
+        :returns: Number of cached payloads.
+        :rtype: python:int
+
+        """
+        with self._lock:
+            return len(self._entries)
+
+
+    @property
+    def size(self):
+        """Get the total size of the cached payloads."""
+        return self._size
+
+
+    def clear(self):
+        """Remove all payloads from the cache."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+    def discard(self, key):
+        """Remove a chunk's payload from the cache if present.
+
+
+        :param key: Identifier of the chunk.
+        :type key: ~collections.abc.Hashable
+
+        """
+        with self._lock:
+            data = self._entries.pop(key, None)
+            if data is not None:
+                self._size -= len(data)
+
+
+    def get(self, key):
+        """Get a chunk's payload, from the cache if present else from the
+        store.
+
+
+        :param key: Identifier of the chunk.
+        :type key: ~collections.abc.Hashable
+
+
+        :returns: The chunk's payload.
+        :rtype: python:bytes
+
+
+        :raises KeyError: When the chunk is not stored.
+
+        """
+        with self._lock:
+            self.policy.record(key)
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+
+            self.misses += 1
+
+        # The store is not queried with the lock held.
+        data = self.store.get(key)
+        self._insert(key, data)
+
+        return data
+
+
+    def stats(self):
+        """Get the cache counters.
+
+
+        :returns: The number of hits, misses and evictions, along the number
+                  and size of the cached payloads.
+        :rtype: python:dict
+
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'count': len(self._entries),
+                'size': self._size,
+            }
+
+
+    def _insert(self, key, data):
+        """Cache a payload if admitted by the policy.
+
+
+        :param key: Identifier of the chunk.
+        :type key: ~collections.abc.Hashable
+
+        :param data: The chunk's payload.
+        :type data: python:bytes
+
+        """
+        size = len(data)
+        if size > self.maxsize:
+            return
+
+        with self._lock:
+            entries = self._entries
+            if key in entries:
+                return
+
+            # Least recently used payloads to be evicted.
+            victims = []
+            excess = self._size + size - self.maxsize
+            it = iter(entries.items())
+            while excess > 0:
+                victim, payload = next(it)
+                victims.append(victim)
+                excess -= len(payload)
+
+            if victims and not self.policy.admit(key, victims):
+                return
+
+            for victim in victims:
+                self._size -= len(entries.pop(victim))
+            self.evictions += len(victims)
+
+            entries[key] = data
+            self._size += size
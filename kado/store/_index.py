@@ -0,0 +1,2461 @@
+# kado/store/_index.py
+# ====================
+#
+# Copying
+# -------
+#
+# Copyright (c) 2018 kado authors.
+#
+# This file is part of the *kado* project.
+#
+# kado is a free software project. You can redistribute it and/or
+# modify if under the terms of the MIT License.
+#
+# This software project is distributed *as is*, WITHOUT WARRANTY OF ANY
+# KIND; including but not limited to the WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE and NONINFRINGEMENT.
+#
+# You should have received a copy of the MIT License along with kado.
+# If not, see <http://opensource.org/licenses/MIT>.
+#
+import io
+import os
+import mmap
+import zlib
+import uuid
+import array
+import struct
+import threading
+
+from bisect import bisect_left, bisect_right, insort
+from contextlib import suppress
+from itertools import chain, takewhile
+
+import xxhash
+
+from kado import constants as c
+from kado.store._store import Index
+from kado.store._journal import _fsync_dir
+from kado.utils.bloom import BloomFilter
+
+
+__all__ = [
+    'CompactIndex',
+    'DiskIndex',
+    'FilteredIndex',
+    'OrderedIndex',
+    'RefIndex',
+    'ShardedIndex',
+]
+
+
+#: Array type codes of unsigned integers by size in bytes.
+_TYPECODES = {array.array(x).itemsize: x for x in 'QLIHB'}
+
+#: Slot states of open addressing tables.
+_EMPTY, _USED, _DELETED = 0, 1, 2
+
+#: Magic bytes identifying index files.
+_DISK_MAGIC = b'KADOIDX1'
+#: Index file header: magic, sequence number, key size, number of buckets,
+#: end of the used area, number of entries and number of keys.
+_DISK_HEADER = struct.Struct('<8sQQQQQQ')
+#: Checksum following the index file header.
+_DISK_CRC = struct.Struct('<I')
+#: Size reserved to each of the two copies of the index file header.
+_DISK_HEADER_SIZE = 64
+#: Offset to the first bucket of index files.
+_DISK_DATA = 2 * _DISK_HEADER_SIZE
+#: Offset to the next bucket of an overflow chain.
+_DISK_NEXT = struct.Struct('<Q')
+
+
+class CompactIndex(object):
+    """Index specialized for fixed-size binary keys and unsigned integer
+    values, with the same interface as :class:`~kado.store._store.Index`.
+
+    Entries are kept in an open addressing table made of flat arrays, each
+    entry costing its key and value size plus one byte, instead of Python
+    objects for each key, value and set.
+
+    Keys are bytes-like objects or :class:`~uuid.UUID`, such as chunk
+    identifiers, stored and iterated over in their binary form.
+
+
+    :param key_size: Size of the keys in bytes.
+    :type key_size: python:int
+
+    :param value_size: Size of the values in bytes, one of 1, 2, 4 or 8.
+    :type value_size: python:int
+
+    :param capacity: Number of entries to make room for.
+    :type capacity: python:int
+
+
+    :raises ValueError: When there is no unsigned integer type of the given
+                        value size.
+
+    """
+    __slots__ = (
+        '_count', '_fill', '_keys', '_key_size', '_length', '_mask',
+        '_states', '_typecode', '_values',
+    )
+
+    #: Maximum ratio of non empty slots before the table is resized.
+    MAX_LOAD = 0.8
+    #: Minimum number of slots of the table.
+    MIN_SLOTS = 8
+
+
+    def __init__(self, key_size=c.UUID_LEN // 2, value_size=8, capacity=0):
+        """Constructor for :class:`kado.store.CompactIndex`."""
+        try:
+            self._typecode = _TYPECODES[value_size]
+        except KeyError:
+            raise ValueError(
+                'unsupported value size: {}.'.format(value_size)
+            ) from None
+        self._key_size = key_size
+
+        slots = self.MIN_SLOTS
+        while slots * self.MAX_LOAD <= capacity:
+            slots <<= 1
+        self._table_init(slots)
+
+
+    def __contains__(self, key):
+        """Check if given key is present in the index.
+
+
+        :param key: Registered index key.
+        :type key: python:bytes | ~uuid.UUID
+
+
+        :returns: Whether given key is defined in the index.
+        :rtype: python:bool
+
+        """
+        with suppress(TypeError, ValueError):
+            for _ in self._find(self._key_try(key)):
+                return True
+
+        return False
+
+
+    def __len__(self):
+        """Return the number of keys within the index.
+
+
+        :returns: Number of keys stored in the index.
+        :rtype: python:int
+
+        """
+        return self._length
+
+
+    def __iter__(self):
+        """Return and iterator over the stored index keys.
+
+
+        :returns: An iterator over the index key.
+        :rtype: ~collections.abc.Iterator
+
+        """
+        ks = self._key_size
+        for i in range(len(self._states)):
+            if self._states[i] != _USED:
+                continue
+
+            key = bytes(self._keys[i * ks:(i + 1) * ks])
+            # Keys with many values are yielded from their first slot only.
+            if next(self._find(key)) == i:
+                yield key
+
+
+    def clear(self):
+        """Remove all entries from the index."""
+        self._table_init(self.MIN_SLOTS)
+
+
+    def count(self, key=None):
+        """Get the number of entries registered with the index if a key is
+        specified, get the number of entries registered with this specific key.
+
+
+        :param key: Key mapping to the index entries.
+        :type key: python:bytes
+
+
+        :returns: Number of entries registered within the index.
+        :rtype: python:int
+
+
+        :raises KeyError: When the key cannot be found in the index.
+
+        """
+        if key is None:
+            return self._count
+        else:
+            return len(self.get(key))
+
+
+    def get(self, key):
+        """Retrieve the entries registered under given key from the index.
+
+
+        :param key: Key mapping to the index entries.
+        :type key: python:bytes
+
+
+        :returns: The entries matching given key.
+        :rtype: ~collections.abc.MutableSequence
+
+
+        :raises KeyError: When the key cannot be found in the index.
+
+        """
+        try:
+            values = [self._values[i] for i in self._find(self._key_try(key))]
+        except (TypeError, ValueError):
+            raise KeyError(key) from None
+
+        if not values:
+            raise KeyError(key)
+
+        return values
+
+
+    def view(self, key):
+        """Get the entries registered under given key as a set.
+
+        Values are packed in the table, the set is a snapshot of the entries.
+
+
+        :param key: Key mapping to the index entries.
+        :type key: python:bytes
+
+
+        :returns: A set of the entries matching given key.
+        :rtype: python:frozenset
+
+
+        :raises KeyError: When the key cannot be found in the index.
+
+        """
+        return frozenset(self.get(key))
+
+
+    def itervalues(self, key):
+        """Return an iterator over the entries registered under given key.
+
+
+        :param key: Key mapping to the index entries.
+        :type key: python:bytes
+
+
+        :returns: An iterator over the entries matching given key.
+        :rtype: ~collections.abc.Iterator
+
+
+        :raises KeyError: When the key cannot be found in the index.
+
+        """
+        return iter(self.get(key))
+
+
+    def add(self, key, value):
+        """Add an entry to the index.
+
+
+        :param key: Key to find back the entry in the index.
+        :type key: python:bytes
+
+        :param value: Value of the index entry.
+        :type value: python:int
+
+
+        :raises ValueError: When the key is not of the index key size.
+
+        :raises OverflowError: When the value does not fit the value size.
+
+        """
+        self._insert(self._key_try(key), value)
+
+
+    def add_many(self, pairs):
+        """Add a batch of entries to the index.
+
+
+        :param pairs: An iterable of key and value pairs.
+        :type pairs: ~collections.abc.Iterable
+
+
+        :returns: Number of entries which were not already in the index.
+        :rtype: python:int
+
+
+        :raises ValueError: When a key is not of the index key size.
+
+        :raises OverflowError: When a value does not fit the value size.
+
+        """
+        count = self._count
+        for key, value in pairs:
+            self._insert(self._key_try(key), value)
+
+        return self._count - count
+
+
+    def remove(self, key, value=None):
+        """Remove an entry from the index.
+
+
+        :param key: Key to the entry to be removed from the index.
+        :type key: python:bytes
+
+        :param value: Value of the entry.
+        :type value: python:int
+
+
+        :raises KeyError: When the key cannot be found in the index.
+
+        :raises ValueError: When given value is not registered under given key.
+
+        """
+        try:
+            slots = list(self._find(self._key_try(key)))
+        except (TypeError, ValueError):
+            raise KeyError(key) from None
+
+        if not slots:
+            raise KeyError(key)
+
+        targets = slots
+        if value is not None:
+            targets = [i for i in slots if self._values[i] == value]
+            if not targets:
+                raise ValueError(key, value)
+
+        for i in targets:
+            self._states[i] = _DELETED
+
+        self._count -= len(targets)
+        # The key remains if other values are registered under it.
+        if len(targets) == len(slots):
+            self._length -= 1
+
+
+    def discard(self, key, value=None):
+        """Remove an entry from the index if present.
+
+
+        :param key: Key to the entry to be removed from the index.
+        :type key: python:bytes
+
+        :param value: Value of the entry.
+        :type value: python:int
+
+        """
+        with suppress(KeyError, ValueError):
+            self.remove(key, value)
+
+
+    def remove_many(self, pairs):
+        """Remove a batch of entries from the index.
+
+        Entries are removed in order, when an error is raised the entries
+        preceding the faulty one have already been removed.
+
+
+        :param pairs: An iterable of key and value pairs, a ``None`` value
+                      removes all the entries registered with the key.
+        :type pairs: ~collections.abc.Iterable
+
+
+        :raises KeyError: When a key cannot be found in the index.
+
+        :raises ValueError: When a value is not registered under its key.
+
+        """
+        for key, value in pairs:
+            self.remove(key, value)
+
+
+    def discard_many(self, pairs):
+        """Remove a batch of entries from the index if present.
+
+
+        :param pairs: An iterable of key and value pairs, a ``None`` value
+                      removes all the entries registered with the key.
+        :type pairs: ~collections.abc.Iterable
+
+        """
+        for key, value in pairs:
+            self.discard(key, value)
+
+
+    def contains_many(self, keys):
+        """Check the presence of a batch of keys in the index.
+
+
+        :param keys: An iterable of index keys.
+        :type keys: ~collections.abc.Iterable
+
+
+        :returns: Whether each key is defined in the index, in order.
+        :rtype: ~typing.List[python:bool]
+
+        """
+        return [key in self for key in keys]
+
+
+    def _find(self, key):
+        """Yield the slots holding an entry of given key.
+
+
+        :param key: Key of the entries.
+        :type key: python:bytes
+
+
+        :returns: An iterator over the slot indexes.
+        :rtype: ~collections.abc.Iterator
+
+        """
+        ks = self._key_size
+        keys, states, mask = self._keys, self._states, self._mask
+
+        i = hash(key) & mask
+        while states[i] != _EMPTY:
+            if states[i] == _USED and keys[i * ks:(i + 1) * ks] == key:
+                yield i
+            i = (i + 1) & mask
+
+
+    def _insert(self, key, value):
+        """Insert an entry into the table unless it is already present.
+
+
+        :param key: Key of the entry.
+        :type key: python:bytes
+
+        :param value: Value of the entry.
+        :type value: python:int
+
+        """
+        ks = self._key_size
+        keys, states, values, mask = (
+            self._keys, self._states, self._values, self._mask
+        )
+
+        free = None      # First reusable slot along the probe sequence.
+        found = False    # Whether the key already has entries.
+
+        i = hash(key) & mask
+        while states[i] != _EMPTY:
+            if states[i] == _USED:
+                if keys[i * ks:(i + 1) * ks] == key:
+                    if values[i] == value:
+                        return
+                    found = True
+            elif free is None:
+                free = i
+            i = (i + 1) & mask
+
+        if free is None:
+            free = i
+            self._fill += 1
+
+        values[free] = value
+        keys[free * ks:(free + 1) * ks] = key
+        states[free] = _USED
+
+        self._count += 1
+        if not found:
+            self._length += 1
+
+        if self._fill > len(states) * self.MAX_LOAD:
+            self._resize()
+
+
+    def _key_try(self, key):
+        """Make sure that given key is of the correct type and size.
+
+
+        :param key: Key to be checked.
+        :type key: python:bytes | ~uuid.UUID
+
+
+        :returns: The key as a bytes object.
+        :rtype: python:bytes
+
+
+        :raises TypeError: When given key is neither a bytes-like object nor an
+                           :class:`~uuid.UUID`.
+
+        :raises ValueError: When given key is not of the index key size.
+
+        """
+        if isinstance(key, uuid.UUID):
+            key = key.bytes
+        else:
+            key = bytes(memoryview(key))
+        if len(key) != self._key_size:
+            raise ValueError('expected key of {} bytes, got {}.'.format(
+                self._key_size, len(key)
+            ))
+
+        return key
+
+
+    def _resize(self):
+        """Rebuild the table, doubling its size when more than half full."""
+        ks = self._key_size
+        keys, states, values = self._keys, self._states, self._values
+
+        slots = len(states)
+        if self._count > slots * self.MAX_LOAD / 2:
+            slots <<= 1
+
+        self._table_init(slots)
+        for i in range(len(states)):
+            if states[i] == _USED:
+                self._insert(bytes(keys[i * ks:(i + 1) * ks]), values[i])
+
+
+    def _table_init(self, slots):
+        """Initialize an empty table.
+
+
+        :param slots: Number of slots of the table, a power of two.
+        :type slots: python:int
+
+        """
+        self._count = 0     # Number of entries.
+        self._fill = 0      # Number of non empty slots.
+        self._length = 0    # Number of distinct keys.
+        self._mask = slots - 1
+
+        self._keys = bytearray(slots * self._key_size)
+        self._states = bytearray(slots)
+        self._values = array.array(
+            self._typecode, bytes(slots * array.array(self._typecode).itemsize)
+        )
+
+
+class DiskIndex(object):
+    """Index of fixed-size binary keys and unsigned 64 bits integer values
+    stored in a memory mapped file, with the same interface as
+    :class:`~kado.store._store.Index`.
+
+    The file holds a hash table of fixed-size buckets, each bucket linking to
+    an overflow bucket appended at the end of the file once it is full. The
+    file header is written twice, the most recent copy with a valid checksum
+    being used, so that a header update is never seen partially written.
+
+    Keys are bytes-like objects or :class:`~uuid.UUID`, such as chunk
+    identifiers, stored and iterated over in their binary form.
+
+    The hash table is rebuilt with twice as many buckets into a new file
+    replacing the index file once the entries exceed :attr:`MAX_LOAD` of its
+    slots, so overflow chains stay short as the index grows.
+
+    Opening an index only maps its file, entries being read from the page
+    cache, which may be shared by many processes opening the same index
+    read-only. There must be at most one writer at a time.
+
+
+    :param path: Path to the index file, created when it does not exist.
+    :type path: python:str
+
+    :param key_size: Size of the keys in bytes.
+    :type key_size: python:int
+
+    :param capacity: Number of entries to size the hash table for when the
+                     index file is created, it grows as needed past it.
+    :type capacity: python:int
+
+    :param readonly: Whether to open the index file read-only.
+    :type readonly: python:bool
+
+
+    :raises ValueError: When the file is not a valid index file or its key size
+                        does not match the given one.
+
+    """
+    __slots__ = (
+        '_buckets', '_bucket_size', '_count', '_end', '_fp', '_key_size',
+        '_length', '_mm', '_seq', '_slot', 'path', 'readonly',
+    )
+
+    #: Number of entry slots within a bucket.
+    BUCKET_SLOTS = 8
+    #: Minimum number of buckets of the hash table.
+    MIN_BUCKETS = 64
+    #: Maximum ratio of used slots before the hash table is grown.
+    MAX_LOAD = 0.75
+
+
+    def __init__(self, path, key_size=c.UUID_LEN // 2, capacity=0,
+                 readonly=False):
+        """Constructor for :class:`kado.store.DiskIndex`."""
+        self.path = path
+        self.readonly = readonly
+        self._key_size = key_size
+        self._slot = struct.Struct('<B{}sQ'.format(key_size))
+        self._bucket_size = (
+            self.BUCKET_SLOTS * self._slot.size + _DISK_NEXT.size
+        )
+
+        self._open(capacity)
+
+
+    def __contains__(self, key):
+        """Check if given key is present in the index.
+
+
+        :param key: Registered index key.
+        :type key: python:bytes | ~uuid.UUID
+
+
+        :returns: Whether given key is defined in the index.
+        :rtype: python:bool
+
+        """
+        with suppress(TypeError, ValueError):
+            for _ in self._find(self._key_try(key)):
+                return True
+
+        return False
+
+
+    def __enter__(self):
+        """Enter the runtime context of the index."""
+        return self
+
+
+    def __exit__(self, *exc_info):
+        """Close the index when leaving its runtime context."""
+        self.close()
+
+
+    def __len__(self):
+        """Return the number of keys within the index.
+
+
+        :returns: Number of keys stored in the index.
+        :rtype: python:int
+
+        """
+        return self._length
+
+
+    def __iter__(self):
+        """Return and iterator over the stored index keys.
+
+
+        :returns: An iterator over the index key.
+        :rtype: ~collections.abc.Iterator
+
+        """
+        for bucket in range(_DISK_DATA, self._end, self._bucket_size):
+            for i in self._slots(bucket):
+                state, key, _ = self._slot.unpack_from(self._mm, i)
+                # Keys with many values are yielded from their first slot only.
+                if state == _USED and next(self._find(key)) == i:
+                    yield key
+
+
+    @property
+    def closed(self):
+        """Whether the index file is closed."""
+        return self._fp.closed
+
+
+    def close(self):
+        """Flush and close the index file."""
+        if self._fp.closed:
+            return
+
+        if getattr(self, '_mm', None) is not None:
+            if not self.readonly:
+                self._mm.flush()
+            self._mm.close()
+            self._mm = None
+        self._fp.close()
+
+
+    def clear(self):
+        """Remove all entries from the index.
+
+
+        :raises io.UnsupportedOperation: When the index is read-only.
+
+        """
+        self._writable_try()
+        self._rebuild(0)
+
+
+    def flush(self):
+        """Write the index changes to disk."""
+        if not self.readonly:
+            self._mm.flush()
+
+
+    def reload(self):
+        """Read back the index file header, to see the changes made by the
+        index writer from a read-only index.
+
+        The index file is opened again when the writer replaced it with a
+        rebuilt hash table.
+
+        """
+        if os.stat(self.path).st_ino != os.fstat(self._fp.fileno()).st_ino:
+            self.close()
+            self._open()
+        else:
+            self._remap()
+            self._header_load()
+
+
+    def count(self, key=None):
+        """Get the number of entries registered with the index if a key is
+        specified, get the number of entries registered with this specific key.
+
+
+        :param key: Key mapping to the index entries.
+        :type key: python:bytes
+
+
+        :returns: Number of entries registered within the index.
+        :rtype: python:int
+
+
+        :raises KeyError: When the key cannot be found in the index.
+
+        """
+        if key is None:
+            return self._count
+        else:
+            return len(self.get(key))
+
+
+    def get(self, key):
+        """Retrieve the entries registered under given key from the index.
+
+
+        :param key: Key mapping to the index entries.
+        :type key: python:bytes
+
+
+        :returns: The entries matching given key.
+        :rtype: ~collections.abc.MutableSequence
+
+
+        :raises KeyError: When the key cannot be found in the index.
+
+        """
+        try:
+            values = [
+                self._slot.unpack_from(self._mm, i)[2]
+                for i in self._find(self._key_try(key))
+            ]
+        except (TypeError, ValueError):
+            raise KeyError(key) from None
+
+        if not values:
+            raise KeyError(key)
+
+        return values
+
+
+    def view(self, key):
+        """Get the entries registered under given key as a set.
+
+        Values are stored in the index file, the set is a snapshot of the
+        entries.
+
+
+        :param key: Key mapping to the index entries.
+        :type key: python:bytes
+
+
+        :returns: A set of the entries matching given key.
+        :rtype: python:frozenset
+
+
+        :raises KeyError: When the key cannot be found in the index.
+
+        """
+        return frozenset(self.get(key))
+
+
+    def itervalues(self, key):
+        """Return an iterator over the entries registered under given key.
+
+
+        :param key: Key mapping to the index entries.
+        :type key: python:bytes
+
+
+        :returns: An iterator over the entries matching given key.
+        :rtype: ~collections.abc.Iterator
+
+
+        :raises KeyError: When the key cannot be found in the index.
+
+        """
+        return iter(self.get(key))
+
+
+    def add(self, key, value):
+        """Add an entry to the index.
+
+
+        :param key: Key to find back the entry in the index.
+        :type key: python:bytes
+
+        :param value: Value of the index entry.
+        :type value: python:int
+
+
+        :raises ValueError: When the key is not of the index key size.
+
+        :raises io.UnsupportedOperation: When the index is read-only.
+
+        """
+        self._writable_try()
+        self._insert(self._key_try(key), value)
+        self._header_save()
+        self._grow_try()
+
+
+    def add_many(self, pairs):
+        """Add a batch of entries to the index.
+
+
+        :param pairs: An iterable of key and value pairs.
+        :type pairs: ~collections.abc.Iterable
+
+
+        :returns: Number of entries which were not already in the index.
+        :rtype: python:int
+
+
+        :raises ValueError: When a key is not of the index key size.
+
+        :raises io.UnsupportedOperation: When the index is read-only.
+
+        """
+        self._writable_try()
+
+        count = self._count
+        try:
+            for key, value in pairs:
+                self._insert(self._key_try(key), value)
+                self._grow_try()
+        finally:
+            self._header_save()
+
+        return self._count - count
+
+
+    def remove(self, key, value=None):
+        """Remove an entry from the index.
+
+
+        :param key: Key to the entry to be removed from the index.
+        :type key: python:bytes
+
+        :param value: Value of the entry.
+        :type value: python:int
+
+
+        :raises KeyError: When the key cannot be found in the index.
+
+        :raises ValueError: When given value is not registered under given key.
+
+        :raises io.UnsupportedOperation: When the index is read-only.
+
+        """
+        self._writable_try()
+        try:
+            slots = list(self._find(self._key_try(key)))
+        except (TypeError, ValueError):
+            raise KeyError(key) from None
+
+        if not slots:
+            raise KeyError(key)
+
+        targets = slots
+        if value is not None:
+            targets = [
+                i for i in slots
+                if self._slot.unpack_from(self._mm, i)[2] == value
+            ]
+            if not targets:
+                raise ValueError(key, value)
+
+        for i in targets:
+            self._mm[i] = _DELETED
+
+        self._count -= len(targets)
+        # The key remains if other values are registered under it.
+        if len(targets) == len(slots):
+            self._length -= 1
+
+        self._header_save()
+
+
+    def discard(self, key, value=None):
+        """Remove an entry from the index if present.
+
+
+        :param key: Key to the entry to be removed from the index.
+        :type key: python:bytes
+
+        :param value: Value of the entry.
+        :type value: python:int
+
+
+        :raises io.UnsupportedOperation: When the index is read-only.
+
+        """
+        self._writable_try()
+        with suppress(KeyError, ValueError):
+            self.remove(key, value)
+
+
+    def remove_many(self, pairs):
+        """Remove a batch of entries from the index.
+
+        Entries are removed in order, when an error is raised the entries
+        preceding the faulty one have already been removed.
+
+
+        :param pairs: An iterable of key and value pairs, a ``None`` value
+                      removes all the entries registered with the key.
+        :type pairs: ~collections.abc.Iterable
+
+
+        :raises KeyError: When a key cannot be found in the index.
+
+        :raises ValueError: When a value is not registered under its key.
+
+        :raises io.UnsupportedOperation: When the index is read-only.
+
+        """
+        self._writable_try()
+        for key, value in pairs:
+            self.remove(key, value)
+
+
+    def discard_many(self, pairs):
+        """Remove a batch of entries from the index if present.
+
+
+        :param pairs: An iterable of key and value pairs, a ``None`` value
+                      removes all the entries registered with the key.
+        :type pairs: ~collections.abc.Iterable
+
+
+        :raises io.UnsupportedOperation: When the index is read-only.
+
+        """
+        self._writable_try()
+        for key, value in pairs:
+            self.discard(key, value)
+
+
+    def contains_many(self, keys):
+        """Check the presence of a batch of keys in the index.
+
+
+        :param keys: An iterable of index keys.
+        :type keys: ~collections.abc.Iterable
+
+
+        :returns: Whether each key is defined in the index, in order.
+        :rtype: ~typing.List[python:bool]
+
+        """
+        return [key in self for key in keys]
+
+
+    def _buckets_for(self, capacity):
+        """Get the number of buckets of a hash table sized for given number of
+        entries.
+
+
+        :param capacity: Number of entries to size the hash table for.
+        :type capacity: python:int
+
+
+        :returns: Number of buckets of the hash table.
+        :rtype: python:int
+
+        """
+        return max(
+            self.MIN_BUCKETS,
+            int(capacity / (self.BUCKET_SLOTS * self.MAX_LOAD)) + 1
+        )
+
+
+    def _chain(self, key):
+        """Yield the offsets of the buckets chained for given key.
+
+
+        :param key: Key of the entries.
+        :type key: python:bytes
+
+
+        :returns: An iterator over the bucket offsets.
+        :rtype: ~collections.abc.Iterator
+
+        """
+        offset = _DISK_DATA + (
+            xxhash.xxh64(key).intdigest() % self._buckets
+        ) * self._bucket_size
+
+        while offset:
+            if offset + self._bucket_size > len(self._mm):
+                # The index file has grown since it was mapped.
+                self._remap()
+
+            yield offset
+            offset, = _DISK_NEXT.unpack_from(
+                self._mm, offset + self._bucket_size - _DISK_NEXT.size
+            )
+
+
+    def _entries(self):
+        """Yield the entries of the hash table, in file order.
+
+
+        :returns: An iterator over the key and value pairs.
+        :rtype: ~collections.abc.Iterator
+
+        """
+        for bucket in range(_DISK_DATA, self._end, self._bucket_size):
+            for i in self._slots(bucket):
+                state, key, value = self._slot.unpack_from(self._mm, i)
+                if state == _USED:
+                    yield key, value
+
+
+    def _find(self, key):
+        """Yield the offsets of the slots holding an entry of given key.
+
+
+        :param key: Key of the entries.
+        :type key: python:bytes
+
+
+        :returns: An iterator over the slot offsets.
+        :rtype: ~collections.abc.Iterator
+
+        """
+        for bucket in self._chain(key):
+            for i in self._slots(bucket):
+                state, k, _ = self._slot.unpack_from(self._mm, i)
+                if state == _EMPTY:
+                    return
+                elif state == _USED and k == key:
+                    yield i
+
+
+    def _grow_try(self):
+        """Rebuild the hash table with twice as many buckets once it is more
+        than :attr:`MAX_LOAD` full.
+
+        """
+        if self._count > self._buckets * self.BUCKET_SLOTS * self.MAX_LOAD:
+            self._rebuild(2 * self._count, self._entries())
+
+
+    def _insert(self, key, value):
+        """Insert an entry into the hash table unless it is already present.
+
+
+        :param key: Key of the entry.
+        :type key: python:bytes
+
+        :param value: Value of the entry.
+        :type value: python:int
+
+        """
+        free = None      # First reusable slot along the bucket chain.
+        found = False    # Whether the key already has entries.
+
+        bucket = None
+        for bucket in self._chain(key):
+            for i in self._slots(bucket):
+                state, k, v = self._slot.unpack_from(self._mm, i)
+                if state == _USED:
+                    if k == key:
+                        if v == value:
+                            return
+                        found = True
+                elif free is None:
+                    free = i
+                if state == _EMPTY:
+                    break
+            else:
+                continue
+            break
+        else:
+            if free is None:
+                free = self._overflow_new(bucket)
+
+        # The entry is written before being flagged as used.
+        self._slot.pack_into(self._mm, free, _EMPTY, key, value)
+        self._mm[free] = _USED
+
+        self._count += 1
+        if not found:
+            self._length += 1
+
+
+    def _overflow_new(self, bucket):
+        """Append an empty overflow bucket and link it to given bucket.
+
+
+        :param bucket: Offset of the last bucket of a chain.
+        :type bucket: python:int
+
+
+        :returns: Offset of the first slot of the new bucket.
+        :rtype: python:int
+
+        """
+        offset = self._end
+        if offset + self._bucket_size > len(self._mm):
+            size = len(self._mm)
+            self._fp.truncate(max(offset + self._bucket_size, size + size // 2))
+            os.fsync(self._fp.fileno())
+            self._remap()
+
+        # The new end is written to disk before the bucket is linked, a crash
+        # may leave an unused bucket but never hands it to two chains.
+        self._end += self._bucket_size
+        self._header_save()
+        self._mm.flush(0, _DISK_DATA)
+
+        _DISK_NEXT.pack_into(
+            self._mm, bucket + self._bucket_size - _DISK_NEXT.size, offset
+        )
+
+        return offset
+
+
+    def _file_init(self, buckets):
+        """Write an empty hash table to the index file.
+
+
+        :param buckets: Number of buckets of the hash table.
+        :type buckets: python:int
+
+        """
+        end = _DISK_DATA + buckets * self._bucket_size
+        header = _DISK_HEADER.pack(
+            _DISK_MAGIC, 0, self._key_size, buckets, end, 0, 0
+        )
+
+        self._fp.write(header + _DISK_CRC.pack(zlib.crc32(header)))
+        self._fp.truncate(end)
+        self._fp.flush()
+
+
+    def _header_load(self):
+        """Read the most recent valid copy of the index file header.
+
+
+        :raises ValueError: When no valid header can be found or when the key
+                            size does not match.
+
+        """
+        headers = []
+        for offset in (0, _DISK_HEADER_SIZE):
+            header = self._mm[offset:offset + _DISK_HEADER.size]
+            crc, = _DISK_CRC.unpack_from(self._mm, offset + _DISK_HEADER.size)
+            if zlib.crc32(header) == crc:
+                header = _DISK_HEADER.unpack(header)
+                if header[0] == _DISK_MAGIC:
+                    headers.append(header)
+
+        if not headers:
+            raise ValueError('invalid index file header.')
+
+        (_, self._seq, key_size, self._buckets, self._end, self._count,
+         self._length) = max(headers, key=lambda x: x[1])
+        if key_size != self._key_size:
+            raise ValueError('expected key of {} bytes, got {}.'.format(
+                self._key_size, key_size
+            ))
+
+
+    def _header_save(self):
+        """Write the index file header over its oldest copy."""
+        self._seq += 1
+        header = _DISK_HEADER.pack(
+            _DISK_MAGIC, self._seq, self._key_size, self._buckets, self._end,
+            self._count, self._length
+        )
+
+        offset = (self._seq % 2) * _DISK_HEADER_SIZE
+        self._mm[offset:offset + _DISK_HEADER.size] = header
+        _DISK_CRC.pack_into(
+            self._mm, offset + _DISK_HEADER.size, zlib.crc32(header)
+        )
+
+
+    def _key_try(self, key):
+        """Make sure that given key is of the correct type and size.
+
+
+        :param key: Key to be checked.
+        :type key: python:bytes | ~uuid.UUID
+
+
+        :returns: The key as a bytes object.
+        :rtype: python:bytes
+
+
+        :raises TypeError: When given key is neither a bytes-like object nor an
+                           :class:`~uuid.UUID`.
+
+        :raises ValueError: When given key is not of the index key size.
+
+        """
+        if isinstance(key, uuid.UUID):
+            key = key.bytes
+        else:
+            key = bytes(memoryview(key))
+        if len(key) != self._key_size:
+            raise ValueError('expected key of {} bytes, got {}.'.format(
+                self._key_size, len(key)
+            ))
+
+        return key
+
+
+    def _open(self, capacity=0):
+        """Open and map the index file, creating it when it does not exist.
+
+
+        :param capacity: Number of entries to size the hash table for when the
+                         index file is created.
+        :type capacity: python:int
+
+
+        :raises ValueError: When the file is not a valid index file or its key
+                            size does not match.
+
+        """
+        if self.readonly:
+            self._fp = open(self.path, 'rb')
+        else:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            self._fp = open(fd, 'r+b')
+
+        self._mm = None
+        try:
+            if not self.readonly and not os.fstat(self._fp.fileno()).st_size:
+                self._file_init(self._buckets_for(capacity))
+
+            self._remap()
+            self._header_load()
+        except BaseException:
+            self.close()
+            raise
+
+
+    def _rebuild(self, capacity, entries=()):
+        """Write given entries to a new hash table replacing the index file.
+
+        The new table is written aside and made durable before replacing the
+        index file, readers keep seeing the previous file until reloaded.
+
+
+        :param capacity: Number of entries to size the new hash table for.
+        :type capacity: python:int
+
+        :param entries: An iterable of key and value pairs.
+        :type entries: ~collections.abc.Iterable
+
+        """
+        path = self.path + '.tmp'
+        with suppress(FileNotFoundError):
+            os.remove(path)
+
+        with DiskIndex(path, self._key_size, capacity) as other:
+            for key, value in entries:
+                other._insert(key, value)
+            other._header_save()
+            other.flush()
+            os.fsync(other._fp.fileno())
+
+        os.replace(path, self.path)
+        _fsync_dir(os.path.dirname(os.path.abspath(self.path)))
+
+        self.close()
+        self._open()
+
+
+    def _remap(self):
+        """Map the whole index file into memory."""
+        if self._mm is not None:
+            self._mm.close()
+
+        self._mm = mmap.mmap(
+            self._fp.fileno(), 0,
+            access=mmap.ACCESS_READ if self.readonly else mmap.ACCESS_WRITE
+        )
+
+
+    def _slots(self, bucket):
+        """Get the offsets of the entry slots of a bucket.
+
+
+        :param bucket: Offset of the bucket.
+        :type bucket: python:int
+
+
+        :returns: The slot offsets.
+        :rtype: python:range
+
+        """
+        size = self._slot.size
+        return range(bucket, bucket + self.BUCKET_SLOTS * size, size)
+
+
+    def _writable_try(self):
+        """Make sure that the index can be modified.
+
+
+        :raises io.UnsupportedOperation: When the index is read-only.
+
+        """
+        if self.readonly:
+            raise io.UnsupportedOperation('index is opened read-only.')
+
+
+class FilteredIndex(object):
+    """Index with a Bloom filter in front of its key lookups.
+
+    Keys which were never added to the index are rejected from the in memory
+    filter, without querying the underlying index which may live on disk or
+    be shared between threads. Removed keys stay in the filter and are looked
+    up from the index.
+
+
+    :param index: The index to be filtered, a new
+                  :class:`~kado.store._store.Index` by default. Keys already
+                  in the index are added to the filter.
+
+    :param capacity: Number of keys the filter is sized for when it is created.
+    :type capacity: python:int
+
+    :param error_rate: Expected false positive rate of the filter when it is
+                       created.
+    :type error_rate: python:float
+
+    :param bloom: Filter of the index keys, usually loaded along the index,
+                  instead of creating a new one.
+    :type bloom: ~kado.utils.bloom.BloomFilter
+
+    """
+    __slots__ = ('bloom', 'index')
+
+
+    def __init__(self, index=None, capacity=1 << 20, error_rate=0.01,
+                 bloom=None):
+        """Constructor for :class:`kado.store.FilteredIndex`."""
+        self.index = Index() if index is None else index
+        if bloom is None:
+            bloom = BloomFilter(max(capacity, len(self.index)), error_rate)
+            for key in self.index:
+                bloom.add(self._key_bytes(key))
+
+        self.bloom = bloom
+
+
+    def __contains__(self, key):
+        """Check if given key is present in the index.
+
+
+        :param key: Registered index key.
+        :type key: python:bytes
+
+
+        :returns: Whether given key is defined in the index.
+        :rtype: python:bool
+
+        """
+        return self._key_bytes(key) in self.bloom and key in self.index
+
+
+    def __len__(self):
+        """Return the number of keys within the index.
+
+
+        :returns: Number of keys stored in the index.
+        :rtype: python:int
+
+        """
+        return len(self.index)
+
+
+    def __iter__(self):
+        """Return and iterator over the stored index keys.
+
+
+        :returns: An iterator over the index key.
+        :rtype: ~collections.abc.Iterator
+
+        """
+        return iter(self.index)
+
+
+    def clear(self):
+        """Remove all entries from the index and reset the filter."""
+        self.index.clear()
+        self.bloom.clear()
+
+
+    def count(self, key=None):
+        """Get the number of entries registered with the index if a key is
+        specified, get the number of entries registered with this specific key.
+
+
+        :param key: Key mapping to the index entries.
+        :type key: python:bytes
+
+
+        :returns: Number of entries registered within the index.
+        :rtype: python:int
+
+
+        :raises KeyError: When the key cannot be found in the index.
+
+        """
+        if key is None:
+            return self.index.count()
+        else:
+            return len(self.get(key))
+
+
+    def get(self, key):
+        """Retrieve the entries registered under given key from the index.
+
+
+        :param key: Key mapping to the index entries.
+        :type key: python:bytes
+
+
+        :returns: The entries matching given key.
+        :rtype: ~collections.abc.MutableSequence
+
+
+        :raises KeyError: When the key cannot be found in the index.
+
+        """
+        if self._key_bytes(key) not in self.bloom:
+            raise KeyError(key)
+
+        return self.index.get(key)
+
+
+    def view(self, key):
+        """Get a read-only view over the entries registered under given key.
+
+
+        :param key: Key mapping to the index entries.
+        :type key: python:bytes
+
+
+        :returns: A set-like view of the entries matching given key.
+        :rtype: ~collections.abc.Set
+
+
+        :raises KeyError: When the key cannot be found in the index.
+
+        """
+        if self._key_bytes(key) not in self.bloom:
+            raise KeyError(key)
+
+        return self.index.view(key)
+
+
+    def itervalues(self, key):
+        """Return an iterator over the entries registered under given key.
+
+
+        :param key: Key mapping to the index entries.
+        :type key: python:bytes
+
+
+        :returns: An iterator over the entries matching given key.
+        :rtype: ~collections.abc.Iterator
+
+
+        :raises KeyError: When the key cannot be found in the index.
+
+        """
+        if self._key_bytes(key) not in self.bloom:
+            raise KeyError(key)
+
+        return self.index.itervalues(key)
+
+
+    def add(self, key, value):
+        """Add an entry to the index.
+
+
+        :param key: Key to find back the entry in the index.
+        :type key: python:bytes
+
+        :param value: Value of the index entry.
+
+        """
+        self.index.add(key, value)
+        self.bloom.add(self._key_bytes(key))
+
+
+    def add_many(self, pairs):
+        """Add a batch of entries to the index.
+
+
+        :param pairs: An iterable of key and value pairs.
+        :type pairs: ~collections.abc.Iterable
+
+
+        :returns: Number of entries which were not already in the index.
+        :rtype: python:int
+
+        """
+        pairs = list(pairs)
+        count = self.index.add_many(pairs)
+        for key, _ in pairs:
+            self.bloom.add(self._key_bytes(key))
+
+        return count
+
+
+    def remove(self, key, value=None):
+        """Remove an entry from the index.
+
+
+        :param key: Key to the entry to be removed from the index.
+        :type key: python:bytes
+
+        :param value: Value of the entry.
+
+
+        :raises KeyError: When the key cannot be found in the index.
+
+        :raises ValueError: When given value is not registered under given key.
+
+        """
+        if self._key_bytes(key) not in self.bloom:
+            raise KeyError(key)
+
+        self.index.remove(key, value)
+
+
+    def discard(self, key, value=None):
+        """Remove an entry from the index if present.
+
+
+        :param key: Key to the entry to be removed from the index.
+        :type key: python:bytes
+
+        :param value: Value of the entry.
+
+        """
+        with suppress(KeyError, ValueError):
+            self.remove(key, value)
+
+
+    def remove_many(self, pairs):
+        """Remove a batch of entries from the index.
+
+        Entries are removed in order, when an error is raised the entries
+        preceding the faulty one have already been removed.
+
+
+        :param pairs: An iterable of key and value pairs, a ``None`` value
+                      removes all the entries registered with the key.
+        :type pairs: ~collections.abc.Iterable
+
+
+        :raises KeyError: When a key cannot be found in the index.
+
+        :raises ValueError: When a value is not registered under its key.
+
+        """
+        for key, value in pairs:
+            self.remove(key, value)
+
+
+    def discard_many(self, pairs):
+        """Remove a batch of entries from the index if present.
+
+        Keys rejected by the filter are dropped before the batch is given to
+        the underlying index.
+
+
+        :param pairs: An iterable of key and value pairs, a ``None`` value
+                      removes all the entries registered with the key.
+        :type pairs: ~collections.abc.Iterable
+
+        """
+        bloom = self.bloom
+        self.index.discard_many(
+            (key, value) for key, value in pairs
+            if self._key_bytes(key) in bloom
+        )
+
+
+    def contains_many(self, keys):
+        """Check the presence of a batch of keys in the index.
+
+
+        :param keys: An iterable of index keys.
+        :type keys: ~collections.abc.Iterable
+
+
+        :returns: Whether each key is defined in the index, in order.
+        :rtype: ~typing.List[python:bool]
+
+        """
+        return [key in self for key in keys]
+
+
+    @staticmethod
+    def _key_bytes(key):
+        """Get the binary form of an index key to be given to the filter.
+
+
+        :param key: Index key, either a bytes-like object, a string or an
+                    :class:`~uuid.UUID`.
+
+
+        :returns: The binary form of the key.
+        :rtype: python:bytes
+
+        """
+        if isinstance(key, uuid.UUID):
+            return key.bytes
+        elif isinstance(key, str):
+            return key.encode()
+        else:
+            return key
+
+
+class ShardedIndex(object):
+    """Thread-safe index partitioning its keys between independently locked
+    shards, with the same interface as :class:`~kado.store._store.Index`.
+
+    Threads working on keys of different shards do not wait for each other,
+    entries of a given key always being held by the same shard.
+
+
+    :param shards: Number of shards.
+    :type shards: python:int
+
+    :param factory: Callable returning a new empty index for each shard.
+    :type factory: ~collections.abc.Callable
+
+
+    :raises ValueError: When the number of shards is lower than one.
+
+    """
+    __slots__ = ('_locks', '_shards')
+
+
+    def __init__(self, shards=16, factory=Index):
+        """Constructor for :class:`kado.store.ShardedIndex`."""
+        if shards < 1:
+            raise ValueError(
+                'expected at least one shard, got {}.'.format(shards)
+            )
+
+        self._shards = [factory() for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+
+
+    def __contains__(self, key):
+        """Check if given key is present in the index.
+
+
+        :param key: Registered index key.
+        :type key: ~collections.abc.Hashable
+
+
+        :returns: Whether given key is defined in the index.
+        :rtype: python:bool
+
+        """
+        i = self._shard_of(key)
+        with self._locks[i]:
+            return key in self._shards[i]
+
+
+    def __len__(self):
+        """Return the number of keys within the index.
+
+
+        :returns: Number of keys stored in the index.
+        :rtype: python:int
+
+        """
+        total = 0
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                total += len(shard)
+
+        return total
+
+
+    def __iter__(self):
+        """Return and iterator over the stored index keys.
+
+        Keys of each shard are copied before being iterated over, the index
+        may be modified meanwhile.
+
+
+        :returns: An iterator over the index key.
+        :rtype: ~collections.abc.Iterator
+
+        """
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                keys = list(shard)
+            yield from keys
+
+
+    def clear(self):
+        """Remove all entries from the index."""
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                shard.clear()
+
+
+    def count(self, key=None):
+        """Get the number of entries registered with the index if a key is
+        specified, get the number of entries registered with this specific key.
+
+
+        :param key: Key mapping to the index entries.
+        :type key: ~collections.abc.Hashable
+
+
+        :returns: Number of entries registered within the index.
+        :rtype: python:int
+
+
+        :raises KeyError: When the key cannot be found in the index.
+
+        """
+        if key is not None:
+            i = self._shard_of(key)
+            with self._locks[i]:
+                return self._shards[i].count(key)
+
+        total = 0
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                total += shard.count()
+
+        return total
+
+
+    def get(self, key):
+        """Retrieve the entries registered under given key from the index.
+
+
+        :param key: Key mapping to the index entries.
+        :type key: ~collections.abc.Hashable
+
+
+        :returns: The entries matching given key.
+        :rtype: ~collections.abc.MutableSequence
+
+
+        :raises KeyError: When the key cannot be found in the index.
+
+        """
+        i = self._shard_of(key)
+        with self._locks[i]:
+            return self._shards[i].get(key)
+
+
+    def view(self, key):
+        """Get the entries registered under given key as a set.
+
+        Entries may be modified by other threads, the set is a snapshot of the
+        entries.
+
+
+        :param key: Key mapping to the index entries.
+        :type key: ~collections.abc.Hashable
+
+
+        :returns: A set of the entries matching given key.
+        :rtype: python:frozenset
+
+
+        :raises KeyError: When the key cannot be found in the index.
+
+        """
+        return frozenset(self.get(key))
+
+
+    def itervalues(self, key):
+        """Return an iterator over the entries registered under given key.
+
+
+        :param key: Key mapping to the index entries.
+        :type key: ~collections.abc.Hashable
+
+
+        :returns: An iterator over the entries matching given key.
+        :rtype: ~collections.abc.Iterator
+
+
+        :raises KeyError: When the key cannot be found in the index.
+
+        """
+        return iter(self.get(key))
+
+
+    def add(self, key, value):
+        """Add an entry to the index.
+
+
+        :param key: Key to find back the entry in the index.
+        :type key: ~collections.abc.Hashable
+
+        :param value: Value of the index entry.
+        :type value: ~collections.abc.Hashable
+
+        """
+        i = self._shard_of(key)
+        with self._locks[i]:
+            self._shards[i].add(key, value)
+
+
+    def add_if_absent(self, key, value):
+        """Add an entry to the index unless its key is already present, as a
+        single operation.
+
+
+        :param key: Key to find back the entry in the index.
+        :type key: ~collections.abc.Hashable
+
+        :param value: Value of the index entry.
+        :type value: ~collections.abc.Hashable
+
+
+        :returns: Whether the entry was added, ``False`` when the key was
+                  already present.
+        :rtype: python:bool
+
+        """
+        i = self._shard_of(key)
+        with self._locks[i]:
+            shard = self._shards[i]
+            if key in shard:
+                return False
+
+            shard.add(key, value)
+            return True
+
+
+    def add_many(self, pairs):
+        """Add a batch of entries to the index, locking each shard once.
+
+
+        :param pairs: An iterable of key and value pairs.
+        :type pairs: ~collections.abc.Iterable
+
+
+        :returns: Number of entries which were not already in the index.
+        :rtype: python:int
+
+        """
+        count = 0
+        for i, batch in self._split(pairs):
+            with self._locks[i]:
+                count += self._shards[i].add_many(batch)
+
+        return count
+
+
+    def remove(self, key, value=None):
+        """Remove an entry from the index.
+
+
+        :param key: Key to the entry to be removed from the index.
+        :type key: ~collections.abc.Hashable
+
+        :param value: Value of the entry.
+        :type value: ~collections.abc.Hashable
+
+
+        :raises KeyError: When the key cannot be found in the index.
+
+        :raises ValueError: When given value is not registered under given key.
+
+        """
+        i = self._shard_of(key)
+        with self._locks[i]:
+            self._shards[i].remove(key, value)
+
+
+    def discard(self, key, value=None):
+        """Remove an entry from the index if present.
+
+
+        :param key: Key to the entry to be removed from the index.
+        :type key: ~collections.abc.Hashable
+
+        :param value: Value of the entry.
+        :type value: ~collections.abc.Hashable
+
+        """
+        i = self._shard_of(key)
+        with self._locks[i]:
+            self._shards[i].discard(key, value)
+
+
+    def remove_many(self, pairs):
+        """Remove a batch of entries from the index.
+
+        Entries are removed in order, when an error is raised the entries
+        preceding the faulty one have already been removed.
+
+
+        :param pairs: An iterable of key and value pairs, a ``None`` value
+                      removes all the entries registered with the key.
+        :type pairs: ~collections.abc.Iterable
+
+
+        :raises KeyError: When a key cannot be found in the index.
+
+        :raises ValueError: When a value is not registered under its key.
+
+        """
+        for key, value in pairs:
+            self.remove(key, value)
+
+
+    def discard_many(self, pairs):
+        """Remove a batch of entries from the index if present, locking each
+        shard once.
+
+
+        :param pairs: An iterable of key and value pairs, a ``None`` value
+                      removes all the entries registered with the key.
+        :type pairs: ~collections.abc.Iterable
+
+        """
+        for i, batch in self._split(pairs):
+            with self._locks[i]:
+                self._shards[i].discard_many(batch)
+
+
+    def contains_many(self, keys):
+        """Check the presence of a batch of keys in the index.
+
+
+        :param keys: An iterable of index keys.
+        :type keys: ~collections.abc.Iterable
+
+
+        :returns: Whether each key is defined in the index, in order.
+        :rtype: ~typing.List[python:bool]
+
+        """
+        return [key in self for key in keys]
+
+
+    def _shard_of(self, key):
+        """Get the shard holding the entries of given key.
+
+
+        :param key: Index key.
+        :type key: ~collections.abc.Hashable
+
+
+        :returns: Index of the shard.
+        :rtype: python:int
+
+        """
+        return hash(key) % len(self._shards)
+
+
+    def _split(self, pairs):
+        """Group key and value pairs by shard.
+
+
+        :param pairs: An iterable of key and value pairs.
+        :type pairs: ~collections.abc.Iterable
+
+
+        :returns: An iterator over shard index and list of pairs.
+        :rtype: ~collections.abc.Iterator
+
+        """
+        batches = {}
+        for pair in pairs:
+            batches.setdefault(self._shard_of(pair[0]), []).append(pair)
+
+        return iter(batches.items())
+
+
+class RefIndex(Index):
+    """Index of the items referencing each chunk.
+
+    Entries map a chunk identifier to the identifiers of the items it is part
+    of. Chunks left without any reference are tracked as they are released so
+    that they can be collected without scanning the index.
+
+    """
+    __slots__ = ('_freed', )
+
+
+    def __init__(self):
+        """Constructor for :class:`kado.store.RefIndex`."""
+        super().__init__()
+        self._freed = set()
+
+
+    def clear(self):
+        """Remove all references from the index, all chunks being freed."""
+        self._freed.update(self._mapping)
+        super().clear()
+
+
+    def refcount(self, key):
+        """Get the number of items referencing a chunk.
+
+
+        :param key: Identifier of the chunk.
+        :type key: ~collections.abc.Hashable
+
+
+        :returns: Number of items referencing the chunk, ``0`` when unknown.
+        :rtype: python:int
+
+        """
+        st = self._mapping.get(key)
+        return 0 if st is None else len(st)
+
+
+    def register(self, item_id, chunk_ids):
+        """Register the references of an item to its chunks.
+
+
+        :param item_id: Identifier of the item.
+        :type item_id: ~collections.abc.Hashable
+
+        :param chunk_ids: Identifiers of the item's chunks, as given by
+                          :meth:`~kado.store._manifest.Manifest.ids`.
+        :type chunk_ids: ~collections.abc.Iterable
+
+        """
+        self.register_many([(item_id, chunk_ids)])
+
+
+    def register_many(self, items):
+        """Register the references of a batch of items to their chunks.
+
+
+        :param items: An iterable of item identifier and chunk identifiers
+                      pairs.
+        :type items: ~collections.abc.Iterable
+
+        """
+        self.add_many(
+            (key, item_id) for item_id, chunk_ids in items for key in chunk_ids
+        )
+
+
+    def release(self, item_id, chunk_ids):
+        """Drop the references of an item to its chunks.
+
+
+        :param item_id: Identifier of the item.
+        :type item_id: ~collections.abc.Hashable
+
+        :param chunk_ids: Identifiers of the item's chunks.
+        :type chunk_ids: ~collections.abc.Iterable
+
+        """
+        self.release_many([(item_id, chunk_ids)])
+
+
+    def release_many(self, items):
+        """Drop the references of a batch of items to their chunks, unknown
+        references being ignored.
+
+
+        :param items: An iterable of item identifier and chunk identifiers
+                      pairs.
+        :type items: ~collections.abc.Iterable
+
+        """
+        self.discard_many(
+            (key, item_id) for item_id, chunk_ids in items for key in chunk_ids
+        )
+
+
+    def remove(self, key, value=None):
+        """Remove a reference from the index.
+
+
+        :param key: Identifier of the chunk.
+        :type key: ~collections.abc.Hashable
+
+        :param value: Identifier of the item, all the references to the chunk
+                      being removed when ``None``.
+        :type value: ~collections.abc.Hashable
+
+
+        :raises KeyError: When the chunk cannot be found in the index.
+
+        :raises ValueError: When the item does not reference the chunk.
+
+        """
+        super().remove(key, value)
+        if key not in self._mapping:
+            self._freed.add(key)
+
+
+    def discard_many(self, pairs):
+        """Remove a batch of references from the index if present.
+
+
+        :param pairs: An iterable of chunk and item identifiers pairs, a
+                      ``None`` item removes all the references to the chunk.
+        :type pairs: ~collections.abc.Iterable
+
+        """
+        mapping = self._mapping
+        freed = self._freed
+
+        for key, value in pairs:
+            st = mapping.get(key)
+            if st is None:
+                continue
+
+            if value is None:
+                self._count -= len(st)
+            elif value in st:
+                st.remove(value)
+                self._count -= 1
+                if st:
+                    continue
+            else:
+                continue
+
+            del mapping[key]
+            freed.add(key)
+
+
+    def collect(self):
+        """Get the chunks which lost their last reference since the previous
+        collection, in time proportional to the number of released chunks.
+
+
+        :returns: Identifiers of the unreferenced chunks.
+        :rtype: python:set
+
+        """
+        freed, self._freed = self._freed, set()
+        # Chunks may have been referenced again after being freed.
+        return {key for key in freed if key not in self._mapping}
+
+
+class OrderedIndex(Index):
+    """Index iterating over its keys in sorted order.
+
+    Keys are kept in blocks of sorted lists along the maximum key of each
+    block, so that keys are inserted and removed in logarithmic time and
+    ranges of keys are found without a full scan.
+
+    """
+    __slots__ = ('_blocks', '_maxes')
+
+    #: Number of keys above which a block is split in two.
+    BLOCK_SIZE = 1024
+
+
+    def __init__(self):
+        """Constructor for :class:`kado.store.OrderedIndex`."""
+        super().__init__()
+        self._blocks = []
+        self._maxes = []
+
+
+    def __iter__(self):
+        """Return and iterator over the stored index keys, in sorted order.
+
+
+        :returns: An iterator over the index key.
+        :rtype: ~collections.abc.Iterator
+
+        """
+        return chain.from_iterable(self._blocks)
+
+
+    def clear(self):
+        """Remove all entries from the index."""
+        super().clear()
+        self._blocks = []
+        self._maxes = []
+
+
+    def add(self, key, value):
+        """Add an entry to the index.
+
+
+        :param key: Key to find back the entry in the index, comparable with
+                    the other keys.
+        :type key: ~collections.abc.Hashable
+
+        :param value: Value of the index entry.
+        :type value: ~collections.abc.Hashable
+
+        """
+        if key not in self._mapping:
+            self._key_insert(key)
+        super().add(key, value)
+
+
+    def add_many(self, pairs):
+        """Add a batch of entries to the index.
+
+
+        :param pairs: An iterable of key and value pairs.
+        :type pairs: ~collections.abc.Iterable
+
+
+        :returns: Number of entries which were not already in the index.
+        :rtype: python:int
+
+        """
+        pairs = list(pairs)
+        new = sorted({key for key, _ in pairs if key not in self._mapping})
+        count = super().add_many(pairs)
+
+        if len(new) > len(self._mapping) // 16:
+            # Rebuilding the blocks beats as many insertions, both key runs
+            # being sorted they are merged in linear time.
+            self._blocks_build(sorted(chain(self, new)))
+        else:
+            for key in new:
+                self._key_insert(key)
+
+        return count
+
+
+    def remove(self, key, value=None):
+        """Remove an entry from the index.
+
+
+        :param key: Key to the entry to be removed from the index.
+        :type key: ~collections.abc.Hashable
+
+        :param value: Value of the entry.
+        :type value: ~collections.abc.Hashable
+
+
+        :raises KeyError: When the key cannot be found in the index.
+
+        :raises ValueError: When given value is not registered under given key.
+
+        """
+        super().remove(key, value)
+        if key not in self._mapping:
+            self._key_delete(key)
+
+
+    def discard_many(self, pairs):
+        """Remove a batch of entries from the index if present.
+
+
+        :param pairs: An iterable of key and value pairs, a ``None`` value
+                      removes all the entries registered with the key.
+        :type pairs: ~collections.abc.Iterable
+
+        """
+        pairs = list(pairs)
+        gone = {key for key, _ in pairs if key in self._mapping}
+        super().discard_many(pairs)
+
+        for key in gone:
+            if key not in self._mapping:
+                self._key_delete(key)
+
+
+    def range(self, lo=None, hi=None):
+        """Return an iterator over the keys from ``lo`` included to ``hi``
+        excluded, in sorted order.
+
+
+        :param lo: Lower bound of the keys, unbounded when ``None``.
+        :type lo: ~collections.abc.Hashable
+
+        :param hi: Upper bound of the keys, unbounded when ``None``.
+        :type hi: ~collections.abc.Hashable
+
+
+        :returns: An iterator over the keys within the range.
+        :rtype: ~collections.abc.Iterator
+
+        """
+        blocks = self._blocks
+        if lo is None:
+            i, j = 0, 0
+        else:
+            i = bisect_left(self._maxes, lo)
+            j = bisect_left(blocks[i], lo) if i < len(blocks) else 0
+
+        while i < len(blocks):
+            block = blocks[i]
+            if hi is not None and not block[-1] < hi:
+                yield from block[j:bisect_left(block, hi)]
+                return
+
+            yield from block[j:]
+            i, j = i + 1, 0
+
+
+    def prefix(self, prefix):
+        """Return an iterator over the keys starting with given prefix, in
+        sorted order.
+
+        Keys are either strings or bytes, matched with their ``startswith``
+        method, or :class:`~uuid.UUID` matched from their hexadecimal form.
+
+
+        :param prefix: Beginning of the keys.
+        :type prefix: python:str
+
+
+        :returns: An iterator over the matching keys.
+        :rtype: ~collections.abc.Iterator
+
+
+        :raises ValueError: When the prefix of a :class:`~uuid.UUID` is not
+                            hexadecimal.
+
+        """
+        if not self._blocks or not isinstance(self._blocks[0][0], uuid.UUID):
+            return takewhile(
+                lambda key: key.startswith(prefix), self.range(prefix)
+            )
+
+        digits = prefix.replace('-', '')
+        if len(digits) > 32:
+            return iter(())
+
+        # Keys sharing the prefix span one interval of the UUID integers.
+        lo = int(digits.ljust(32, '0'), 16)
+        hi = lo + (1 << 4 * (32 - len(digits)))
+        return self.range(
+            uuid.UUID(int=lo), uuid.UUID(int=hi) if hi < 1 << 128 else None
+        )
+
+
+    def merge(self, other):
+        """Walk the keys of this index along the keys of another ordered index
+        in a single pass.
+
+
+        :param other: The other index, iterating over its keys in sorted order.
+        :type other: ~kado.store._index.OrderedIndex
+
+
+        :returns: An iterator over the keys of both indexes, in sorted order,
+                  along the entries of each index or ``None`` when the key is
+                  missing from an index.
+        :rtype: ~collections.abc.Iterator
+
+        """
+        mine, theirs = iter(self), iter(other)
+        a, b = next(mine, None), next(theirs, None)
+
+        while a is not None or b is not None:
+            if b is None or (a is not None and a < b):
+                yield a, self.get(a), None
+                a = next(mine, None)
+            elif a is None or b < a:
+                yield b, None, other.get(b)
+                b = next(theirs, None)
+            else:
+                yield a, self.get(a), other.get(b)
+                a, b = next(mine, None), next(theirs, None)
+
+
+    def _blocks_build(self, keys):
+        """Split sorted keys into blocks.
+
+
+        :param keys: The sorted keys.
+        :type keys: ~collections.abc.Sequence
+
+        """
+        size = self.BLOCK_SIZE // 2
+        self._blocks = [
+            keys[i:i + size] for i in range(0, len(keys), size)
+        ]
+        self._maxes = [block[-1] for block in self._blocks]
+
+
+    def _key_delete(self, key):
+        """Remove a key from the sorted blocks.
+
+
+        :param key: The key to be removed.
+        :type key: ~collections.abc.Hashable
+
+        """
+        i = bisect_left(self._maxes, key)
+        block = self._blocks[i]
+        del block[bisect_left(block, key)]
+
+        if block:
+            self._maxes[i] = block[-1]
+        else:
+            del self._blocks[i]
+            del self._maxes[i]
+
+
+    def _key_insert(self, key):
+        """Insert a new key into the sorted blocks.
+
+
+        :param key: The key to be inserted.
+        :type key: ~collections.abc.Hashable
+
+        """
+        blocks, maxes = self._blocks, self._maxes
+        if not blocks:
+            blocks.append([key])
+            maxes.append(key)
+            return
+
+        i = min(bisect_right(maxes, key), len(blocks) - 1)
+        block = blocks[i]
+        insort(block, key)
+        maxes[i] = block[-1]
+
+        if len(block) > self.BLOCK_SIZE:
+            half = len(block) // 2
+            blocks.insert(i + 1, block[half:])
+            maxes.insert(i + 1, block[-1])
+            del block[half:]
+            maxes[i] = block[-1]
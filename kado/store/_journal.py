@@ -0,0 +1,695 @@
+# kado/store/_journal.py
+# ======================
+#
+# Copying
+# -------
+#
+# Copyright (c) 2018 kado authors.
+#
+# This file is part of the *kado* project.
+#
+# kado is a free software project. You can redistribute it and/or
+# modify if under the terms of the MIT License.
+#
+# This software project is distributed *as is*, WITHOUT WARRANTY OF ANY
+# KIND; including but not limited to the WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE and NONINFRINGEMENT.
+#
+# You should have received a copy of the MIT License along with kado.
+# If not, see <http://opensource.org/licenses/MIT>.
+#
+import os
+import re
+import zlib
+import pickle
+import struct
+import threading
+
+from contextlib import suppress
+
+from kado.store._store import Index
+
+
+__all__ = [
+    'JournaledIndex',
+]
+
+
+#: Record header: payload length and checksum.
+_RECORD = struct.Struct('<II')
+
+#: Number of index keys written by snapshot record.
+_SNAPSHOT_BATCH = 4096
+
+#: Name pattern of the journal files, with their generation number.
+_FILE_RE = re.compile(r'^(snapshot|wal)-([0-9a-f]{16})$')
+
+#: Journaled index operations.
+_OP_ADD, _OP_ADD_MANY, _OP_REMOVE, _OP_DISCARD, _OP_DISCARD_MANY, _OP_CLEAR = (
+    range(6)
+)
+
+
+def _fsync_dir(path):
+    """Make the entries of a directory durable.
+
+
+    :param path: Path to the directory.
+    :type path: python:str
+
+    """
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _record_pack(obj):
+    """Serialize an object as a journal record.
+
+
+    :param obj: The object to be serialized.
+
+
+    :returns: The record.
+    :rtype: python:bytes
+
+    """
+    payload = pickle.dumps(obj, protocol=4)
+    return _RECORD.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _records_read(fp):
+    """Read back the records of a journal file, stopping at the first
+    incomplete or corrupted record.
+
+
+    :param fp: File object to read the records from.
+    :type fp: ~io.BufferedIOBase
+
+
+    :returns: An iterator over the record objects and their end offset.
+    :rtype: ~collections.abc.Iterator
+
+    """
+    end = fp.tell()
+    while True:
+        header = fp.read(_RECORD.size)
+        if len(header) < _RECORD.size:
+            return
+
+        length, crc = _RECORD.unpack(header)
+        payload = fp.read(length)
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            return
+
+        end += _RECORD.size + length
+        yield pickle.loads(payload), end
+
+
+class JournaledIndex(object):
+    """Index recording its changes in a write-ahead log, with the same
+    interface as :class:`~kado.store._store.Index`.
+
+    Changes are appended to the log of the current generation and are made
+    durable by :meth:`~kado.store._journal.JournaledIndex.commit`, concurrent
+    commits sharing a single ``fsync``. A checkpoint starts a new log
+    generation, then a background thread rebuilds the index of the retired
+    generations from their snapshot and logs and writes it as a new snapshot,
+    older generations being deleted once the snapshot is durable. Opening a
+    journal loads its latest snapshot and replays the logs written after it.
+
+    Journal files are trusted, their records being pickled.
+
+
+    :param path: Path to the journal directory, created when it does not exist.
+    :type path: python:str
+
+    :param factory: Callable returning the new empty index to be journaled,
+                    it is called again by checkpoints to rebuild snapshots.
+    :type factory: ~collections.abc.Callable
+
+    :param autocommit: Whether to commit each change as soon as it is logged.
+    :type autocommit: python:bool
+
+    :param checkpoint_records: Number of logged changes after which a
+                               checkpoint is started, ``0`` to disable
+                               automatic checkpoints.
+    :type checkpoint_records: python:int
+
+    """
+    __slots__ = (
+        '_checkpoint_lock', '_checkpointer', '_factory', '_gen', '_lock',
+        '_records', '_sync_lock', '_synced', '_wal', '_written', 'autocommit',
+        'checkpoint_records', 'index', 'path',
+    )
+
+
+    def __init__(self, path, factory=Index, autocommit=False,
+                 checkpoint_records=1 << 20):
+        """Constructor for :class:`kado.store.JournaledIndex`."""
+        self.path = path
+        self.index = factory()
+        self.autocommit = autocommit
+        self.checkpoint_records = checkpoint_records
+
+        self._factory = factory
+        self._checkpointer = None
+        self._checkpoint_lock = threading.Lock()   # Runs one checkpoint.
+        self._lock = threading.Lock()        # Orders the logged changes.
+        self._sync_lock = threading.Lock()   # Elects the committing thread.
+        self._records = 0
+        self._synced = 0
+        self._written = 0
+
+        os.makedirs(path, exist_ok=True)
+        self._recover()
+
+
+    def __contains__(self, key):
+        """Check if given key is present in the index.
+
+
+        :param key: Registered index key.
+        :type key: ~collections.abc.Hashable
+
+
+        :returns: Whether given key is defined in the index.
+        :rtype: python:bool
+
+        """
+        return key in self.index
+
+
+    def __enter__(self):
+        """Enter the runtime context of the index."""
+        return self
+
+
+    def __exit__(self, *exc_info):
+        """Close the journal when leaving the runtime context of the index."""
+        self.close()
+
+
+    def __len__(self):
+        """Return the number of keys within the index.
+
+
+        :returns: Number of keys stored in the index.
+        :rtype: python:int
+
+        """
+        return len(self.index)
+
+
+    def __iter__(self):
+        """Return and iterator over the stored index keys.
+
+
+        :returns: An iterator over the index key.
+        :rtype: ~collections.abc.Iterator
+
+        """
+        return iter(self.index)
+
+
+    def close(self):
+        """Wait for a running checkpoint, commit the logged changes and close
+        the journal.
+
+        """
+        if self._wal.closed:
+            return
+
+        with self._checkpoint_lock:
+            if self._checkpointer is not None:
+                self._checkpointer.join()
+
+        self.commit()
+        self._wal.close()
+
+
+    def commit(self):
+        """Make the logged changes durable.
+
+        Threads committing while a commit is in progress wait for it, and
+        only issue another ``fsync`` if their changes were logged after it
+        started.
+
+        """
+        with self._lock:
+            target = self._written
+
+        with self._sync_lock:
+            if self._synced >= target:
+                return
+
+            with self._lock:
+                self._wal.flush()
+                written = self._written
+
+            os.fsync(self._wal.fileno())
+            self._synced = written
+
+
+    def checkpoint(self, wait=True):
+        """Start a new log generation and write a snapshot of the index.
+
+        Changes are only held while the log is rotated, the snapshot is built
+        from the files of the retired generations without reading the live
+        index.
+
+
+        :param wait: Whether to wait for the snapshot to be written, else it is
+                     written by a background thread.
+        :type wait: python:bool
+
+        """
+        with self._checkpoint_lock:
+            if self._checkpointer is not None:
+                self._checkpointer.join()
+
+            with self._sync_lock, self._lock:
+                self._wal.flush()
+                os.fsync(self._wal.fileno())
+                self._synced = self._written
+                self._wal.close()
+
+                self._gen += 1
+                self._records = 0
+                self._wal = open(self._file_path('wal', self._gen), 'ab')
+
+                gen = self._gen
+
+            checkpointer = threading.Thread(
+                target=self._snapshot_write, args=(gen, ),
+                name='kado-checkpoint', daemon=True,
+            )
+            checkpointer.start()
+            self._checkpointer = checkpointer
+
+        if wait:
+            checkpointer.join()
+
+
+    def clear(self):
+        """Remove all entries from the index."""
+        self._apply(_OP_CLEAR)
+
+
+    def count(self, key=None):
+        """Get the number of entries registered with the index if a key is
+        specified, get the number of entries registered with this specific key.
+
+
+        :param key: Key mapping to the index entries.
+        :type key: ~collections.abc.Hashable
+
+
+        :returns: Number of entries registered within the index.
+        :rtype: python:int
+
+
+        :raises KeyError: When the key cannot be found in the index.
+
+        """
+        return self.index.count(key)
+
+
+    def get(self, key):
+        """Retrieve the entries registered under given key from the index.
+
+
+        :param key: Key mapping to the index entries.
+        :type key: ~collections.abc.Hashable
+
+
+        :returns: The entries matching given key.
+        :rtype: ~collections.abc.MutableSequence
+
+
+        :raises KeyError: When the key cannot be found in the index.
+
+        """
+        return self.index.get(key)
+
+
+    def view(self, key):
+        """Get a read-only view of the entries registered under given key.
+
+
+        :param key: Key mapping to the index entries.
+        :type key: ~collections.abc.Hashable
+
+
+        :returns: A set view of the entries matching given key.
+        :rtype: ~collections.abc.Set
+
+
+        :raises KeyError: When the key cannot be found in the index.
+
+        """
+        return self.index.view(key)
+
+
+    def itervalues(self, key):
+        """Return an iterator over the entries registered under given key.
+
+
+        :param key: Key mapping to the index entries.
+        :type key: ~collections.abc.Hashable
+
+
+        :returns: An iterator over the entries matching given key.
+        :rtype: ~collections.abc.Iterator
+
+
+        :raises KeyError: When the key cannot be found in the index.
+
+        """
+        return self.index.itervalues(key)
+
+
+    def add(self, key, value):
+        """Add an entry to the index.
+
+
+        :param key: Key to find back the entry in the index.
+        :type key: ~collections.abc.Hashable
+
+        :param value: Value of the index entry.
+        :type value: ~collections.abc.Hashable
+
+        """
+        self._apply(_OP_ADD, key, value)
+
+
+    def add_many(self, pairs):
+        """Add a batch of entries to the index, logged as a single change.
+
+
+        :param pairs: An iterable of key and value pairs.
+        :type pairs: ~collections.abc.Iterable
+
+
+        :returns: Number of entries which were not already in the index.
+        :rtype: python:int
+
+        """
+        return self._apply(_OP_ADD_MANY, list(pairs))
+
+
+    def remove(self, key, value=None):
+        """Remove an entry from the index.
+
+
+        :param key: Key to the entry to be removed from the index.
+        :type key: ~collections.abc.Hashable
+
+        :param value: Value of the entry.
+        :type value: ~collections.abc.Hashable
+
+
+        :raises KeyError: When the key cannot be found in the index.
+
+        :raises ValueError: When given value is not registered under given key.
+
+        """
+        self._apply(_OP_REMOVE, key, value)
+
+
+    def discard(self, key, value=None):
+        """Remove an entry from the index if present.
+
+
+        :param key: Key to the entry to be removed from the index.
+        :type key: ~collections.abc.Hashable
+
+        :param value: Value of the entry.
+        :type value: ~collections.abc.Hashable
+
+        """
+        self._apply(_OP_DISCARD, key, value)
+
+
+    def remove_many(self, pairs):
+        """Remove a batch of entries from the index.
+
+        Entries are removed in order, when an error is raised the entries
+        preceding the faulty one have already been removed.
+
+
+        :param pairs: An iterable of key and value pairs, a ``None`` value
+                      removes all the entries registered with the key.
+        :type pairs: ~collections.abc.Iterable
+
+
+        :raises KeyError: When a key cannot be found in the index.
+
+        :raises ValueError: When a value is not registered under its key.
+
+        """
+        for key, value in pairs:
+            self.remove(key, value)
+
+
+    def discard_many(self, pairs):
+        """Remove a batch of entries from the index if present, logged as a
+        single change.
+
+
+        :param pairs: An iterable of key and value pairs, a ``None`` value
+                      removes all the entries registered with the key.
+        :type pairs: ~collections.abc.Iterable
+
+        """
+        self._apply(_OP_DISCARD_MANY, list(pairs))
+
+
+    def contains_many(self, keys):
+        """Check the presence of a batch of keys in the index.
+
+
+        :param keys: An iterable of index keys.
+        :type keys: ~collections.abc.Iterable
+
+
+        :returns: Whether each key is defined in the index, in order.
+        :rtype: ~typing.List[python:bool]
+
+        """
+        return self.index.contains_many(keys)
+
+
+    def _apply(self, op, *args):
+        """Apply a change to the index and log it once applied.
+
+
+        :param op: The change operation.
+        :type op: python:int
+
+
+        :returns: The value returned by the index operation.
+
+        """
+        with self._lock:
+            result = self._replay(self.index, op, args)
+            self._wal.write(_record_pack((op, args)))
+            self._written += 1
+            self._records += 1
+            checkpoint = self._records == self.checkpoint_records
+
+        if self.autocommit:
+            self.commit()
+
+        if checkpoint:
+            self.checkpoint(wait=False)
+
+        return result
+
+
+    def _file_path(self, kind, gen):
+        """Get the path to a journal file.
+
+
+        :param kind: Kind of journal file, either ``snapshot`` or ``wal``.
+        :type kind: python:str
+
+        :param gen: Generation number of the journal file.
+        :type gen: python:int
+
+
+        :returns: Path to the journal file.
+        :rtype: python:str
+
+        """
+        return os.path.join(self.path, '{}-{:016x}'.format(kind, gen))
+
+
+    def _files(self, kind):
+        """Get the generation numbers of the journal files of given kind.
+
+
+        :param kind: Kind of journal file, either ``snapshot`` or ``wal``.
+        :type kind: python:str
+
+
+        :returns: The sorted generation numbers.
+        :rtype: ~typing.List[python:int]
+
+        """
+        gens = []
+        for name in os.listdir(self.path):
+            match = _FILE_RE.match(name)
+            if match and match.group(1) == kind:
+                gens.append(int(match.group(2), 16))
+
+        return sorted(gens)
+
+
+    def _load(self, index, stop=None, repair=False):
+        """Load the latest snapshot and replay the logs written after it into
+        given index.
+
+
+        :param index: The empty index to load the entries into.
+
+        :param stop: Generation number of the first log not to be replayed,
+                     all the logs are replayed when not given.
+        :type stop: python:int
+
+        :param repair: Whether to truncate the logs after their last complete
+                       record.
+        :type repair: python:bool
+
+
+        :returns: Generation number of the last loaded journal file.
+        :rtype: python:int
+
+
+        :raises ValueError: When the latest snapshot is corrupted.
+
+        """
+        snapshots = [
+            x for x in self._files('snapshot') if stop is None or x < stop
+        ]
+        last = snapshots[-1] if snapshots else 0
+
+        if snapshots:
+            with open(self._file_path('snapshot', last), 'rb') as fp:
+                for records, _ in _records_read(fp):
+                    if records is None:
+                        break
+                    index.add_many(
+                        (key, value) for key, values in records
+                        for value in values
+                    )
+                else:
+                    raise ValueError('truncated snapshot: {}.'.format(
+                        self._file_path('snapshot', last)
+                    ))
+
+        for gen in self._files('wal'):
+            if gen < last or (stop is not None and gen >= stop):
+                continue
+
+            mode = 'r+b' if repair else 'rb'
+            with open(self._file_path('wal', gen), mode) as fp:
+                end = 0
+                for (op, args), end in _records_read(fp):
+                    self._replay(index, op, args)
+                if repair:
+                    fp.truncate(end)
+            last = gen
+
+        return last
+
+
+    def _recover(self):
+        """Load the latest snapshot and replay the logs written after it.
+
+        Logs are truncated after their last complete record.
+
+
+        :raises ValueError: When the latest snapshot is corrupted.
+
+        """
+        self._gen = self._load(self.index, repair=True)
+
+        for name in os.listdir(self.path):
+            if name.endswith('.tmp'):
+                os.remove(os.path.join(self.path, name))
+
+        self._wal = open(self._file_path('wal', self._gen), 'ab')
+
+
+    @staticmethod
+    def _replay(index, op, args):
+        """Apply a logged change to given index.
+
+
+        :param index: The index to apply the change to.
+
+        :param op: The change operation.
+        :type op: python:int
+
+        :param args: Arguments of the change operation.
+        :type args: python:tuple
+
+
+        :returns: The value returned by the index operation.
+
+        """
+        if op == _OP_ADD:
+            return index.add(*args)
+        elif op == _OP_ADD_MANY:
+            return index.add_many(*args)
+        elif op == _OP_REMOVE:
+            return index.remove(*args)
+        elif op == _OP_DISCARD:
+            return index.discard(*args)
+        elif op == _OP_DISCARD_MANY:
+            return index.discard_many(*args)
+        elif op == _OP_CLEAR:
+            return index.clear()
+        else:
+            raise ValueError('unknown journal operation: {}.'.format(op))
+
+
+    def _snapshot_write(self, gen):
+        """Write a snapshot of the generations retired before given one and
+        delete the journal files it supersedes.
+
+        The index is rebuilt from the files of the retired generations, which
+        are no longer written to.
+
+
+        :param gen: Generation number of the snapshot.
+        :type gen: python:int
+
+        """
+        index = self._factory()
+        self._load(index, stop=gen)
+        entries = [(key, index.get(key)) for key in index]
+
+        path = self._file_path('snapshot', gen)
+        with open(path + '.tmp', 'wb') as fp:
+            for start in range(0, len(entries), _SNAPSHOT_BATCH):
+                fp.write(_record_pack(entries[start:start + _SNAPSHOT_BATCH]))
+            # An end marker tells complete snapshots apart.
+            fp.write(_record_pack(None))
+            fp.flush()
+            os.fsync(fp.fileno())
+
+        os.replace(path + '.tmp', path)
+        _fsync_dir(self.path)
+
+        for kind in ('snapshot', 'wal'):
+            for old in self._files(kind):
+                if old < gen:
+                    with suppress(FileNotFoundError):
+                        os.remove(self._file_path(kind, old))
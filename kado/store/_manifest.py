@@ -0,0 +1,240 @@
+# kado/store/_manifest.py
+# =======================
+#
+# Copying
+# -------
+#
+# Copyright (c) 2018 kado authors.
+#
+# This file is part of the *kado* project.
+#
+# kado is a free software project. You can redistribute it and/or
+# modify if under the terms of the MIT License.
+#
+# This software project is distributed *as is*, WITHOUT WARRANTY OF ANY
+# KIND; including but not limited to the WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE and NONINFRINGEMENT.
+#
+# You should have received a copy of the MIT License along with kado.
+# If not, see <http://opensource.org/licenses/MIT>.
+#
+import sys
+import uuid
+import array
+import struct
+
+from kado import constants as c
+
+
+__all__ = [
+    'Manifest',
+]
+
+
+#: Length of a chunk identifier in bytes.
+ID_LEN = c.UUID_LEN // 2
+
+#: Serialized manifest header: the number of chunk references.
+_HEADER = struct.Struct('<Q')
+
+
+class Manifest(object):
+    """Compact list of the chunks composing an item.
+
+    Chunk references are packed in arrays, 16 bytes for the chunk identifier
+    and 8 bytes for its length, the chunks' payload being resolved through a
+    store when needed.
+
+
+    :param iterable: An iterable of chunk identifier and length pairs to
+                     initialize the manifest with.
+    :type iterable: ~collections.abc.Iterable
+
+    """
+    __slots__ = ('_ids', '_lengths')
+
+
+    def __init__(self, iterable=None):
+        """Constructor for :class:`kado.store.Manifest`."""
+        self._ids = bytearray()
+        self._lengths = array.array('Q')
+
+        if iterable is not None:
+            self.extend(iterable)
+
+
+    def __eq__(self, other):
+        """Compare this manifest with another one.
+
+
+        :param other: The other manifest to compare with.
+        :type other: ~kado.store._manifest.Manifest
+
+
+        :returns: Whether both manifests reference the same chunks.
+        :rtype: python:bool
+
+        """
+        if not isinstance(other, Manifest):
+            return NotImplemented
+        return self._ids == other._ids and self._lengths == other._lengths
+
+
+    def __getitem__(self, i):
+        """Get the chunk reference at given index.
+
+
+        :param i: Index of the chunk reference.
+        :type i: python:int
+
+
+        :returns: The chunk identifier and length pair.
+        :rtype: ~typing.Tuple[~uuid.UUID, python:int]
+
+
+        :raises IndexError: When given index is out of range.
+
+        """
+        length = self._lengths[i]
+        if i < 0:
+            i += len(self)
+
+        key = bytes(self._ids[i * ID_LEN:(i + 1) * ID_LEN])
+        return uuid.UUID(bytes=key), length
+
+
+    def __iter__(self):
+        """Return an iterator over the chunk references.
+
+
+        :returns: An iterator over chunk identifier and length pairs.
+        :rtype: ~collections.abc.Iterator
+
+        """
+        return zip(self.ids(), self._lengths)
+
+
+    def __len__(self):
+        """Return the number of chunk references within the manifest.
+
+
+        :returns: Number of chunk references.
+        :rtype: python:int
+
+        """
+        return len(self._lengths)
+
+
+    @property
+    def size(self):
+        """Get the bytes length of the item described by the manifest."""
+        return sum(self._lengths)
+
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Load a manifest from its serialized form.
+
+
+        :param data: Serialized manifest as given by
+                     :meth:`~kado.store._manifest.Manifest.to_bytes`.
+        :type data: python:bytes
+
+
+        :returns: The loaded manifest.
+        :rtype: ~kado.store._manifest.Manifest
+
+
+        :raises ValueError: When data is not a valid serialized manifest.
+
+        """
+        view = memoryview(data).cast('B')
+        try:
+            count, = _HEADER.unpack_from(view)
+        except struct.error:
+            raise ValueError('truncated manifest header.') from None
+
+        ids_end = _HEADER.size + count * ID_LEN
+        if len(view) != ids_end + count * 8:
+            raise ValueError('invalid manifest length: {}.'.format(len(view)))
+
+        obj = cls()
+        obj._ids[:] = view[_HEADER.size:ids_end]
+        obj._lengths.frombytes(view[ids_end:])
+        if sys.byteorder != 'little':
+            obj._lengths.byteswap()
+
+        return obj
+
+
+    def append(self, key, length):
+        """Add a chunk reference at the end of the manifest.
+
+
+        :param key: Identifier of the chunk.
+        :type key: ~uuid.UUID
+
+        :param length: Length of the chunk's payload.
+        :type length: python:int
+
+        """
+        self._ids += key.bytes
+        self._lengths.append(length)
+
+
+    def extend(self, iterable):
+        """Add chunk references at the end of the manifest.
+
+
+        :param iterable: An iterable of chunk identifier and length pairs.
+        :type iterable: ~collections.abc.Iterable
+
+        """
+        for key, length in iterable:
+            self.append(key, length)
+
+
+    def ids(self):
+        """Return an iterator over the referenced chunk identifiers.
+
+
+        :returns: An iterator over the chunk identifiers.
+        :rtype: ~collections.abc.Iterator
+
+        """
+        ids = bytes(self._ids)
+        for start in range(0, len(ids), ID_LEN):
+            yield uuid.UUID(bytes=ids[start:start + ID_LEN])
+
+
+    def read(self, store):
+        """Return an iterator over the referenced chunks' payload, fetched one
+        after the other from given store.
+
+
+        :param store: Chunk store, any object with a ``get`` method returning a
+                      chunk's payload from its identifier.
+
+
+        :returns: An iterator over the chunks' payload.
+        :rtype: ~collections.abc.Iterator
+
+        """
+        for key in self.ids():
+            yield store.get(key)
+
+
+    def to_bytes(self):
+        """Serialize the manifest.
+
+
+        :returns: The serialized manifest.
+        :rtype: python:bytes
+
+        """
+        lengths = self._lengths
+        if sys.byteorder != 'little':
+            lengths = array.array('Q', lengths)
+            lengths.byteswap()
+
+        return b''.join([_HEADER.pack(len(self)), self._ids, lengths])
@@ -0,0 +1,674 @@
+# kado/store/_pack.py
+# ===================
+#
+# Copying
+# -------
+#
+# Copyright (c) 2018 kado authors.
+#
+# This file is part of the *kado* project.
+#
+# kado is a free software project. You can redistribute it and/or
+# modify if under the terms of the MIT License.
+#
+# This software project is distributed *as is*, WITHOUT WARRANTY OF ANY
+# KIND; including but not limited to the WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE and NONINFRINGEMENT.
+#
+# You should have received a copy of the MIT License along with kado.
+# If not, see <http://opensource.org/licenses/MIT>.
+#
+import os
+import re
+import mmap
+import uuid
+import zlib
+import struct
+import threading
+
+from collections import OrderedDict, namedtuple
+
+from kado.store._journal import _fsync_dir
+from kado.store._store import Index
+from kado.utils import compress
+
+
+__all__ = [
+    'Location',
+    'PackStore',
+]
+
+
+#: Record header: chunk identifier, stored payload length, stored payload
+#: checksum and payload codec.
+_RECORD = struct.Struct('<16sQIB')
+
+#: Name pattern of the pack files, with their number.
+_PACK_RE = re.compile(r'^([0-9a-f]{8})\.pack$')
+
+#: Size of the pack files write buffer.
+_WRITE_BUFFER = 1 << 20
+
+#: Maximum number of buffers given to a single ``writev`` call.
+_IOV_MAX = 1024
+
+
+#: Position of a chunk's payload within a pack store, along the codec it was
+#: stored with.
+Location = namedtuple('Location', ['pack', 'offset', 'length', 'codec'])
+Location.__new__.__defaults__ = (compress.NONE, )
+
+
+def _pread(fd, size, offset):
+    """Read from a file descriptor at given offset, without changing its
+    position so that it may be shared between threads.
+
+
+    :param fd: The file descriptor.
+    :type fd: python:int
+
+    :param size: Number of bytes to read.
+    :type size: python:int
+
+    :param offset: Position to read from.
+    :type offset: python:int
+
+
+    :returns: The read bytes, shorter than requested at the end of the file.
+    :rtype: python:bytes
+
+    """
+    chunks = []
+    while size:
+        data = os.pread(fd, size, offset)
+        if not data:
+            break
+
+        chunks.append(data)
+        size -= len(data)
+        offset += len(data)
+
+    return b''.join(chunks)
+
+
+class PackStore(object):
+    """Chunk store appending the chunks' payload to large pack files.
+
+    Each record of a pack file is made of a header, with the chunk
+    identifier, length, checksum and codec, followed by the payload, which is
+    compressed unless it does not shrink from it. Packs are
+    written sequentially, a new pack being started once the current one
+    reached its maximum size. The location of each payload is kept in an
+    index, rebuilt from the record headers of the packs when the store is
+    opened. Only the records of the last pack, the one written to, are
+    checked and the pack truncated after the last valid one.
+
+    Uncompressed payloads may be read without copy from memory mapped packs,
+    the most recently used mappings being kept open.
+
+    The store may be shared between threads, writes being serialized while
+    reads are positional and run concurrently. Records are checked against
+    their checksum when read.
+
+
+    :param path: Path to the store directory, created when it does not exist.
+    :type path: python:str
+
+    :param pack_size: Size above which a new pack file is started.
+    :type pack_size: python:int
+
+    :param max_maps: Maximum number of pack files kept mapped in memory.
+    :type max_maps: python:int
+
+    :param codec: Identifier of the codec new payloads are compressed with,
+                  from :mod:`kado.utils.compress`.
+    :type codec: python:int
+
+
+    :raises ValueError: When the codec is not available.
+
+    """
+    __slots__ = (
+        '_lock', '_maps', '_pack', '_readers', '_writer', 'codec', 'index',
+        'max_maps', 'pack_size', 'path',
+    )
+
+
+    def __init__(self, path, pack_size=512 << 20, max_maps=64,
+                 codec=compress.NONE):
+        """Constructor for :class:`kado.store.PackStore`."""
+        if not compress.available(codec):
+            raise ValueError('unavailable codec: {}.'.format(codec))
+
+        self.codec = codec
+        self.path = path
+        self.pack_size = pack_size
+        self.max_maps = max_maps
+        self.index = Index()
+
+        self._lock = threading.RLock()    # Guards the pack files state.
+        self._maps = OrderedDict()
+        self._pack = 0
+        self._readers = {}
+        self._writer = None
+
+        os.makedirs(path, exist_ok=True)
+        self._scan()
+
+
+    def __contains__(self, key):
+        """Check if a chunk is stored.
+
+
+        :param key: Identifier of the chunk.
+        :type key: ~uuid.UUID
+
+
+        :returns: Whether the chunk is stored.
+        :rtype: python:bool
+
+        """
+        return key in self.index
+
+
+    def __enter__(self):
+        """Enter the runtime context of the store."""
+        return self
+
+
+    def __exit__(self, *exc_info):
+        """Close the store when leaving its runtime context."""
+        self.close()
+
+
+    def __len__(self):
+        """Return the number of stored chunks.
+
+
+        :returns: Number of stored chunks.
+        :rtype: python:int
+
+        """
+        return len(self.index)
+
+
+    def close(self):
+        """Flush the current pack and close the pack files.
+
+        Memory mappings are released, they are closed once the last view on
+        them is gone.
+
+        """
+        with self._lock:
+            self.flush()
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+            for fd in self._readers.values():
+                os.close(fd)
+            self._readers.clear()
+            self._maps.clear()
+
+
+    def flush(self):
+        """Write the buffered records of the current pack to disk."""
+        with self._lock:
+            if self._writer is not None:
+                self._writer.flush()
+                getattr(os, 'fdatasync', os.fsync)(self._writer.fileno())
+
+
+    def get(self, key):
+        """Read a chunk's payload.
+
+
+        :param key: Identifier of the chunk, or location of its payload.
+        :type key: ~uuid.UUID or ~kado.store._pack.Location
+
+
+        :returns: The chunk's payload.
+        :rtype: python:bytes
+
+
+        :raises KeyError: When the chunk is not stored.
+
+        :raises ValueError: When the record does not match its checksum.
+
+        """
+        loc = key if isinstance(key, Location) else self.locate(key)
+
+        fd = self._reader(loc.pack)
+        start = loc.offset - _RECORD.size
+        record = _pread(fd, _RECORD.size + loc.length, start)
+
+        data = self._record_check(loc, record)
+        return compress.decompress(data, loc.codec)
+
+
+    def locate(self, key):
+        """Get the location of a chunk's payload.
+
+
+        :param key: Identifier of the chunk.
+        :type key: ~uuid.UUID
+
+
+        :returns: Location of the chunk's payload.
+        :rtype: ~kado.store._pack.Location
+
+
+        :raises KeyError: When the chunk is not stored.
+
+        """
+        return next(self.index.itervalues(key))
+
+
+    def put(self, chunk):
+        """Store a chunk unless it is already stored.
+
+
+        :param chunk: The chunk to be stored.
+        :type chunk: ~kado.store._store.Chunk
+
+
+        :returns: Location of the chunk's payload.
+        :rtype: ~kado.store._pack.Location
+
+        """
+        key = chunk.id
+        if key in self.index:
+            return self.locate(key)
+
+        codec, data = compress.pack(chunk.view(), self.codec)
+        header = _RECORD.pack(key.bytes, len(data), zlib.crc32(data), codec)
+
+        with self._lock:
+            if key in self.index:
+                return self.locate(key)
+
+            fp = self._writable(len(header) + len(data))
+            offset = fp.tell() + len(header)
+            fp.write(header)
+            fp.write(data)
+
+            loc = Location(self._pack, offset, len(data), codec)
+            self.index.add(key, loc)
+
+        return loc
+
+
+    def put_many(self, chunks):
+        """Store a batch of chunks, the records of each pack being written
+        with a single system call.
+
+        Records are written directly to the pack file, the batch is durable
+        once the store is flushed.
+
+
+        :param chunks: An iterable of the chunks to be stored.
+        :type chunks: ~collections.abc.Iterable
+
+
+        :returns: Location of each chunk's payload, in order.
+        :rtype: ~typing.List[~kado.store._pack.Location]
+
+        """
+        with self._lock:
+            return self._put_many(chunks)
+
+
+    def view(self, key):
+        """Get a chunk's payload from the memory mapped pack, without copying
+        it unless the payload is compressed.
+
+        The view remains valid after the mapping was evicted from the store or
+        the store was closed.
+
+
+        :param key: Identifier of the chunk, or location of its payload.
+        :type key: ~uuid.UUID or ~kado.store._pack.Location
+
+
+        :returns: A read-only view over the chunk's payload.
+        :rtype: python:memoryview
+
+
+        :raises KeyError: When the chunk is not stored.
+
+        :raises ValueError: When the record does not match its checksum.
+
+        """
+        loc = key if isinstance(key, Location) else self.locate(key)
+        start = loc.offset - _RECORD.size
+        end = loc.offset + loc.length
+
+        record = memoryview(self._map(loc.pack, end))[start:end]
+        view = self._record_check(loc, record)
+        if loc.codec != compress.NONE:
+            view = memoryview(compress.decompress(view, loc.codec))
+
+        return view
+
+
+    def _put_many(self, chunks):
+        """Store a batch of chunks, with the pack files lock held.
+
+
+        :param chunks: An iterable of the chunks to be stored.
+        :type chunks: ~collections.abc.Iterable
+
+
+        :returns: Location of each chunk's payload, in order.
+        :rtype: ~typing.List[~kado.store._pack.Location]
+
+        """
+        locations = []
+        added = {}      # Locations of the chunks new to the store.
+        buffers = []
+
+        fp = self._writable(0)
+        fp.flush()
+        end = fp.tell()
+
+        for chunk in chunks:
+            key = chunk.id
+            loc = added.get(key)
+            if loc is None and key in self.index:
+                loc = self.locate(key)
+
+            if loc is None:
+                codec, data = compress.pack(chunk.view(), self.codec)
+                header = _RECORD.pack(
+                    key.bytes, len(data), zlib.crc32(data), codec
+                )
+
+                size = len(header) + len(data)
+                if end and end + size > self.pack_size:
+                    self._writev(fp, buffers)
+                    buffers = []
+
+                    fp = self._writable(size)
+                    end = fp.tell()
+
+                loc = Location(self._pack, end + len(header), len(data), codec)
+                added[key] = loc
+                buffers += [header, data]
+                end += size
+
+            locations.append(loc)
+
+        self._writev(fp, buffers)
+        for key, loc in added.items():
+            self.index.add(key, loc)
+
+        return locations
+
+
+    def _map(self, pack, size):
+        """Get the memory mapping of a pack, mapping it if needed.
+
+
+        :param pack: Number of the pack.
+        :type pack: python:int
+
+        :param size: Minimum size of the mapping.
+        :type size: python:int
+
+
+        :returns: A read-only memory mapping of the pack file.
+        :rtype: ~mmap.mmap
+
+        """
+        with self._lock:
+            maps = self._maps
+            mm = maps.get(pack)
+
+            if mm is not None and len(mm) >= size:
+                maps.move_to_end(pack)
+                return mm
+
+            if pack == self._pack and self._writer is not None:
+                # The record may still be in the write buffer.
+                self._writer.flush()
+
+            with open(self._pack_path(pack), 'rb') as fp:
+                mm = maps[pack] = mmap.mmap(
+                    fp.fileno(), 0, access=mmap.ACCESS_READ
+                )
+            maps.move_to_end(pack)
+
+            # Evicted mappings are not closed, live views may still use them.
+            while len(maps) > self.max_maps:
+                maps.popitem(last=False)
+
+        return mm
+
+
+    def _pack_path(self, pack):
+        """Get the path to a pack file.
+
+
+        :param pack: Number of the pack.
+        :type pack: python:int
+
+
+        :returns: Path to the pack file.
+        :rtype: python:str
+
+        """
+        return os.path.join(self.path, '{:08x}.pack'.format(pack))
+
+
+    def _reader(self, pack):
+        """Get a file descriptor to read from a pack, the records of the pack
+        being written out of the write buffer.
+
+
+        :param pack: Number of the pack.
+        :type pack: python:int
+
+
+        :returns: A file descriptor opened for positional reads.
+        :rtype: python:int
+
+        """
+        with self._lock:
+            if pack == self._pack and self._writer is not None:
+                # The record may still be in the write buffer.
+                self._writer.flush()
+
+            fd = self._readers.get(pack)
+            if fd is None:
+                fd = self._readers[pack] = os.open(
+                    self._pack_path(pack), os.O_RDONLY
+                )
+
+        return fd
+
+
+    @staticmethod
+    def _record_check(loc, record):
+        """Check a record read back from a pack against its header.
+
+
+        :param loc: Location of the record's payload.
+        :type loc: ~kado.store._pack.Location
+
+        :param record: The record header followed by the stored payload.
+        :type record: python:bytes | python:memoryview
+
+
+        :returns: The stored payload.
+        :rtype: python:bytes | python:memoryview
+
+
+        :raises ValueError: When the record does not match its checksum.
+
+        """
+        data = record[_RECORD.size:]
+        if len(data) == loc.length:
+            _, length, crc, codec = _RECORD.unpack_from(record)
+            header = (length, codec) == (loc.length, loc.codec)
+            if header and zlib.crc32(data) == crc:
+                return data
+
+        raise ValueError('corrupted record in pack {} at offset {}.'.format(
+            loc.pack, loc.offset
+        ))
+
+
+    def _scan(self):
+        """Rebuild the index from the record headers of the pack files.
+
+        Sealed packs are opened read-only and walked from header to header,
+        the last pack is truncated after its last valid record.
+
+        """
+        packs = sorted(
+            int(m.group(1), 16)
+            for m in map(_PACK_RE.match, os.listdir(self.path)) if m
+        )
+
+        for pack in packs:
+            path = self._pack_path(pack)
+            last = pack == packs[-1]
+
+            with open(path, 'rb', buffering=0) as fp:
+                size = os.fstat(fp.fileno()).st_size
+                end = self._records_scan(pack, fp, size, check=last)
+
+            if last and end < size:
+                os.truncate(path, end)
+
+        if packs:
+            self._pack = packs[-1]
+
+
+    def _records_scan(self, pack, fp, size, check=False):
+        """Index the records of a pack, up to the first incomplete one.
+
+
+        :param pack: Number of the pack.
+        :type pack: python:int
+
+        :param fp: File object of the pack, at its beginning.
+        :type fp: ~io.FileIO
+
+        :param size: Size of the pack file.
+        :type size: python:int
+
+        :param check: Whether to read the payloads and stop at the first one
+                      not matching its checksum, else payloads are skipped.
+        :type check: python:bool
+
+
+        :returns: End offset of the last indexed record.
+        :rtype: python:int
+
+        """
+        end = 0
+        while True:
+            header = fp.read(_RECORD.size)
+            if len(header) < _RECORD.size:
+                break
+
+            key, length, crc, codec = _RECORD.unpack(header)
+            if end + _RECORD.size + length > size:
+                break
+
+            if check:
+                if zlib.crc32(fp.read(length)) != crc:
+                    break
+            else:
+                fp.seek(length, os.SEEK_CUR)
+
+            self.index.add(
+                uuid.UUID(bytes=key),
+                Location(pack, end + _RECORD.size, length, codec)
+            )
+            end += _RECORD.size + length
+
+        return end
+
+
+    @staticmethod
+    def _writev(fp, buffers):
+        """Write buffers at the end of a pack file.
+
+
+        :param fp: File object of the pack, with an empty write buffer.
+        :type fp: ~io.BufferedWriter
+
+        :param buffers: The buffers to be written, in order.
+        :type buffers: ~typing.List[python:bytes]
+
+        """
+        if not hasattr(os, 'writev'):
+            fp.write(b''.join(buffers))
+            fp.flush()
+            return
+
+        fd = fp.fileno()
+        buffers = [memoryview(x) for x in buffers]
+
+        i = 0
+        while i < len(buffers):
+            written = os.writev(fd, buffers[i:i + _IOV_MAX])
+
+            # Skip what was written, the last buffer may be partially written.
+            while i < len(buffers) and written >= len(buffers[i]):
+                written -= len(buffers[i])
+                i += 1
+            if written:
+                buffers[i] = buffers[i][written:]
+
+
+    def _writable(self, size):
+        """Get the file object of the current pack, starting a new pack if the
+        record would not fit in.
+
+
+        :param size: Size of the record to be written.
+        :type size: python:int
+
+
+        :returns: A file object opened for appending.
+        :rtype: ~io.BufferedWriter
+
+        """
+        fp = self._writer
+        if fp is None:
+            fp = self._writer = self._pack_open(self._pack)
+
+        if fp.tell() and fp.tell() + size > self.pack_size:
+            self.flush()
+            fp.close()
+
+            self._pack += 1
+            fp = self._writer = self._pack_open(self._pack)
+
+        return fp
+
+
+    def _pack_open(self, pack):
+        """Open a pack file for appending, creating it when it does not exist.
+
+        A new pack file is made durable in the store directory before any
+        record is written to it, so that flushed records are not lost along
+        with the file entry.
+
+
+        :param pack: Number of the pack.
+        :type pack: python:int
+
+
+        :returns: A file object opened for appending.
+        :rtype: ~io.BufferedWriter
+
+        """
+        fp = open(self._pack_path(pack), 'ab', buffering=_WRITE_BUFFER)
+        if not fp.tell():
+            _fsync_dir(self.path)
+
+        return fp
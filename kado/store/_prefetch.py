@@ -0,0 +1,143 @@
+# kado/store/_prefetch.py
+# =======================
+#
+# Copying
+# -------
+#
+# Copyright (c) 2018 kado authors.
+#
+# This file is part of the *kado* project.
+#
+# kado is a free software project. You can redistribute it and/or
+# modify if under the terms of the MIT License.
+#
+# This software project is distributed *as is*, WITHOUT WARRANTY OF ANY
+# KIND; including but not limited to the WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE and NONINFRINGEMENT.
+#
+# You should have received a copy of the MIT License along with kado.
+# If not, see <http://opensource.org/licenses/MIT>.
+#
+from itertools import islice
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+__all__ = [
+    'Prefetcher',
+]
+
+
+class Prefetcher(object):
+    """Read chunks' payload in order while fetching the following ones from
+    the store on a pool of threads.
+
+    The number of chunks fetched ahead adapts to the pace of the consumer: it
+    doubles whenever the consumer has to wait for a payload, and shrinks by
+    one after a run of payloads which were ready in time.
+
+    Items built from a manifest read ahead through a prefetcher when opened
+    with :meth:`Item.open(prefetcher=...) <kado.store._store.Item.open>`, each
+    chunk being fetched from the store its handle refers to.
+
+
+    :param store: Chunk store, any thread-safe object with a ``get`` method
+                  returning a chunk's payload from its identifier, such as
+                  :class:`~kado.store._pack.PackStore`.
+
+    :param workers: Number of fetching threads.
+    :type workers: python:int
+
+    :param window: Initial number of chunks fetched ahead.
+    :type window: python:int
+
+    :param max_window: Maximum number of chunks fetched ahead.
+    :type max_window: python:int
+
+    """
+    __slots__ = ('_executor', 'max_window', 'min_window', 'store', 'window')
+
+    #: Number of payloads ready in time after which the window shrinks.
+    SHRINK_AFTER = 16
+
+
+    def __init__(self, store, workers=4, window=4, max_window=64):
+        """Constructor for :class:`kado.store.Prefetcher`."""
+        self.store = store
+        self.window = window
+        self.min_window = 1
+        self.max_window = max_window
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='kado-prefetch'
+        )
+
+
+    def __enter__(self):
+        """Enter the runtime context of the prefetcher."""
+        return self
+
+
+    def __exit__(self, *exc_info):
+        """Stop the fetching threads when leaving the runtime context."""
+        self.close()
+
+
+    def close(self):
+        """Stop the fetching threads once the pending fetches are done."""
+        self._executor.shutdown(wait=True)
+
+
+    def read(self, keys, fetch=None):
+        """Return an iterator over the payloads of given chunks, in order.
+
+        Pending fetches are cancelled when the iterator is closed before its
+        end.
+
+
+        :param keys: Chunk identifiers in reading order, such as given by
+                     :meth:`~kado.store._manifest.Manifest.ids`.
+        :type keys: ~collections.abc.Iterable
+
+        :param fetch: Callable returning a chunk's payload from its key, the
+                      payloads are fetched from the prefetcher's store when
+                      not given.
+        :type fetch: ~collections.abc.Callable
+
+
+        :returns: An iterator over the chunks' payload.
+        :rtype: ~collections.abc.Iterator
+
+
+        :raises KeyError: When a chunk cannot be found in the store.
+
+        """
+        keys = iter(keys)
+        fetch = self.store.get if fetch is None else fetch
+        pending = deque()
+        in_time = 0
+
+        def fill():
+            for key in islice(keys, max(0, self.window - len(pending))):
+                pending.append(self._executor.submit(fetch, key))
+
+        try:
+            fill()
+            while pending:
+                future = pending.popleft()
+
+                if future.done():
+                    in_time += 1
+                    if in_time >= self.SHRINK_AFTER:
+                        self.window = max(self.min_window, self.window - 1)
+                        in_time = 0
+                else:
+                    # The consumer is waiting, fetch further ahead.
+                    self.window = min(self.max_window, self.window * 2)
+                    in_time = 0
+
+                fill()
+                yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
@@ -18,32 +18,105 @@
 # You should have received a copy of the MIT License along with kado.
 # If not, see <http://opensource.org/licenses/MIT>.
 #
+import io
 import uuid
+import bisect
+import weakref
 
+from itertools import accumulate
 from contextlib import suppress
+from collections.abc import Set
 
 from kado import constants as c
 from kado.store import mixin
+from kado.store._manifest import Manifest
 from kado.utils import ghash, htree
 
 
 __all__ = [
     'Chunk',
+    'ChunkHandle',
+    'ChunkRegistry',
     'Index',
+    'IndexView',
     'Item',
+    'ItemReader',
 ]
 
 
+class IndexView(Set):
+    """Read-only set view over the values registered under an index key.
+
+    The view reflects changes made to the values of the key for as long as
+    the key remains in the index.
+
+
+    :param values: The values registered under the key.
+    :type values: python:set
+
+    """
+    __slots__ = ('_values', )
+
+
+    def __init__(self, values):
+        """Constructor for :class:`kado.store.IndexView`."""
+        self._values = values
+
+
+    def __contains__(self, value):
+        """Check if given value is registered under the key.
+
+
+        :param value: Value of the index entry.
+        :type value: ~collections.abc.Hashable
+
+
+        :returns: Whether given value is part of the view.
+        :rtype: python:bool
+
+        """
+        return value in self._values
+
+
+    def __iter__(self):
+        """Return an iterator over the values.
+
+
+        :returns: An iterator over the values.
+        :rtype: ~collections.abc.Iterator
+
+        """
+        return iter(self._values)
+
+
+    def __len__(self):
+        """Return the number of values registered under the key.
+
+
+        :returns: Number of values in the view.
+        :rtype: python:int
+
+        """
+        return len(self._values)
+
+
+    @classmethod
+    def _from_iterable(cls, it):
+        """Build the result of set operations as a regular set."""
+        return set(it)
+
+
 class Index(object):
     """Store associative data structure in which a key can map to one or
     multiple values.
 
     """
-    __slots__ = ('_mapping', )
+    __slots__ = ('_count', '_mapping')
 
 
     def __init__(self):
         """Constructor for :class:`kado.store.Index`."""
+        self._count = 0       # Total number of entries.
         self._mapping = {}
 
 
@@ -94,6 +167,7 @@ class Index(object):
 
         """
         self._mapping.clear()
+        self._count = 0
 
 
     def count(self, key=None):
@@ -113,7 +187,7 @@ class Index(object):
 
         """
         if key is None:
-            return sum(len(x) for x in self._mapping.values())
+            return self._count
         else:
             return len(self._mapping[key])
 
@@ -136,6 +210,43 @@ class Index(object):
         return [x for x in self._mapping[key]]
 
 
+    def view(self, key):
+        """Get a read-only view of the entries registered under given key,
+        without copying them.
+
+
+        :param key: Key mapping to the index entries.
+        :type key: ~collections.abc.Hashable
+
+
+        :returns: A set view of the entries matching given key.
+        :rtype: ~kado.store._store.IndexView
+
+
+        :raises KeyError: When the key cannot be found in the index.
+
+        """
+        return IndexView(self._mapping[key])
+
+
+    def itervalues(self, key):
+        """Return an iterator over the entries registered under given key.
+
+
+        :param key: Key mapping to the index entries.
+        :type key: ~collections.abc.Hashable
+
+
+        :returns: An iterator over the entries matching given key.
+        :rtype: ~collections.abc.Iterator
+
+
+        :raises KeyError: When the key cannot be found in the index.
+
+        """
+        return iter(self._mapping[key])
+
+
     def add(self, key, value):
         """Add an entry to the index.
 
@@ -147,7 +258,41 @@ class Index(object):
         :type value: ~collections.abc.Hashable
 
         """
-        self._mapping.setdefault(key, set()).add(value)
+        st = self._mapping.get(key)
+        if st is None:
+            self._mapping[key] = {value}
+            self._count += 1
+        elif value not in st:
+            st.add(value)
+            self._count += 1
+
+
+    def add_many(self, pairs):
+        """Add a batch of entries to the index.
+
+
+        :param pairs: An iterable of key and value pairs.
+        :type pairs: ~collections.abc.Iterable
+
+
+        :returns: Number of entries which were not already in the index.
+        :rtype: python:int
+
+        """
+        mapping = self._mapping
+        count = 0
+
+        for key, value in pairs:
+            st = mapping.get(key)
+            if st is None:
+                mapping[key] = {value}
+                count += 1
+            elif value not in st:
+                st.add(value)
+                count += 1
+
+        self._count += count
+        return count
 
 
     def remove(self, key, value=None):
@@ -167,7 +312,7 @@ class Index(object):
 
         """
         if value is None:
-            del self._mapping[key]
+            self._count -= len(self._mapping.pop(key))
         else:
             st = self._mapping[key]
             try:
@@ -175,6 +320,7 @@ class Index(object):
             except KeyError:
                 raise ValueError(key, value)
 
+            self._count -= 1
             if not len(st):
                 del self._mapping[key]
 
@@ -194,21 +340,114 @@ class Index(object):
             self.remove(key, value)
 
 
+    def remove_many(self, pairs):
+        """Remove a batch of entries from the index.
+
+        Entries are removed in order, when an error is raised the entries
+        preceding the faulty one have already been removed.
+
+
+        :param pairs: An iterable of key and value pairs, a ``None`` value
+                      removes all the entries registered with the key.
+        :type pairs: ~collections.abc.Iterable
+
+
+        :raises KeyError: When a key cannot be found in the index.
+
+        :raises ValueError: When a value is not registered under its key.
+
+        """
+        for key, value in pairs:
+            self.remove(key, value)
+
+
+    def discard_many(self, pairs):
+        """Remove a batch of entries from the index if present.
+
+
+        :param pairs: An iterable of key and value pairs, a ``None`` value
+                      removes all the entries registered with the key.
+        :type pairs: ~collections.abc.Iterable
+
+        """
+        mapping = self._mapping
+
+        for key, value in pairs:
+            st = mapping.get(key)
+            if st is None:
+                continue
+
+            if value is None:
+                self._count -= len(st)
+                del mapping[key]
+            elif value in st:
+                st.remove(value)
+                self._count -= 1
+                if not st:
+                    del mapping[key]
+
+
+    def contains_many(self, keys):
+        """Check the presence of a batch of keys in the index.
+
+
+        :param keys: An iterable of index keys.
+        :type keys: ~collections.abc.Iterable
+
+
+        :returns: Whether each key is defined in the index, in order.
+        :rtype: ~typing.List[python:bool]
+
+        """
+        return list(map(self._mapping.__contains__, keys))
+
+
 class Chunk(mixin.HasID, mixin.HasData):
     """Little piece of data composing an item.
 
 
+    Chunks only keep their payload and its finalized digests, the identifier
+    is derived from the strong digest when requested.
+
+
     :param data: Data carried by the chunk.
-    :type data: python:bytes
+    :type data: python:bytes | python:bytearray | python:memoryview
 
     """
-    __slots__ = ()
+    __slots__ = ('_data', '_shash', '_whash', '__weakref__')
 
 
     def __init__(self, data):
         """Constructor for :class:`kado.store.Chunk`."""
         mixin.HasData.__init__(self, data=data)
-        mixin.HasID.__init__(self)
+
+
+    def __buffer__(self, flags):
+        """Export the chunk's payload through the buffer protocol so that
+        ``memoryview(chunk)`` does not copy it (Python 3.12 and later).
+
+
+        :param flags: Buffer request flags.
+        :type flags: python:int
+
+
+        :returns: A read-only view over the chunk's payload.
+        :rtype: python:memoryview
+
+        """
+        return self.view()
+
+
+    @property
+    def id(self):
+        """Get the chunk's unique identifier.
+
+
+        :returns: The chunk's unique identifier.
+        :rtype: ~uuid.UUID
+
+        """
+        return self._id_get()
 
 
     @property
@@ -223,6 +462,17 @@ class Chunk(mixin.HasID, mixin.HasData):
         raise NotImplementedError("chunk cannot be mutated.")
 
 
+    def view(self):
+        """Get a view over the chunk's payload without copying it.
+
+
+        :returns: A read-only view over the chunk's payload.
+        :rtype: python:memoryview
+
+        """
+        return memoryview(self._data)
+
+
     def _id_get(self):
         """Internal method to get the chunk's unique identifier value.
 
@@ -234,18 +484,229 @@ class Chunk(mixin.HasID, mixin.HasData):
         return uuid.UUID(self.shash[:c.UUID_LEN])
 
 
+class ChunkHandle(mixin.HasID, mixin.HasData):
+    """Reference to a chunk whose payload lives in a store.
+
+    The handle knows the chunk's identifier and length, the payload is only
+    fetched from the store when data is accessed or hashed.
+
+
+    :param key: Identifier of the chunk.
+    :type key: ~uuid.UUID
+
+    :param length: Length of the chunk's payload.
+    :type length: python:int
+
+    :param store: Chunk store, any object with a ``get`` method returning a
+                  chunk's payload from its identifier or location.
+
+    :param location: Store specific location of the payload, the chunk
+                     identifier is used to fetch the payload when not given.
+    :type location: ~typing.Any
+
+    """
+    __slots__ = ('_id', '_length', '_shash', '_whash', 'location', 'store')
+
+
+    def __init__(self, key, length, store, location=None):
+        """Constructor for :class:`kado.store.ChunkHandle`."""
+        self._id = key
+        self._length = length
+        self._shash = self._whash = None
+
+        self.location = location
+        self.store = store
+
+
+    def __eq__(self, other):
+        """Compare this chunk with another.
+
+        Handles are compared on their identifier, the payload is only fetched
+        to compare with other data containers.
+
+
+        :param other: The other object to compare with.
+        :type other: ~kado.store.mixin.HasData | python:bytes
+
+
+        :returns: Whether both chunks are equal or not.
+        :rtype: python:bool
+
+        """
+        if isinstance(other, ChunkHandle):
+            return self._id == other._id
+        return super().__eq__(other)
+
+
+    def __hash__(self):
+        """Return the hash value of the chunk's identifier.
+
+
+        :returns: The integer hash value of the handle.
+        :rtype: python:int
+
+        """
+        return hash(self._id)
+
+
+    def __len__(self):
+        """Return the length of the chunk's payload without fetching it."""
+        return self._length
+
+
+    @property
+    def data(self):
+        """Get the chunk's payload from the store."""
+        return super().data
+
+
+    @property
+    def key(self):
+        """Get the key the payload is fetched with from the store, its
+        location when known else the chunk identifier.
+
+        """
+        return self._id if self.location is None else self.location
+
+
+    @data.setter
+    def data(self, data):
+        """Changing the data carried by a chunk is not supported."""
+        raise NotImplementedError("chunk cannot be mutated.")
+
+
+    def view(self):
+        """Get a view over the chunk's payload fetched from the store.
+
+
+        :returns: A view over the chunk's payload.
+        :rtype: python:memoryview
+
+        """
+        return self._data_view(self.data)
+
+
+    def _data_get(self):
+        """Fetch the chunk's payload from the store.
+
+
+        :returns: The data carried by the chunk.
+        :rtype: python:bytes
+
+        """
+        return self.store.get(self.key)
+
+
+class ChunkRegistry(object):
+    """Weak-value mapping of the live chunks by their identifier, handing back
+    an existing chunk rather than creating a duplicate carrying the same data.
+
+    Chunks are dropped from the registry as soon as nothing else references
+    them.
+
+    """
+    __slots__ = ('_chunks', )
+
+
+    def __init__(self):
+        """Constructor for :class:`kado.store.ChunkRegistry`."""
+        self._chunks = weakref.WeakValueDictionary()
+
+
+    def __contains__(self, key):
+        """Check if a chunk with given identifier is registered.
+
+
+        :param key: Chunk identifier.
+        :type key: ~uuid.UUID
+
+
+        :returns: Whether a live chunk is registered under given identifier.
+        :rtype: python:bool
+
+        """
+        return key in self._chunks
+
+
+    def __len__(self):
+        """Return the number of live chunks within the registry.
+
+
+        :returns: Number of registered chunks.
+        :rtype: python:int
+
+        """
+        return len(self._chunks)
+
+
+    def get(self, key):
+        """Retrieve a registered chunk from its identifier.
+
+
+        :param key: Chunk identifier.
+        :type key: ~uuid.UUID
+
+
+        :returns: The registered chunk.
+        :rtype: ~kado.store._store.Chunk
+
+
+        :raises KeyError: When no live chunk is registered under given key.
+
+        """
+        return self._chunks[key]
+
+
+    def intern(self, data):
+        """Get the registered chunk carrying given data, registering a new
+        chunk when there is none.
+
+        Data is hashed from a view, it is only copied when a new chunk has to
+        be created.
+
+
+        :param data: Data carried by the chunk.
+        :type data: python:bytes | python:bytearray | python:memoryview
+
+
+        :returns: The chunk carrying given data.
+        :rtype: ~kado.store._store.Chunk
+
+
+        :raises TypeError: When given data is not a bytes-like object.
+
+        """
+        h = Chunk._shash_init()
+        h.update(Chunk._data_view(data))
+        digest = Chunk._hash_final(h)
+
+        key = uuid.UUID(bytes=digest[:c.UUID_LEN // 2])
+        chunk = self._chunks.get(key)
+        if chunk is None:
+            chunk = Chunk(data)
+            chunk._shash = digest
+
+            self._chunks[key] = chunk
+
+        return chunk
+
+
 class Item(mixin.HasID, mixin.HasData, mixin.HasMetadata):
     """The primary data structure for kado to store data.
 
 
     :param data: The actual data to be stored.
-    :type data: python:bytes
+    :type data: python:bytes | python:bytearray | python:memoryview
 
     :param metadata: Initial metadata to associate with the item's data.
     :type metadata: python:dict
 
     """
-    __slots__ = ('chunks', )
+    __slots__ = ('chunks', '_id', '_shash', '_whash', '_metadata')
+
+    #: Registry sharing chunks carrying the same data among all items, set to
+    #: ``None`` to give each item its own chunks.
+    registry = ChunkRegistry()
 
 
     def __init__(self, data=b'', metadata=None):
@@ -262,6 +723,88 @@ class Item(mixin.HasID, mixin.HasData, mixin.HasMetadata):
         return sum(len(chunk) for chunk in self.chunks)
 
 
+    @classmethod
+    def from_file(cls, name, metadata=None):
+        """Create an item from the content of a file.
+
+        The file is read and chunked incrementally, it is never loaded in
+        memory as a whole.
+
+
+        :param name: Path to the file to be stored.
+        :type name: python:str
+
+        :param metadata: Initial metadata to associate with the item's data.
+        :type metadata: python:dict
+
+
+        :returns: The item carrying the file's data.
+        :rtype: ~kado.store._store.Item
+
+        """
+        with open(name, 'rb') as fp:
+            return cls.from_stream(fp, metadata=metadata)
+
+
+    @classmethod
+    def from_manifest(cls, manifest, store, metadata=None):
+        """Create an item whose chunks are fetched from a store on demand.
+
+        Chunks are handles, no payload is read from the store until the item's
+        data is accessed or hashed.
+
+
+        :param manifest: The list of the chunks composing the item.
+        :type manifest: ~kado.store._manifest.Manifest
+
+        :param store: Chunk store, any object with a ``get`` method returning a
+                      chunk's payload from its identifier.
+
+        :param metadata: Initial metadata to associate with the item's data.
+        :type metadata: python:dict
+
+
+        :returns: The item referencing the chunks within the store.
+        :rtype: ~kado.store._store.Item
+
+        """
+        obj = cls(metadata=metadata)
+        obj.chunks = [
+            ChunkHandle(key, length, store) for key, length in manifest
+        ]
+
+        return obj
+
+
+    @classmethod
+    def from_stream(cls, fp, metadata=None):
+        """Create an item from the data read out of a binary stream.
+
+        The stream is read and chunked incrementally, it is never loaded in
+        memory as a whole.
+
+
+        :param fp: Binary file object to read the data from.
+        :type fp: ~io.RawIOBase | ~io.BufferedIOBase
+
+        :param metadata: Initial metadata to associate with the item's data.
+        :type metadata: python:dict
+
+
+        :returns: The item carrying the stream's data.
+        :rtype: ~kado.store._store.Item
+
+        """
+        obj = cls(metadata=metadata)
+
+        chunks = [cls._chunk_new(chunk) for _, _, chunk in ghash.stream(fp)]
+        # An empty stream keeps the single empty chunk of an empty item.
+        if chunks:
+            obj.chunks = chunks
+
+        return obj
+
+
     @staticmethod
     def _shash_init(size=c.BLAKE2_DATA_LENGTH, seed=c.BLAKE2_DATA_SEED):
         """Initialize the object to compute a strong cryptographic hash of
@@ -297,6 +840,44 @@ class Item(mixin.HasID, mixin.HasData, mixin.HasMetadata):
         return htree.HTree(mixin.HasData._whash_init(seed=seed))
 
 
+    @staticmethod
+    def _hash_final(h):
+        """Get the hash state to retain once the item's data was hashed.
+
+        Hash trees are kept so that their leaves can be updated along with the
+        item's chunks.
+
+
+        :param h: The hash tree updated with the item's data.
+        :type h: ~kado.utils.htree.HTree
+
+
+        :returns: The hash tree itself.
+        :rtype: ~kado.utils.htree.HTree
+
+        """
+        return h
+
+
+    @classmethod
+    def _chunk_new(cls, data):
+        """Get a chunk carrying given data, shared through the item registry
+        when there is one.
+
+
+        :param data: Data carried by the chunk.
+        :type data: python:bytes | python:bytearray | python:memoryview
+
+
+        :returns: The chunk carrying given data.
+        :rtype: ~kado.store._store.Chunk
+
+        """
+        if cls.registry is None:
+            return Chunk(data)
+        return cls.registry.intern(data)
+
+
     def _data_hash(self, h):
         """Update given hash object with the object's data.
 
@@ -319,20 +900,206 @@ class Item(mixin.HasID, mixin.HasData, mixin.HasMetadata):
         return b''.join(x.data for x in self.chunks)
 
 
+    def manifest(self):
+        """Get the compact list of the chunks composing the item.
+
+
+        :returns: The item's manifest.
+        :rtype: ~kado.store._manifest.Manifest
+
+        """
+        return Manifest((chunk.id, len(chunk)) for chunk in self.chunks)
+
+
+    def views(self):
+        """Get views over the payload of each of the item's chunks, in order.
+
+        This is a scatter-gather representation of the item's data which can
+        be handed to :func:`os.writev` or :meth:`socket.socket.sendmsg`
+        without joining the data into a single object.
+
+
+        :returns: Read-only views over the chunks' payload.
+        :rtype: ~typing.List[python:memoryview]
+
+        """
+        return [chunk.view() for chunk in self.chunks]
+
+
     def _data_set(self, data):
         """Set given data into the item.
 
+        Data is chunked through a view, only the chunks' payload are copied.
+
 
         :param data: Data to be stored by the object.
-        :type data: python:bytes
+        :type data: python:bytes | python:bytearray | python:memoryview
+
+
+        :raises TypeError: When given data is not a bytes-like object.
+
+        """
+        view = self._data_view(data)
+        self.chunks = [
+            self._chunk_new(chunk) for _, _, chunk in ghash.chop(view)
+        ]
+
+
+    def append(self, data):
+        """Add data at the end of the item.
+
+        Only the last chunk of the item is chunked again along with the new
+        data.
+
+
+        :param data: Data to be appended.
+        :type data: python:bytes | python:bytearray | python:memoryview
 
 
         :raises TypeError: When given data is not a bytes-like object.
 
         """
-        if not isinstance(data, bytes):
-            raise TypeError('expected {}, got {}.'.format(bytes, type(data)))
-        self.chunks = [Chunk(chunk) for _, _, chunk in ghash.chop(data)]
+        self.splice(len(self), 0, data)
+
+
+    def truncate(self, size):
+        """Resize the item's data to at most the given number of bytes.
+
+
+        :param size: The new length of the item's data.
+        :type size: python:int
+
+
+        :raises ValueError: When given size is negative.
+
+        """
+        if size < 0:
+            raise ValueError('negative size value: {}.'.format(size))
+
+        l_item = len(self)
+        if size < l_item:
+            self.splice(size, l_item - size)
+
+
+    def splice(self, offset, length, data=b''):
+        """Replace a range of the item's data with given data.
+
+        Chunks ending before ``offset`` are kept as is. Data is chunked again
+        from there until a cutting point falls back on the boundary of an
+        existing chunk past the replaced range, from which the remaining
+        chunks are reused. Only the hash tree leaves of the rebuilt chunks are
+        updated.
+
+
+        :param offset: Start index of the range to be replaced.
+        :type offset: python:int
+
+        :param length: Length of the range to be replaced.
+        :type length: python:int
+
+        :param data: Data to put in place of the replaced range.
+        :type data: python:bytes | python:bytearray | python:memoryview
+
+
+        :raises TypeError: When given data is not a bytes-like object.
+
+        :raises ValueError: When the range is out of the item's data.
+
+        """
+        data = self._data_view(data)
+
+        ends = list(accumulate(len(chunk) for chunk in self.chunks))
+        l_item = ends[-1] if ends else 0
+
+        if not 0 <= offset <= l_item or length < 0:
+            raise ValueError('invalid range: {}, {}.'.format(offset, length))
+
+        stop = min(offset + length, l_item)
+        if stop == offset and not data:
+            return
+
+        # Cutting points depend on the byte following the end of a chunk, the
+        # first chunk to rebuild is therefore the one ending at ``offset``.
+        first = bisect.bisect_left(ends, offset)
+        start = ends[first - 1] if first else 0
+        # The last chunk to rebuild is at least the one containing ``stop``.
+        last = bisect.bisect_right(ends, stop)
+        shift = len(data) - (stop - offset)
+
+        def source():
+            if first < len(self.chunks):
+                yield self.chunks[first].data[:offset - start]
+            yield data
+            for idx in range(last, len(self.chunks)):
+                ck_start = ends[idx] - len(self.chunks[idx])
+                yield self.chunks[idx].data[max(stop - ck_start, 0):]
+
+        chunks = []             # Newly built chunks.
+        reuse = len(ends)       # Index of the first chunk to be reused.
+
+        pieces = source()
+        buffer = bytearray()
+        ck_end = start
+        while True:
+            # Keep at least a full chunking window into the buffer.
+            for piece in pieces:
+                buffer += piece
+                if len(buffer) >= c.GHASH_CHUNK_HI:
+                    break
+
+            if not buffer:
+                break
+
+            ck_len = ghash.cut(buffer[:c.GHASH_CHUNK_HI])
+            chunks.append(self._chunk_new(buffer[:ck_len]))
+            del buffer[:ck_len]
+            ck_end += ck_len
+
+            # Once past the new data, we are done as soon as a cutting point
+            # lines up with the boundary of an existing chunk.
+            if ck_end - shift >= stop:
+                idx = bisect.bisect_left(ends, ck_end - shift)
+                if idx < len(ends) and ends[idx] == ck_end - shift:
+                    reuse = idx + 1
+                    break
+
+        self.chunks[first:reuse] = chunks
+        if not self.chunks:
+            self.chunks = [self._chunk_new(b'')]
+            first, chunks = 0, self.chunks
+
+        for h in [self._shash, self._whash]:
+            if h is not None:
+                self._htree_splice(h, first, reuse, chunks)
+
+
+    @staticmethod
+    def _htree_splice(h, start, stop, chunks):
+        """Replace a range of leaves of a hash tree by the leaves of given
+        chunks.
+
+
+        :param h: The hash tree to be updated.
+        :type h: ~kado.utils.htree.HTree
+
+        :param start: Index of the first leaf to be replaced.
+        :type start: python:int
+
+        :param stop: Index of the leaf following the last one to be replaced.
+        :type stop: python:int
+
+        :param chunks: The chunks to put in place of the replaced leaves.
+        :type chunks: ~collections.abc.Sequence
+
+        """
+        for _ in range(min(stop, len(h)) - start):
+            h.pop(start)
+
+        for idx, chunk in enumerate(chunks, start):
+            if idx < len(h):
+                h.insert(idx, chunk.data)
+            else:
+                h.append(chunk.data)
 
 
     def copy(self):
@@ -347,3 +1114,253 @@ class Item(mixin.HasID, mixin.HasData, mixin.HasMetadata):
         obj.chunks = self.chunks.copy()
 
         return obj
+
+
+    def open(self, prefetcher=None):
+        """Open the item's data for streaming reads.
+
+        Chunks are visited one after the other as the stream is consumed so
+        the item's data never has to be joined in memory.
+
+
+        :param prefetcher: Prefetcher reading ahead the payloads of chunk
+                           handles from the store they refer to.
+        :type prefetcher: ~kado.store._prefetch.Prefetcher
+
+
+        :returns: A binary read-only stream over the item's data.
+        :rtype: ~kado.store._store.ItemReader
+
+        """
+        return ItemReader(self, prefetcher)
+
+
+class ItemReader(io.RawIOBase):
+    """Raw binary stream reading the data of an item chunk by chunk.
+
+    The stream works on the list of chunks the item carried when it was
+    opened. It can be wrapped into a :class:`io.BufferedReader` or handed to
+    any consumer of file objects such as :func:`shutil.copyfileobj`.
+
+    When a prefetcher is given, the payloads of the chunk handles following
+    the read position are fetched ahead, the read ahead starting over from
+    the new position after a seek.
+
+
+    :param item: The item to read data from.
+    :type item: ~kado.store._store.Item
+
+    :param prefetcher: Prefetcher reading ahead the payloads of chunk handles
+                       from the store they refer to.
+    :type prefetcher: ~kado.store._prefetch.Prefetcher
+
+    """
+
+    def __init__(self, item, prefetcher=None):
+        """Constructor for :class:`kado.store._store.ItemReader`."""
+        super().__init__()
+
+        self._chunks = item.chunks.copy()
+        # Cumulative end offset of each chunk within the item's data.
+        self._ends = list(accumulate(len(chunk) for chunk in self._chunks))
+        self._pos = 0
+
+        # View over the payload of the chunk being read, kept until the
+        # position moves past it so handles are fetched only once.
+        self._current = None
+        self._view = None
+
+        # Payloads of the handles read ahead, along the indexes of the handles
+        # and the position of the next one within them.
+        self._prefetcher = prefetcher
+        self._stream = None
+        self._stream_idxs = []
+        self._stream_pos = 0
+
+
+    def readable(self):
+        """Item streams can always be read."""
+        return True
+
+
+    def seekable(self):
+        """Item streams support random access."""
+        return True
+
+
+    def readinto(self, b):
+        """Read bytes into a pre-allocated, writable bytes-like object.
+
+
+        :param b: The buffer to fill with the item's data.
+        :type b: python:bytearray
+
+
+        :returns: The number of bytes read, ``0`` at the end of the stream.
+        :rtype: python:int
+
+
+        :raises ValueError: When the stream is closed.
+
+        """
+        self._checkClosed()
+
+        with memoryview(b) as view, view.cast('B') as buffer:
+            size = len(buffer)
+            read = 0
+
+            idx = bisect.bisect_right(self._ends, self._pos)
+            while read < size and idx < len(self._chunks):
+                start = self._ends[idx] - len(self._chunks[idx])
+                offset = self._pos - start
+                count = min(size - read, self._ends[idx] - self._pos)
+
+                data = self._chunk_view(idx)
+                buffer[read:read + count] = data[offset:offset + count]
+
+                read += count
+                self._pos += count
+                idx += 1
+
+        return read
+
+
+    def close(self):
+        """Close the stream, releasing the payload of the current chunk and
+        cancelling the pending fetches.
+
+        """
+        self._chunk_release()
+        self._stream_close()
+        super().close()
+
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        """Change the stream position to the given byte offset.
+
+
+        :param offset: Offset of the new position, interpreted relative to the
+                       position indicated by ``whence``.
+        :type offset: python:int
+
+        :param whence: Reference point of the offset.
+        :type whence: python:int
+
+
+        :returns: The new absolute position.
+        :rtype: python:int
+
+
+        :raises ValueError: When the stream is closed, ``whence`` is invalid or
+                            the resulting position is negative.
+
+        """
+        self._checkClosed()
+
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self._size() + offset
+        else:
+            raise ValueError('invalid whence value: {}.'.format(whence))
+
+        if pos < 0:
+            raise ValueError('negative seek position: {}.'.format(pos))
+        self._pos = pos
+
+        return self._pos
+
+
+    def tell(self):
+        """Return the current stream position.
+
+
+        :returns: The current absolute position.
+        :rtype: python:int
+
+
+        :raises ValueError: When the stream is closed.
+
+        """
+        self._checkClosed()
+        return self._pos
+
+
+    def _size(self):
+        """Return the total length of the stream."""
+        return self._ends[-1] if self._ends else 0
+
+
+    def _chunk_release(self):
+        """Release the view over the current chunk's payload."""
+        if self._view is not None:
+            self._view.release()
+        self._current = self._view = None
+
+
+    def _chunk_view(self, idx):
+        """Get a view over the payload of the chunk at given index.
+
+        The view is kept until another chunk is requested, consecutive reads
+        within a chunk do not fetch its payload again.
+
+
+        :param idx: Index of the chunk within the stream.
+        :type idx: python:int
+
+
+        :returns: A view over the chunk's payload.
+        :rtype: python:memoryview
+
+        """
+        if self._current != idx:
+            self._chunk_release()
+
+            chunk = self._chunks[idx]
+            if self._prefetcher is not None and isinstance(chunk, ChunkHandle):
+                self._view = chunk._data_view(self._prefetched(idx))
+            else:
+                self._view = chunk.view()
+            self._current = idx
+
+        return self._view
+
+
+    def _prefetched(self, idx):
+        """Get the payload of the chunk handle at given index from the read
+        ahead, starting it over from this chunk if it is not the next one.
+
+
+        :param idx: Index of the chunk handle within the stream.
+        :type idx: python:int
+
+
+        :returns: The chunk's payload.
+        :rtype: python:bytes
+
+        """
+        idxs = self._stream_idxs
+        if self._stream_pos >= len(idxs) or idxs[self._stream_pos] != idx:
+            self._stream_close()
+
+            idxs = self._stream_idxs = [
+                i for i in range(idx, len(self._chunks))
+                if isinstance(self._chunks[i], ChunkHandle)
+            ]
+            self._stream = self._prefetcher.read(
+                (self._chunks[i] for i in idxs), fetch=ChunkHandle._data_get
+            )
+
+        self._stream_pos += 1
+        return next(self._stream)
+
+
+    def _stream_close(self):
+        """Stop reading ahead, cancelling the pending fetches."""
+        if self._stream is not None:
+            self._stream.close()
+        self._stream = None
+        self._stream_idxs = []
+        self._stream_pos = 0
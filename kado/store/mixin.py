@@ -30,8 +30,47 @@ from collections.abc import MutableMapping
 from kado import constants as c
 
 
+class Digest(bytes):
+    """Finalized digest of a hash function.
+
+    It exposes the read-only part of the :mod:`hashlib` interface and is
+    retained in place of the hash object once data has been hashed.
+
+    """
+    __slots__ = ()
+
+
+    def digest(self):
+        """Return the digest as a bytes object.
+
+
+        :returns: The digest value.
+        :rtype: python:bytes
+
+        """
+        return bytes(self)
+
+
+    def hexdigest(self):
+        """Return the digest as a string of hexadecimal digits.
+
+
+        :returns: The hexadecimal digest value.
+        :rtype: python:str
+
+        """
+        return self.hex()
+
+
 class HasID(object):
-    """Store mixin to provide a unique identifier."""
+    """Store mixin to provide a unique identifier.
+
+    Mixins do not carry instance storage, implementing classes must declare
+    the ``_id`` slot.
+
+    """
+    __slots__ = ()
+
 
     def __init__(self):
         """Constructor for :class:`kado.store.mixin.HasID`."""
@@ -66,20 +105,23 @@ class HasID(object):
 class HasData(object):
     """Mixin class to cary binary data.
 
+    Implementing classes must declare the ``_shash`` and ``_whash`` slots
+    along with the ``_data`` slot unless they override data access.
+
 
     :param data: Data to be carried.
-    :type data: python:bytes
+    :type data: python:bytes | python:bytearray | python:memoryview
 
     """
+    __slots__ = ()
+
 
     def __init__(self, data=b''):
         """Constructor for :class:`kado.store.mixin.HasData`."""
-        self._shash = None    # Strong hash handler.
-        self._whash = None    # Weak hash handler.
-        # Flags to track hash state compared to stored data.
-        self._shash_dirty = self._whash_dirty = False
+        # Hash states, ``None`` until computed or when data has changed.
+        self._shash = None    # Strong hash.
+        self._whash = None    # Weak hash.
 
-        self._data = None
         self._data_set(data)
 
 
@@ -173,11 +215,11 @@ class HasData(object):
 
 
         :param data: The data to be stored.
-        :type data: python:bytes
+        :type data: python:bytes | python:bytearray | python:memoryview
 
         """
         self._data_set(data)
-        self._shash_dirty = self._whash_dirty = True
+        self._shash = self._whash = None
 
 
     @property
@@ -189,11 +231,11 @@ class HasData(object):
         :rtype: python:str
 
         """
-        if self._shash_dirty or self._shash is None:
-            self._shash = self._shash_init()
+        if self._shash is None:
+            h = self._shash_init()
 
-            self._data_hash(self._shash)
-            self._shash_dirty = False
+            self._data_hash(h)
+            self._shash = self._hash_final(h)
 
         return self._shash.hexdigest()
 
@@ -207,15 +249,32 @@ class HasData(object):
         :rtype: python:str
 
         """
-        if self._whash_dirty or self._whash is None:
-            self._whash = self._whash_init()
+        if self._whash is None:
+            h = self._whash_init()
 
-            self._data_hash(self._whash)
-            self._whash_dirty = False
+            self._data_hash(h)
+            self._whash = self._hash_final(h)
 
         return self._whash.hexdigest()
 
 
+    @staticmethod
+    def _hash_final(h):
+        """Get the hash state to retain once the object's data was hashed.
+
+        Only the digest is kept, hash objects are dropped.
+
+
+        :param h: The hash function updated with the object's data.
+
+
+        :returns: The finalized digest.
+        :rtype: ~kado.store.mixin.Digest
+
+        """
+        return Digest(h.digest())
+
+
     def _data_hash(self, h):
         """Update given hash object with the object's data.
 
@@ -242,19 +301,54 @@ class HasData(object):
 
 
         :param data: Data to be stored by the object.
-        :type data: python:bytes
+        :type data: python:bytes | python:bytearray | python:memoryview
 
 
         :raises TypeError: When given data is not a bytes-like object.
 
         """
-        if not isinstance(data, bytes):
-            raise TypeError('expected {}, got {}.'.format(bytes, type(data)))
-        self._data = data
+        view = self._data_view(data)
+        # Data is kept as is when immutable, we hold our own copy otherwise.
+        self._data = data if isinstance(data, bytes) else view.tobytes()
+
+
+    @staticmethod
+    def _data_view(data):
+        """Get a flat view over the bytes of given data without copying it.
+
+
+        :param data: Object supporting the buffer protocol.
+        :type data: python:bytes | python:bytearray | python:memoryview
+
+
+        :returns: A one dimensional view of unsigned bytes over the data.
+        :rtype: python:memoryview
+
+
+        :raises TypeError: When given data is not a bytes-like object.
+
+        """
+        try:
+            view = memoryview(data)
+        except TypeError:
+            raise TypeError(
+                'expected {}, got {}.'.format(bytes, type(data))
+            ) from None
+
+        if view.ndim != 1 or view.format != 'B':
+            view = view.cast('B')
+
+        return view
 
 
 class HasMetadata(MutableMapping):
-    """Allow implementing classes to carry text metadata as key-value pairs."""
+    """Allow implementing classes to carry text metadata as key-value pairs.
+
+    Implementing classes must declare the ``_metadata`` slot.
+
+    """
+    __slots__ = ()
+
 
     def __init__(self, *args, **kwargs):
         """Constructor for :class:`kado.store.mixin.HasMetadata`."""
@@ -0,0 +1,209 @@
+# kado/utils/bloom.py
+# ===================
+#
+# Copying
+# -------
+#
+# Copyright (c) 2018 kado authors.
+#
+# This file is part of the *kado* project.
+#
+# kado is a free software project. You can redistribute it and/or
+# modify if under the terms of the MIT License.
+#
+# This software project is distributed *as is*, WITHOUT WARRANTY OF ANY
+# KIND; including but not limited to the WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE and NONINFRINGEMENT.
+#
+# You should have received a copy of the MIT License along with kado.
+# If not, see <http://opensource.org/licenses/MIT>.
+#
+import math
+import struct
+
+import xxhash
+
+
+#: Serialized filter header: number of bits, number of hash functions and
+#: number of added keys.
+_HEADER = struct.Struct('<QQQ')
+
+
+class BloomFilter(object):
+    """Probabilistic set of binary keys.
+
+    A key which was added to the filter is always reported as present, a key
+    which was not may be reported as present with a probability close to the
+    error rate as long as the filter holds less keys than its capacity.
+
+
+    :param capacity: Number of keys the filter is sized for.
+    :type capacity: python:int
+
+    :param error_rate: Expected false positive rate, between 0 and 1.
+    :type error_rate: python:float
+
+
+    :raises ValueError: When the error rate is not between 0 and 1.
+
+    """
+    __slots__ = ('_bits', '_count', '_hashes', '_size')
+
+
+    def __init__(self, capacity=1 << 20, error_rate=0.01):
+        """Constructor for :class:`kado.utils.bloom.BloomFilter`."""
+        if not 0 < error_rate < 1:
+            raise ValueError(
+                'expected error rate between 0 and 1, got {}.'.format(
+                    error_rate
+                )
+            )
+
+        capacity = max(1, capacity)
+        size = -capacity * math.log(error_rate) / (math.log(2) ** 2)
+
+        self._size = max(8, int(math.ceil(size / 8)) * 8)
+        self._hashes = max(1, round(self._size / capacity * math.log(2)))
+        self._bits = bytearray(self._size // 8)
+        self._count = 0
+
+
+    def __contains__(self, key):
+        """Check if given key may have been added to the filter.
+
+
+        :param key: Key to be looked for.
+        :type key: python:bytes
+
+
+        :returns: ``False`` if the key was never added, ``True`` if it probably
+                  was.
+        :rtype: python:bool
+
+        """
+        bits = self._bits
+        for i in self._positions(key):
+            if not bits[i >> 3] & (1 << (i & 7)):
+                return False
+
+        return True
+
+
+    def __len__(self):
+        """Return the number of distinct keys added to the filter.
+
+        Keys reported as already present when added are not counted, the
+        length may slightly underestimate the number of keys because of false
+        positives.
+
+
+        :returns: Number of keys added to the filter.
+        :rtype: python:int
+
+        """
+        return self._count
+
+
+    @property
+    def size(self):
+        """Get the number of bits of the filter."""
+        return self._size
+
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Load a filter from its serialized form.
+
+
+        :param data: Serialized filter as given by
+                     :meth:`~kado.utils.bloom.BloomFilter.to_bytes`.
+        :type data: python:bytes
+
+
+        :returns: The loaded filter.
+        :rtype: ~kado.utils.bloom.BloomFilter
+
+
+        :raises ValueError: When data is not a valid serialized filter.
+
+        """
+        view = memoryview(data).cast('B')
+        try:
+            size, hashes, count = _HEADER.unpack_from(view)
+        except struct.error:
+            raise ValueError('truncated filter header.') from None
+
+        if not size or size % 8 or len(view) != _HEADER.size + size // 8:
+            raise ValueError('invalid filter length: {}.'.format(len(view)))
+
+        obj = cls.__new__(cls)
+        obj._size, obj._hashes, obj._count = size, hashes, count
+        obj._bits = bytearray(view[_HEADER.size:])
+
+        return obj
+
+
+    def add(self, key):
+        """Add a key to the filter.
+
+
+        :param key: Key to be added.
+        :type key: python:bytes
+
+
+        :returns: Whether the key was not already reported as present.
+        :rtype: python:bool
+
+        """
+        bits = self._bits
+        added = False
+        for i in self._positions(key):
+            mask = 1 << (i & 7)
+            if not bits[i >> 3] & mask:
+                bits[i >> 3] |= mask
+                added = True
+
+        if added:
+            self._count += 1
+        return added
+
+
+    def clear(self):
+        """Remove all keys from the filter."""
+        self._bits = bytearray(len(self._bits))
+        self._count = 0
+
+
+    def to_bytes(self):
+        """Serialize the filter.
+
+
+        :returns: The serialized filter.
+        :rtype: python:bytes
+
+        """
+        return b''.join([
+            _HEADER.pack(self._size, self._hashes, self._count), self._bits
+        ])
+
+
+    def _positions(self, key):
+        """Yield the bit positions of given key.
+
+        Positions are derived from two hash values with the double hashing
+        scheme, ``h1 + i * h2``.
+
+
+        :param key: Key to get the positions of.
+        :type key: python:bytes
+
+
+        :returns: An iterator over the bit positions.
+        :rtype: ~collections.abc.Iterator
+
+        """
+        h1 = xxhash.xxh64(key, seed=0).intdigest()
+        h2 = xxhash.xxh64(key, seed=1).intdigest() | 1
+
+        for i in range(self._hashes):
+            yield (h1 + i * h2) % self._size
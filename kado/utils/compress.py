@@ -0,0 +1,170 @@
+# kado/utils/compress.py
+# ======================
+#
+# Copying
+# -------
+#
+# Copyright (c) 2018 kado authors.
+#
+# This file is part of the *kado* project.
+#
+# kado is a free software project. You can redistribute it and/or
+# modify if under the terms of the MIT License.
+#
+# This software project is distributed *as is*, WITHOUT WARRANTY OF ANY
+# KIND; including but not limited to the WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE and NONINFRINGEMENT.
+#
+# You should have received a copy of the MIT License along with kado.
+# If not, see <http://opensource.org/licenses/MIT>.
+#
+import lzma
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+#: Codec identifiers, recorded along compressed data.
+NONE, ZLIB, LZMA, ZSTD = range(4)
+
+#: Size of the data sample compressed to probe for compressibility.
+PROBE_SIZE = 4096
+#: Compression ratio of the probe sample above which data is deemed
+#: incompressible.
+PROBE_RATIO = 0.9
+#: Size under which data is not worth compressing.
+MIN_SIZE = 64
+
+
+def available(codec):
+    """Check if a codec can be used.
+
+
+    :param codec: Codec identifier.
+    :type codec: python:int
+
+
+    :returns: Whether the codec is known and its module installed.
+    :rtype: python:bool
+
+    """
+    if codec == ZSTD:
+        return zstandard is not None
+    return codec in (NONE, ZLIB, LZMA)
+
+
+def compress(data, codec):
+    """Compress data with given codec.
+
+
+    :param data: Data to be compressed.
+    :type data: python:bytes
+
+    :param codec: Codec identifier.
+    :type codec: python:int
+
+
+    :returns: The compressed data.
+    :rtype: python:bytes
+
+
+    :raises ValueError: When the codec is not available.
+
+    """
+    if codec == NONE:
+        return bytes(data)
+    elif codec == ZLIB:
+        return zlib.compress(data, 6)
+    elif codec == LZMA:
+        return lzma.compress(data, preset=1)
+    elif codec == ZSTD and zstandard is not None:
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    else:
+        raise ValueError('unavailable codec: {}.'.format(codec))
+
+
+def decompress(data, codec):
+    """Decompress data compressed with given codec.
+
+
+    :param data: Data to be decompressed.
+    :type data: python:bytes
+
+    :param codec: Codec identifier.
+    :type codec: python:int
+
+
+    :returns: The decompressed data.
+    :rtype: python:bytes
+
+
+    :raises ValueError: When the codec is not available.
+
+    """
+    if codec == NONE:
+        return bytes(data)
+    elif codec == ZLIB:
+        return zlib.decompress(data)
+    elif codec == LZMA:
+        return lzma.decompress(data)
+    elif codec == ZSTD and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompress(data)
+    else:
+        raise ValueError('unavailable codec: {}.'.format(codec))
+
+
+def probe(data):
+    """Check if data is worth compressing.
+
+    A sample from the middle of the data is compressed with the fastest zlib
+    level, high entropy data such as already compressed media hardly shrink.
+
+
+    :param data: Data to be checked.
+    :type data: python:bytes
+
+
+    :returns: Whether the data is likely to be compressible.
+    :rtype: python:bool
+
+    """
+    size = len(data)
+    if size < MIN_SIZE:
+        return False
+
+    start = max(0, (size - PROBE_SIZE) // 2)
+    sample = data[start:start + PROBE_SIZE]
+
+    return len(zlib.compress(sample, 1)) < len(sample) * PROBE_RATIO
+
+
+def pack(data, codec):
+    """Compress data with given codec when worth it.
+
+
+    :param data: Data to be compressed.
+    :type data: python:bytes
+
+    :param codec: Codec identifier.
+    :type codec: python:int
+
+
+    :returns: The codec actually used, :data:`NONE` when data was not
+              compressed, along the resulting data.
+    :rtype: ~typing.Tuple[python:int, python:bytes]
+
+
+    :raises ValueError: When the codec is not available.
+
+    """
+    if codec != NONE and probe(data):
+        packed = compress(data, codec)
+        if len(packed) < len(data):
+            return codec, packed
+    elif not available(codec):
+        raise ValueError('unavailable codec: {}.'.format(codec))
+
+    return NONE, data
@@ -50,7 +50,7 @@ def cut(data):
 
 
     :param data: Data stream to cut.
-    :type data: python:bytes
+    :type data: python:bytes | python:memoryview
 
 
     :returns: Index value at which data must be cut.
@@ -91,8 +91,9 @@ def chop(data):
     """Split given data stream in normalized chunks.
 
 
-    :param data: Data stream to be divided.
-    :type data: python:bytes
+    :param data: Data stream to be divided. Chunks of a
+                 :class:`python:memoryview` are views over the same memory.
+    :type data: python:bytes | python:memoryview
 
 
     :returns: A three items tuple with the chunk start index, the chunk length
@@ -123,46 +124,101 @@ def read(name):
               and the chunk data.
     :rtype: ~typing.Tuple[python:int, python:int, python:bytes]
 
+    """
+    with open(name, 'rb') as fp:
+        yield from stream(fp)
+
+
+def _fill(fp, buffer):
+    """Read from given binary stream until the buffer is full or the end of
+    the stream is reached.
+
+
+    :param fp: Binary file object to read from.
+    :type fp: ~io.RawIOBase | ~io.BufferedIOBase
+
+    :param buffer: Buffer to fill with the stream data.
+    :type buffer: python:bytearray
+
+
+    :returns: Number of bytes read into the buffer.
+    :rtype: python:int
+
+
+    :raises BlockingIOError: When the stream is non-blocking and has no data
+                             available.
+
+    """
+    view = memoryview(buffer)
+    filled = 0
+    while filled < len(view):
+        read_bytes = fp.readinto(view[filled:])
+        if read_bytes is None:
+            raise BlockingIOError(
+                'expected a blocking stream, got no data available.'
+            )
+        if not read_bytes:
+            break
+        filled += read_bytes
+
+    return filled
+
+
+def stream(fp):
+    """Read given binary stream and split it in normalized chunks.
+
+
+    :param fp: Binary file object to split in chunks.
+    :type fp: ~io.RawIOBase | ~io.BufferedIOBase
+
+    :returns: A three items tuple with the chunk start index, the chunk length
+              and the chunk data.
+    :rtype: ~typing.Tuple[python:int, python:int, python:bytes]
+
+
+    :raises BlockingIOError: When the stream is non-blocking and has no data
+                             available.
+
     """
     fp_idx = 0              # Current position in the file.
     remain = bytearray()    # Data remaining from the chunking process.
     buffer = bytearray(c.GHASH_CHUNK_HI)    # Buffer to keep file data.
 
-    with open(name, 'rb') as fp:
-        while True:
-            # Load up to :data:`~kado.constants.GHASH_CHUNK_HI` file data into
-            # the buffer.
-            read_bytes = fp.readinto(buffer)
-            if read_bytes == 0:
-                # No more data? We're getting out of here.
-                break
-
-            # We prepend remaining data from previous iteration before chopping.
-            buffer = remain + buffer
-            # Keep in mind read data can be lower than actual buffer size.
-            bf_end = read_bytes + len(remain)
-
-            # :func:`~kado.utils.ghash.chop` will cut all given data, however
-            # the last chunk may not be the end of the file and we may still
-            # have some more data to read.
-            #
-            # Therefore, we keep the last chunk aside looking for a potential
-            # bigger chunk.
-            ck_idx = 0
-            for ck_start, ck_end, ck_data in iterator.onexlast(
-                chop(buffer[:bf_end])
-            ):
-                yield fp_idx + ck_start, fp_idx + ck_end, bytes(ck_data)
-                ck_idx = ck_end
-
-            # Saving the last chunk of data for the next iteration.
-            remain = buffer[ck_idx:bf_end]
-            buffer = bytearray(c.GHASH_CHUNK_HI - len(remain))
-
-            # Raising our file index.
-            fp_idx += ck_idx
-
-        # We're done reading the file, chopping remaining data.
-        if remain:
-            for ck_start, ck_end, ck_data in chop(remain):
-                yield fp_idx + ck_start, fp_idx + ck_end, bytes(ck_data)
+    while True:
+        # Load up to :data:`~kado.constants.GHASH_CHUNK_HI` file data into
+        # the buffer. Short reads are retried as the forced cut at the end of
+        # the buffer would otherwise be taken as a real chunk.
+        read_bytes = _fill(fp, buffer)
+        if not read_bytes:
+            # No more data? We're getting out of here.
+            break
+
+        # We prepend remaining data from previous iteration before chopping.
+        buffer = remain + buffer
+        # Keep in mind read data can be lower than actual buffer size.
+        bf_end = read_bytes + len(remain)
+
+        # :func:`~kado.utils.ghash.chop` will cut all given data, however
+        # the last chunk may not be the end of the file and we may still
+        # have some more data to read.
+        #
+        # Therefore, we keep the last chunk aside looking for a potential
+        # bigger chunk.
+        ck_idx = 0
+        for ck_start, ck_end, ck_data in iterator.onexlast(
+            chop(buffer[:bf_end])
+        ):
+            yield fp_idx + ck_start, fp_idx + ck_end, bytes(ck_data)
+            ck_idx = ck_end
+
+        # Saving the last chunk of data for the next iteration.
+        remain = buffer[ck_idx:bf_end]
+        buffer = bytearray(c.GHASH_CHUNK_HI - len(remain))
+
+        # Raising our file index.
+        fp_idx += ck_idx
+
+    # We're done reading the file, chopping remaining data.
+    if remain:
+        for ck_start, ck_end, ck_data in chop(remain):
+            yield fp_idx + ck_start, fp_idx + ck_end, bytes(ck_data)
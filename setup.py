@@ -83,6 +83,10 @@ setup(
         'xxhash',
     ],
 
+    extras_require={
+        'zstd': ['zstandard'],
+    },
+
     entry_points={
         'console_scripts': [
             'kado = kado.__main__:main'
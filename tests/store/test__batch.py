@@ -0,0 +1,152 @@
+# tests/store/test__batch.py
+# ==========================
+#
+# Copying
+# -------
+#
+# Copyright (c) 2018 kado authors.
+#
+# This file is part of the *kado* project.
+#
+# kado is a free software project. You can redistribute it and/or
+# modify if under the terms of the MIT License.
+#
+# This software project is distributed *as is*, WITHOUT WARRANTY OF ANY
+# KIND; including but not limited to the WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE and NONINFRINGEMENT.
+#
+# You should have received a copy of the MIT License along with kado.
+# If not, see <http://opensource.org/licenses/MIT>.
+#
+import os
+import shutil
+import tempfile
+import unittest
+import threading
+
+from unittest import mock
+
+from kado.store import _batch, _pack, _store
+
+
+class TestBatchWriter(unittest.TestCase):
+    """Test case for :class:`kado.store._batch.BatchWriter`."""
+
+    def setUp(self):
+        """Setup test cases for :class:`kado.store._batch.BatchWriter`."""
+        self.DIR = tempfile.mkdtemp()
+        self.STORE = _pack.PackStore(self.DIR)
+
+        self.CHUNKS = [
+            _store.Chunk(i.to_bytes(4, 'little') * 25) for i in range(64)
+        ]
+
+
+    def tearDown(self):
+        """Cleanup test cases for :class:`kado.store._batch.BatchWriter`."""
+        self.STORE.close()
+        shutil.rmtree(self.DIR)
+
+
+    def test_put(self):
+        """Stored chunks should be read back from the store."""
+        with _batch.BatchWriter(self.STORE) as bw:
+            loc = bw.put(self.CHUNKS[0])
+
+        self.assertEqual(self.STORE.get(loc), self.CHUNKS[0].data)
+
+
+    def test_put_threads(self):
+        """Chunks stored concurrently should be written in few batches."""
+        barrier = threading.Barrier(len(self.CHUNKS))
+
+        def worker(chunk):
+            barrier.wait()
+            bw.put(chunk)
+
+        with mock.patch.object(
+                _pack.PackStore, 'flush', autospec=True,
+                side_effect=_pack.PackStore.flush
+        ) as flush:
+            with _batch.BatchWriter(self.STORE, max_delay=0.05) as bw:
+                threads = [
+                    threading.Thread(target=worker, args=(ck, ))
+                    for ck in self.CHUNKS
+                ]
+                for th in threads:
+                    th.start()
+                for th in threads:
+                    th.join()
+
+        with self.subTest(test='stored'):
+            self.assertEqual(len(self.STORE), len(self.CHUNKS))
+
+        with self.subTest(test='flush'):
+            self.assertLess(flush.call_count, len(self.CHUNKS))
+
+        with self.subTest(test='batches'):
+            self.assertEqual(bw.batches, flush.call_count)
+
+
+    def test_put_reads(self):
+        """Chunks should be read back while batches are being written."""
+        self.STORE.close()
+        self.STORE = _pack.PackStore(self.DIR, pack_size=1000)
+
+        stored = []
+        errors = []
+        done = threading.Event()
+
+        def reader():
+            while not done.is_set():
+                for ck in list(stored):
+                    if self.STORE.get(ck.id) != ck.data:
+                        errors.append(ck.id)
+
+        threads = [threading.Thread(target=reader) for _ in range(4)]
+        for th in threads:
+            th.start()
+
+        with _batch.BatchWriter(self.STORE) as bw:
+            for ck in self.CHUNKS:
+                bw.put(ck)
+                stored.append(ck)
+
+        done.set()
+        for th in threads:
+            th.join()
+
+        with self.subTest(test='packs'):
+            self.assertGreater(len(os.listdir(self.DIR)), 1)
+
+        with self.subTest(test='errors'):
+            self.assertEqual(errors, [])
+
+
+    def test_submit_max_bytes(self):
+        """A batch should be written once large enough."""
+        with _batch.BatchWriter(self.STORE, max_delay=60, max_bytes=200) as bw:
+            futures = [bw.submit(ck) for ck in self.CHUNKS[:2]]
+            for future in futures:
+                future.result(timeout=5)
+
+            self.assertEqual(bw.batches, 1)
+
+
+    def test_submit_closed(self):
+        """Storing chunks once closed should raise ``ValueError``."""
+        bw = _batch.BatchWriter(self.STORE)
+        bw.close()
+
+        with self.assertRaises(ValueError):
+            bw.submit(self.CHUNKS[0])
+
+
+    def test_submit_error(self):
+        """Store errors should be raised to the writers."""
+        with mock.patch.object(
+                _pack.PackStore, 'put_many', side_effect=OSError('disk full')
+        ):
+            with _batch.BatchWriter(self.STORE) as bw:
+                with self.assertRaises(OSError):
+                    bw.put(self.CHUNKS[0])
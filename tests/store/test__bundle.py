@@ -0,0 +1,249 @@
+# tests/store/test__bundle.py
+# ===========================
+#
+# Copying
+# -------
+#
+# Copyright (c) 2018 kado authors.
+#
+# This file is part of the *kado* project.
+#
+# kado is a free software project. You can redistribute it and/or
+# modify if under the terms of the MIT License.
+#
+# This software project is distributed *as is*, WITHOUT WARRANTY OF ANY
+# KIND; including but not limited to the WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE and NONINFRINGEMENT.
+#
+# You should have received a copy of the MIT License along with kado.
+# If not, see <http://opensource.org/licenses/MIT>.
+#
+import os
+import shutil
+import tempfile
+import unittest
+
+from unittest import mock
+
+from kado import constants as c
+from kado.store import _bundle, _journal, _pack, _store
+
+
+class TestBundle(unittest.TestCase):
+    """Test case for :class:`kado.store._bundle.Bundle`."""
+
+    def setUp(self):
+        """Setup test cases for :class:`kado.store._bundle.Bundle`."""
+        self.CHUNKS = [_store.Chunk(x * 10) for x in [b'a', b'b', b'c']]
+
+        self.BUNDLE = _bundle.Bundle()
+        for ck in self.CHUNKS:
+            self.BUNDLE.add(ck)
+
+
+    def test_add_same_chunk(self):
+        """A chunk should only be bundled once."""
+        size = self.BUNDLE.size
+        self.BUNDLE.add(_store.Chunk(b'a' * 10))
+
+        with self.subTest(test='len'):
+            self.assertEqual(len(self.BUNDLE), 3)
+
+        with self.subTest(test='size'):
+            self.assertEqual(self.BUNDLE.size, size)
+
+
+    def test_add_full(self):
+        """A chunk should not be bundled above the maximum size."""
+        bundle = _bundle.Bundle(max_size=100)
+
+        for ck, expected in zip(self.CHUNKS, [True, True, False]):
+            with self.subTest(chunk=ck.id):
+                self.assertEqual(bundle.add(ck), expected)
+
+
+    def test_seal(self):
+        """Bundled payloads should be sliced out of the bundle."""
+        blob, slices = self.BUNDLE.seal()
+
+        for ck in self.CHUNKS:
+            loc = slices[ck.id]
+            with self.subTest(chunk=ck.id):
+                self.assertEqual(
+                    blob.data[loc.offset:loc.offset + loc.length], ck.data
+                )
+
+
+    def test_table(self):
+        """The bundle table should match the bundle slices."""
+        blob, slices = self.BUNDLE.seal()
+        self.assertEqual(
+            _bundle.Bundle.table(blob.data),
+            [(key, x.offset, x.length) for key, x in slices.items()]
+        )
+
+
+    def test_table_valueerror(self):
+        """Invalid bundle payloads should raise ``ValueError``."""
+        blob, _ = self.BUNDLE.seal()
+
+        for data in [b'', b'x' * 16, blob.data[:40]]:
+            with self.subTest(data=data), self.assertRaises(ValueError):
+                _bundle.Bundle.table(data)
+
+
+class TestBundleStore(unittest.TestCase):
+    """Test case for :class:`kado.store._bundle.BundleStore`."""
+
+    def setUp(self):
+        """Setup test cases for :class:`kado.store._bundle.BundleStore`."""
+        self.DIR = tempfile.mkdtemp()
+        self.PACKS = _pack.PackStore(self.DIR)
+
+        # Many small items and a large one.
+        self.ITEMS = [
+            _store.Item('file {}\\n'.format(i).encode() * (i + 1))
+            for i in range(200)
+        ]
+        self.ITEMS.append(_store.Item(b'x' * (c.GHASH_CHUNK_LO + 1)))
+
+        self.STORE = _bundle.BundleStore(self.PACKS, max_size=4096)
+        for item in self.ITEMS:
+            for ck in item.chunks:
+                self.STORE.put(ck)
+
+
+    def tearDown(self):
+        """Cleanup test cases for :class:`kado.store._bundle.BundleStore`."""
+        self.PACKS.close()
+        shutil.rmtree(self.DIR)
+
+
+    def test_get(self):
+        """Items should be read back, bundled or not."""
+        for flushed in [False, True]:
+            if flushed:
+                self.STORE.flush()
+
+            for item in self.ITEMS:
+                with self.subTest(flushed=flushed, item=item.id):
+                    self.assertEqual(
+                        _store.Item.from_manifest(
+                            item.manifest(), self.STORE
+                        ).data,
+                        item.data
+                    )
+
+
+    def test_get_invalid_key(self):
+        """Get a chunk which is not stored should raise ``KeyError``."""
+        with self.assertRaises(KeyError):
+            self.STORE.get(_store.Chunk(b'missing').id)
+
+
+    def test_put_bundled(self):
+        """Small chunks should be stored in few bundles."""
+        self.STORE.flush()
+
+        with self.subTest(test='stored'):
+            self.assertEqual(len(self.PACKS), len(self.STORE.blobs()) + 1)
+
+        with self.subTest(test='bundles'):
+            self.assertLess(len(self.STORE.blobs()), len(self.ITEMS) // 2)
+
+
+    def test_put_dedup(self):
+        """Small chunks should keep their identifier as deduplication key."""
+        self.STORE.flush()
+        blobs = self.STORE.blobs()
+        self.STORE.put(_store.Chunk(self.ITEMS[0].data))
+        self.STORE.flush()
+
+        self.assertEqual(self.STORE.blobs(), blobs)
+
+
+    def test_register(self):
+        """Bundled chunks should be found back from the stored bundles."""
+        self.STORE.flush()
+        store = _bundle.BundleStore(self.PACKS, blobs=self.STORE.blobs())
+
+        self.assertEqual(
+            store.get(self.ITEMS[42].chunks[0].id), self.ITEMS[42].data
+        )
+
+
+    def test_close(self):
+        """Pending small chunks should be stored when the store is closed."""
+        key = self.ITEMS[0].chunks[0].id
+        with self.STORE:
+            pass
+
+        with self.subTest(test='slices'):
+            self.assertIn(key, self.STORE.slices)
+
+        with self.subTest(test='blobs'):
+            self.assertIn(self.STORE.slices.get(key)[0].blob, self.PACKS)
+
+
+    def test_flush_slices(self):
+        """Slices should only be recorded once the store was flushed."""
+        self.STORE._bundle_put()
+        key = self.ITEMS[0].chunks[0].id
+
+        with self.subTest(test='pending'):
+            self.assertNotIn(key, self.STORE.slices)
+            self.assertEqual(self.STORE.get(key), self.ITEMS[0].data)
+
+        self.STORE.flush()
+        with self.subTest(test='flushed'):
+            self.assertIn(key, self.STORE.slices)
+
+
+    def test_reopen(self):
+        """Bundled chunks should be found back from a journaled index once the
+        store is reopened, without reading the bundles.
+
+        """
+        path = os.path.join(self.DIR, 'slices')
+        with _journal.JournaledIndex(path) as slices:
+            store = _bundle.BundleStore(
+                self.PACKS, max_size=4096, slices=slices
+            )
+            for item in self.ITEMS:
+                for ck in item.chunks:
+                    store.put(ck)
+            store.flush()
+            blobs = store.blobs()
+        self.PACKS.close()
+
+        self.PACKS = _pack.PackStore(self.DIR)
+        with _journal.JournaledIndex(path) as slices, mock.patch.object(
+            _pack.PackStore, 'get', autospec=True,
+            side_effect=_pack.PackStore.get,
+        ) as get:
+            store = _bundle.BundleStore(
+                self.PACKS, max_size=4096, slices=slices
+            )
+
+            with self.subTest(test='read'):
+                self.assertEqual(get.call_count, 0)
+
+            with self.subTest(test='blobs'):
+                self.assertEqual(store.blobs(), blobs)
+
+            for item in self.ITEMS:
+                with self.subTest(item=item.id):
+                    self.assertEqual(
+                        _store.Item.from_manifest(
+                            item.manifest(), store
+                        ).data,
+                        item.data
+                    )
+
+            with self.subTest(test='dedup'):
+                for item in self.ITEMS:
+                    for ck in item.chunks:
+                        store.put(ck)
+                store.flush()
+
+                self.assertEqual(store.blobs(), blobs)
@@ -0,0 +1,186 @@
+# tests/store/test__cache.py
+# ==========================
+#
+# Copying
+# -------
+#
+# Copyright (c) 2018 kado authors.
+#
+# This file is part of the *kado* project.
+#
+# kado is a free software project. You can redistribute it and/or
+# modify if under the terms of the MIT License.
+#
+# This software project is distributed *as is*, WITHOUT WARRANTY OF ANY
+# KIND; including but not limited to the WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE and NONINFRINGEMENT.
+#
+# You should have received a copy of the MIT License along with kado.
+# If not, see <http://opensource.org/licenses/MIT>.
+#
+import unittest
+import threading
+
+from kado.store import _cache, _store
+
+from tests.store.test__store import CountingStore
+
+
+class TestTinyLFUPolicy(unittest.TestCase):
+    """Test case for :class:`kado.store._cache.TinyLFUPolicy`."""
+
+    def setUp(self):
+        """Setup test cases for :class:`kado.store._cache.TinyLFUPolicy`."""
+        self.POLICY = _cache.TinyLFUPolicy(width=64)
+
+
+    def test_frequency(self):
+        """Recorded accesses should be counted."""
+        for _ in range(3):
+            self.POLICY.record('a')
+
+        for key, expected in [('a', 3), ('b', 0)]:
+            with self.subTest(key=key):
+                self.assertEqual(self.POLICY.frequency(key), expected)
+
+
+    def test_frequency_max(self):
+        """Counters should saturate."""
+        for _ in range(100):
+            self.POLICY.record('a')
+
+        self.assertEqual(
+            self.POLICY.frequency('a'), _cache.TinyLFUPolicy.COUNTER_MAX
+        )
+
+
+    def test_reset(self):
+        """Counters should be halved once the sample size is reached."""
+        for _ in range(self.POLICY.sample_size):
+            self.POLICY.record('a')
+
+        self.assertEqual(
+            self.POLICY.frequency('a'), _cache.TinyLFUPolicy.COUNTER_MAX // 2
+        )
+
+
+    def test_admit(self):
+        """Only keys more frequent than the victims should be admitted."""
+        self.POLICY.record('a')
+        self.POLICY.record('a')
+        self.POLICY.record('b')
+
+        for key, victims, expected in [
+            ('a', ['b'], True), ('b', ['a'], False), ('b', ['b'], False),
+        ]:
+            with self.subTest(key=key, victims=victims):
+                self.assertEqual(self.POLICY.admit(key, victims), expected)
+
+
+class TestChunkCache(unittest.TestCase):
+    """Test case for :class:`kado.store._cache.ChunkCache`."""
+
+    def setUp(self):
+        """Setup test cases for :class:`kado.store._cache.ChunkCache`."""
+        self.CHUNKS = [_store.Chunk(x * 100) for x in [b'a', b'b', b'c']]
+        self.STORE = CountingStore(self.CHUNKS)
+
+        # Room for two chunks.
+        self.CACHE = _cache.ChunkCache(self.STORE, size=200)
+
+
+    def test_get(self):
+        """Payloads should be fetched from the store once."""
+        for _ in range(3):
+            self.assertEqual(self.CACHE.get(self.CHUNKS[0].id), b'a' * 100)
+
+        with self.subTest(test='fetched'):
+            self.assertEqual(self.STORE.fetched, 1)
+
+        with self.subTest(test='stats'):
+            self.assertEqual(self.CACHE.stats(), {
+                'hits': 2, 'misses': 1, 'evictions': 0,
+                'count': 1, 'size': 100,
+            })
+
+
+    def test_get_invalid_key(self):
+        """Get a chunk which is not stored should raise ``KeyError``."""
+        with self.assertRaises(KeyError):
+            self.CACHE.get('missing')
+
+
+    def test_get_evict(self):
+        """The least recently used payloads should be evicted."""
+        a, b, c = (ck.id for ck in self.CHUNKS)
+        for key in [a, b, a, c]:
+            self.CACHE.get(key)
+
+        with self.subTest(test='cached'):
+            self.assertEqual([x in self.CACHE for x in (a, b, c)],
+                             [True, False, True])
+
+        with self.subTest(test='evictions'):
+            self.assertEqual(self.CACHE.evictions, 1)
+
+        with self.subTest(test='size'):
+            self.assertEqual(self.CACHE.size, 200)
+
+
+    def test_get_too_large(self):
+        """Payloads larger than the cache should not be cached."""
+        cache = _cache.ChunkCache(self.STORE, size=50)
+        cache.get(self.CHUNKS[0].id)
+
+        self.assertEqual(len(cache), 0)
+
+
+    def test_get_tinylfu(self):
+        """Rarely accessed payloads should not evict popular ones."""
+        a, b, c = (ck.id for ck in self.CHUNKS)
+        cache = _cache.ChunkCache(
+            self.STORE, size=200, policy=_cache.TinyLFUPolicy(width=64)
+        )
+        for key in [a, a, b, b, c]:
+            cache.get(key)
+
+        self.assertEqual([x in cache for x in (a, b, c)], [True, True, False])
+
+
+    def test_discard(self):
+        """Discarded payloads should be fetched again."""
+        key = self.CHUNKS[0].id
+        self.CACHE.get(key)
+        self.CACHE.discard(key)
+        self.CACHE.get(key)
+
+        self.assertEqual(self.STORE.fetched, 2)
+
+
+    def test_clear(self):
+        """Clear the cache."""
+        self.CACHE.get(self.CHUNKS[0].id)
+        self.CACHE.clear()
+
+        self.assertEqual((len(self.CACHE), self.CACHE.size), (0, 0))
+
+
+    def test_get_threads(self):
+        """Concurrent reads should keep the cache within its size."""
+        keys = [ck.id for ck in self.CHUNKS]
+
+        def worker():
+            for i in range(300):
+                self.CACHE.get(keys[i % 3])
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+
+        with self.subTest(test='size'):
+            self.assertLessEqual(self.CACHE.size, 200)
+
+        with self.subTest(test='counters'):
+            self.assertEqual(self.CACHE.hits + self.CACHE.misses, 1200)
@@ -0,0 +1,1086 @@
+# tests/store/test__index.py
+# ==========================
+#
+# Copying
+# -------
+#
+# Copyright (c) 2018 kado authors.
+#
+# This file is part of the *kado* project.
+#
+# kado is a free software project. You can redistribute it and/or
+# modify if under the terms of the MIT License.
+#
+# This software project is distributed *as is*, WITHOUT WARRANTY OF ANY
+# KIND; including but not limited to the WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE and NONINFRINGEMENT.
+#
+# You should have received a copy of the MIT License along with kado.
+# If not, see <http://opensource.org/licenses/MIT>.
+#
+import io
+import os
+import shutil
+import uuid
+import tempfile
+import unittest
+import threading
+
+from unittest import mock
+
+from kado.store import _index, _store
+from kado.utils import bloom
+
+
+class TestCompactIndex(unittest.TestCase):
+    """Test case for :class:`kado.store._index.CompactIndex`."""
+
+    def setUp(self):
+        """Setup test cases for :class:`kado.store._index.CompactIndex`."""
+        # Index keys.
+        self.KEY1 = b'K' * 16
+        self.KEY2 = b'L' * 16
+
+        # Index values.
+        self.VALUE1 = 1
+        self.VALUE2 = 2
+
+        # Empty index.
+        self.IX_EMPTY = _index.CompactIndex()
+
+        # Index with one key and one stored value.
+        self.IX_K1V1 = _index.CompactIndex()
+        self.IX_K1V1.add(self.KEY1, self.VALUE1)
+
+        # Index with one key and two values.
+        self.IX_K1V2 = _index.CompactIndex()
+        self.IX_K1V2.add(self.KEY1, self.VALUE1)
+        self.IX_K1V2.add(self.KEY1, self.VALUE2)
+
+        # Index with two keys, two values each.
+        self.IX_K2V2 = _index.CompactIndex()
+        self.IX_K2V2.add(self.KEY1, self.VALUE1)
+        self.IX_K2V2.add(self.KEY1, self.VALUE2)
+
+        self.IX_K2V2.add(self.KEY2, self.VALUE1)
+        self.IX_K2V2.add(self.KEY2, self.VALUE2)
+
+
+    def test___init___valueerror(self):
+        """An unsupported value size should raise ``ValueError``."""
+        with self.assertRaises(ValueError):
+            _index.CompactIndex(value_size=3)
+
+
+    def test___contains__(self):
+        """Test key containment."""
+        with self.subTest(test='in'):
+            self.assertIn(self.KEY1, self.IX_K2V2)
+
+        with self.subTest(test='not in'):
+            self.assertNotIn(self.KEY2, self.IX_K1V1)
+
+
+    def test___contains___invalid_size(self):
+        """A key of another size should not be found."""
+        self.assertNotIn(b'K', self.IX_K1V1)
+
+
+    def test___contains___invalid_type(self):
+        """A key of another type should not be found."""
+        for key in [None, 1, 'K' * 16]:
+            with self.subTest(key=key):
+                self.assertNotIn(key, self.IX_K1V1)
+
+
+    def test_uuid_key(self):
+        """Identifiers should be used as keys through their binary form."""
+        key = _store.Chunk(b'1').id
+        self.IX_EMPTY.add(key, self.VALUE1)
+
+        with self.subTest(test='contains'):
+            self.assertIn(key, self.IX_EMPTY)
+
+        with self.subTest(test='get'):
+            self.assertEqual(self.IX_EMPTY.get(key), [self.VALUE1])
+
+        with self.subTest(test='iter'):
+            self.assertEqual(list(self.IX_EMPTY), [key.bytes])
+
+        with self.subTest(test='remove'):
+            self.IX_EMPTY.remove(key)
+            self.assertNotIn(key, self.IX_EMPTY)
+
+
+    def test___iter__(self):
+        """Each key should be iterated once, whatever its values."""
+        self.assertEqual(sorted(self.IX_K2V2), [self.KEY1, self.KEY2])
+
+
+    def test___len__(self):
+        """The length should be the number of keys."""
+        for ix, expected in [
+            (self.IX_EMPTY, 0), (self.IX_K1V2, 1), (self.IX_K2V2, 2),
+        ]:
+            with self.subTest(length=expected):
+                self.assertEqual(len(ix), expected)
+
+
+    def test_clear(self):
+        """Clear the index."""
+        self.IX_K2V2.clear()
+
+        with self.subTest(test='len'):
+            self.assertEqual(len(self.IX_K2V2), 0)
+
+        with self.subTest(test='count'):
+            self.assertEqual(self.IX_K2V2.count(), 0)
+
+
+    def test_count(self):
+        """Count entries of the index and of a key."""
+        with self.subTest(key=None):
+            self.assertEqual(self.IX_K2V2.count(), 4)
+
+        with self.subTest(key=self.KEY1):
+            self.assertEqual(self.IX_K2V2.count(self.KEY1), 2)
+
+
+    def test_get(self):
+        """Get the values stored under a key."""
+        self.assertEqual(
+            sorted(self.IX_K1V2.get(self.KEY1)), [self.VALUE1, self.VALUE2]
+        )
+
+
+    def test_get_invalid_key(self):
+        """Get nonexistent key should raise a ``KeyError``."""
+        for key in [self.KEY2, b'K', None]:
+            with self.subTest(key=key), self.assertRaises(KeyError):
+                self.IX_K1V1.get(key)
+
+
+    def test_view(self):
+        """Get the values stored under a key as a set."""
+        self.assertEqual(
+            self.IX_K1V2.view(self.KEY1), {self.VALUE1, self.VALUE2}
+        )
+
+
+    def test_add_same_value(self):
+        """Adding twice the same value should only store it once."""
+        self.IX_K1V1.add(self.KEY1, self.VALUE1)
+
+        with self.subTest(test='get'):
+            self.assertEqual(self.IX_K1V1.get(self.KEY1), [self.VALUE1, ])
+
+        with self.subTest(test='count'):
+            self.assertEqual(self.IX_K1V1.count(), 1)
+
+
+    def test_add_invalid_key(self):
+        """Adding a key of another size should raise ``ValueError``."""
+        with self.assertRaises(ValueError):
+            self.IX_EMPTY.add(b'K', self.VALUE1)
+
+
+    def test_add_invalid_value(self):
+        """Adding a value out of the value size should raise
+        ``OverflowError``.
+
+        """
+        ix = _index.CompactIndex(value_size=1)
+        with self.assertRaises(OverflowError):
+            ix.add(self.KEY1, 256)
+
+
+    def test_add_many_resize(self):
+        """Entries should be kept when the table grows."""
+        pairs = [(i.to_bytes(16, 'little'), i) for i in range(1000)]
+
+        with self.subTest(test='return'):
+            self.assertEqual(self.IX_EMPTY.add_many(pairs), 1000)
+
+        with self.subTest(test='len'):
+            self.assertEqual(len(self.IX_EMPTY), 1000)
+
+        with self.subTest(test='get'):
+            for key, value in pairs:
+                self.assertEqual(self.IX_EMPTY.get(key), [value])
+
+
+    def test_remove_key(self):
+        """Remove all the values of a key."""
+        self.IX_K2V2.remove(self.KEY1)
+
+        with self.subTest(test='contains'):
+            self.assertNotIn(self.KEY1, self.IX_K2V2)
+
+        with self.subTest(test='count'):
+            self.assertEqual(self.IX_K2V2.count(), 2)
+
+
+    def test_remove_value(self):
+        """Remove a value from an index key."""
+        self.IX_K1V2.remove(self.KEY1, self.VALUE1)
+
+        with self.subTest(test='get'):
+            self.assertEqual(self.IX_K1V2.get(self.KEY1), [self.VALUE2, ])
+
+        with self.subTest(test='len'):
+            self.assertEqual(len(self.IX_K1V2), 1)
+
+
+    def test_remove_last_entry(self):
+        """Remove last value from index entry should remove the entry itself."""
+        self.IX_K1V1.remove(self.KEY1, self.VALUE1)
+        self.assertEqual(len(self.IX_K1V1), 0)
+
+
+    def test_remove_invalid_key(self):
+        """Removing nonexistent key should raise a ``KeyError``."""
+        with self.assertRaises(KeyError):
+            self.IX_K1V1.remove(self.KEY2)
+
+
+    def test_remove_invalid_value(self):
+        """Remove nonexistent value should raise ``ValueError``."""
+        with self.assertRaises(ValueError):
+            self.IX_K1V1.remove(self.KEY1, self.VALUE2)
+
+
+    def test_remove_readd(self):
+        """Entries should be added back after being removed."""
+        self.IX_K1V1.remove(self.KEY1)
+        self.IX_K1V1.add(self.KEY1, self.VALUE2)
+
+        self.assertEqual(self.IX_K1V1.get(self.KEY1), [self.VALUE2, ])
+
+
+    def test_discard_many(self):
+        """Discard a batch of entries, some of them missing."""
+        self.IX_K2V2.discard_many([
+            (self.KEY1, self.VALUE1),
+            (self.KEY1, 3),
+            (b'M' * 16, None),
+            (self.KEY2, None),
+        ])
+
+        with self.subTest(test='len'):
+            self.assertEqual(len(self.IX_K2V2), 1)
+
+        with self.subTest(test='count'):
+            self.assertEqual(self.IX_K2V2.count(), 1)
+
+
+    def test_contains_many(self):
+        """Check the presence of a batch of keys."""
+        self.assertEqual(
+            self.IX_K1V1.contains_many([self.KEY1, self.KEY2]), [True, False]
+        )
+
+
+class TestDiskIndex(unittest.TestCase):
+    """Test case for :class:`kado.store._index.DiskIndex`."""
+
+    def setUp(self):
+        """Setup test cases for :class:`kado.store._index.DiskIndex`."""
+        self.DIR = tempfile.mkdtemp()
+        self.PATH = os.path.join(self.DIR, 'index')
+
+        # Index keys.
+        self.KEY1 = b'K' * 16
+        self.KEY2 = b'L' * 16
+
+        # Index values.
+        self.VALUE1 = 1
+        self.VALUE2 = 2
+
+        # Index with two keys, two values each.
+        self.IX_K2V2 = _index.DiskIndex(self.PATH)
+        self.IX_K2V2.add_many([
+            (self.KEY1, self.VALUE1), (self.KEY1, self.VALUE2),
+            (self.KEY2, self.VALUE1), (self.KEY2, self.VALUE2),
+        ])
+
+
+    def tearDown(self):
+        """Cleanup test cases for :class:`kado.store._index.DiskIndex`."""
+        self.IX_K2V2.close()
+        shutil.rmtree(self.DIR)
+
+
+    def test___contains__(self):
+        """Test key containment."""
+        for key, expected in [
+            (self.KEY1, True), (b'M' * 16, False), (b'K', False),
+            (None, False), (uuid.UUID(bytes=self.KEY1), True),
+        ]:
+            with self.subTest(key=key):
+                self.assertEqual(key in self.IX_K2V2, expected)
+
+
+    def test___iter__(self):
+        """Each key should be iterated once, whatever its values."""
+        self.assertEqual(sorted(self.IX_K2V2), [self.KEY1, self.KEY2])
+
+
+    def test_count(self):
+        """Count entries of the index and of a key."""
+        with self.subTest(key=None):
+            self.assertEqual(self.IX_K2V2.count(), 4)
+
+        with self.subTest(key=self.KEY1):
+            self.assertEqual(self.IX_K2V2.count(self.KEY1), 2)
+
+
+    def test_get(self):
+        """Get the values stored under a key."""
+        self.assertEqual(
+            sorted(self.IX_K2V2.get(self.KEY1)), [self.VALUE1, self.VALUE2]
+        )
+
+
+    def test_get_invalid_key(self):
+        """Get nonexistent key should raise a ``KeyError``."""
+        for key in [b'M' * 16, b'K', None]:
+            with self.subTest(key=key), self.assertRaises(KeyError):
+                self.IX_K2V2.get(key)
+
+
+    def test_uuid_key(self):
+        """Identifiers should be used as keys through their binary form."""
+        key = _store.Chunk(b'1').id
+        self.IX_K2V2.add(key, self.VALUE1)
+
+        with self.subTest(test='contains'):
+            self.assertIn(key, self.IX_K2V2)
+
+        with self.subTest(test='get'):
+            self.assertEqual(self.IX_K2V2.get(key), [self.VALUE1])
+
+        with self.subTest(test='remove'):
+            self.IX_K2V2.remove(key)
+            self.assertNotIn(key, self.IX_K2V2)
+
+
+    def test_filtered_uuid_key(self):
+        """Identifiers should be found through a filter in front of the
+        index.
+
+        """
+        key = _store.Chunk(b'1').id
+        ix = _index.FilteredIndex(self.IX_K2V2)
+        ix.add(key, self.VALUE1)
+
+        with self.subTest(test='contains'):
+            self.assertIn(key, ix)
+
+        with self.subTest(test='get'):
+            self.assertEqual(ix.get(key), [self.VALUE1])
+
+
+    def test_add_same_value(self):
+        """Adding twice the same value should only store it once."""
+        self.assertEqual(
+            self.IX_K2V2.add_many([(self.KEY1, self.VALUE1)]), 0
+        )
+
+
+    def test_add_overflow(self):
+        """Entries should be kept when buckets overflow."""
+        pairs = [(i.to_bytes(16, 'little'), i) for i in range(2000)]
+        self.IX_K2V2.add_many(pairs)
+
+        with self.subTest(test='len'):
+            self.assertEqual(len(self.IX_K2V2), 2002)
+
+        with self.subTest(test='get'):
+            for key, value in pairs:
+                self.assertEqual(self.IX_K2V2.get(key), [value])
+
+
+    def test_add_grow(self):
+        """The hash table should grow as entries are added."""
+        buckets = self.IX_K2V2._buckets
+        pairs = [(i.to_bytes(16, 'little'), i) for i in range(20000)]
+        self.IX_K2V2.add_many(pairs)
+
+        with self.subTest(test='buckets'):
+            self.assertGreater(self.IX_K2V2._buckets, buckets)
+
+        with self.subTest(test='overflow'):
+            self.assertLess(
+                self.IX_K2V2._end - _index._DISK_DATA,
+                2 * self.IX_K2V2._buckets * self.IX_K2V2._bucket_size
+            )
+
+        with self.subTest(test='count'):
+            self.assertEqual(self.IX_K2V2.count(), 20004)
+
+        with self.subTest(test='get'):
+            for key, value in pairs:
+                self.assertEqual(self.IX_K2V2.get(key), [value])
+
+        with self.subTest(test='values'):
+            self.assertEqual(
+                self.IX_K2V2.get(self.KEY1), [self.VALUE1, self.VALUE2]
+            )
+
+
+    def test_clear(self):
+        """Clearing the index should remove all its entries."""
+        self.IX_K2V2.clear()
+
+        with self.subTest(test='len'):
+            self.assertEqual(len(self.IX_K2V2), 0)
+
+        with self.subTest(test='count'):
+            self.assertEqual(self.IX_K2V2.count(), 0)
+
+        with self.subTest(test='contains'):
+            self.assertNotIn(self.KEY1, self.IX_K2V2)
+
+
+    def test_view(self):
+        """Entries of a key should be given as a set."""
+        self.assertEqual(
+            self.IX_K2V2.view(self.KEY1), {self.VALUE1, self.VALUE2}
+        )
+
+
+    def test_itervalues(self):
+        """Entries of a key should be iterated."""
+        self.assertEqual(
+            list(self.IX_K2V2.itervalues(self.KEY1)), [self.VALUE1, self.VALUE2]
+        )
+
+
+    def test_remove_many(self):
+        """Remove a batch of entries."""
+        self.IX_K2V2.remove_many([(self.KEY1, None), (self.KEY2, self.VALUE1)])
+
+        with self.subTest(test='count'):
+            self.assertEqual(self.IX_K2V2.count(), 1)
+
+        with self.subTest(error='KeyError'), self.assertRaises(KeyError):
+            self.IX_K2V2.remove_many([(self.KEY1, None)])
+
+
+    def test_discard_many(self):
+        """Discard a batch of entries, ignoring the missing ones."""
+        self.IX_K2V2.discard_many([
+            (self.KEY1, None), (b'M' * 16, None), (self.KEY2, 3),
+        ])
+        self.assertEqual(self.IX_K2V2.count(), 2)
+
+
+    def test_overflow_header_first(self):
+        """The header should be written to disk before an overflow bucket is
+        linked.
+
+        """
+        ix = self.IX_K2V2
+        link = _index._DISK_DATA + ix._bucket_size - _index._DISK_NEXT.size
+
+        # End of the used area and bucket link when the header is saved.
+        calls = []
+        with mock.patch.object(
+            _index.DiskIndex, '_header_save', autospec=True,
+            side_effect=lambda x: calls.append(
+                (x._end, _index._DISK_NEXT.unpack_from(x._mm, link)[0])
+            )
+        ):
+            ix._overflow_new(_index._DISK_DATA)
+
+        self.assertEqual(calls, [(ix._end, 0)])
+
+
+    def test_remove_value(self):
+        """Remove a value from an index key."""
+        self.IX_K2V2.remove(self.KEY1, self.VALUE1)
+
+        with self.subTest(test='get'):
+            self.assertEqual(self.IX_K2V2.get(self.KEY1), [self.VALUE2, ])
+
+        with self.subTest(test='len'):
+            self.assertEqual(len(self.IX_K2V2), 2)
+
+
+    def test_remove_key(self):
+        """Remove all the values of a key."""
+        self.IX_K2V2.remove(self.KEY1)
+
+        with self.subTest(test='contains'):
+            self.assertNotIn(self.KEY1, self.IX_K2V2)
+
+        with self.subTest(test='count'):
+            self.assertEqual(self.IX_K2V2.count(), 2)
+
+
+    def test_remove_invalid(self):
+        """Remove nonexistent entries should raise an error."""
+        with self.subTest(error='KeyError'), self.assertRaises(KeyError):
+            self.IX_K2V2.remove(b'M' * 16)
+
+        with self.subTest(error='ValueError'), self.assertRaises(ValueError):
+            self.IX_K2V2.remove(self.KEY1, 3)
+
+
+    def test_reopen(self):
+        """Entries should be found back once the index is opened again."""
+        self.IX_K2V2.remove(self.KEY2, self.VALUE2)
+        self.IX_K2V2.close()
+
+        with _index.DiskIndex(self.PATH) as ix:
+            with self.subTest(test='count'):
+                self.assertEqual(ix.count(), 3)
+
+            with self.subTest(test='get'):
+                self.assertEqual(ix.get(self.KEY2), [self.VALUE1, ])
+
+
+    def test_reopen_header_corrupted(self):
+        """The previous header should be used when the last one is corrupted.
+        """
+        self.IX_K2V2.add(self.KEY2, 3)
+        self.IX_K2V2.close()
+
+        # Only the last header holds the new entry, break its checksum.
+        with open(self.PATH, 'r+b') as fp:
+            fp.seek(0 if self.IX_K2V2._seq % 2 == 0 else 64)
+            fp.write(b'\xff' * 8)
+
+        with _index.DiskIndex(self.PATH) as ix:
+            self.assertEqual(ix.count(), 4)
+
+
+    def test_reopen_key_size(self):
+        """Opening an index with another key size should raise ``ValueError``.
+        """
+        self.IX_K2V2.close()
+        with self.assertRaises(ValueError):
+            _index.DiskIndex(self.PATH, key_size=8)
+
+
+    def test_readonly(self):
+        """A read-only index should see the writer changes once reloaded."""
+        with _index.DiskIndex(self.PATH, readonly=True) as ix:
+            self.IX_K2V2.add_many(
+                (i.to_bytes(16, 'little'), i) for i in range(2000)
+            )
+            ix.reload()
+
+            with self.subTest(test='count'):
+                self.assertEqual(ix.count(), self.IX_K2V2.count())
+
+            with self.subTest(test='get'):
+                self.assertEqual(ix.get((1999).to_bytes(16, 'little')), [1999])
+
+
+    def test_readonly_unsupported(self):
+        """Modifying a read-only index should raise
+        ``io.UnsupportedOperation``.
+
+        """
+        with _index.DiskIndex(self.PATH, readonly=True) as ix:
+            for name, args in [
+                ('add', (self.KEY1, 3)), ('remove', (self.KEY1, )),
+                ('discard', (self.KEY1, )),
+            ]:
+                with self.subTest(method=name):
+                    with self.assertRaises(io.UnsupportedOperation):
+                        getattr(ix, name)(*args)
+
+
+class TestFilteredIndex(unittest.TestCase):
+    """Test case for :class:`kado.store._index.FilteredIndex`."""
+
+    def setUp(self):
+        """Setup test cases for :class:`kado.store._index.FilteredIndex`."""
+        self.KEY1 = uuid.UUID('14c1130e-e81a-12b5-5612-ae6acfb29ae5')
+        self.KEY2 = uuid.UUID('e4ec00ad-ce69-421f-3735-73fe96da3b03')
+
+        self.IX = _store.Index()
+        self.IX.add(self.KEY1, 1)
+        self.IX_FILTERED = _index.FilteredIndex(self.IX, capacity=100)
+
+
+    def test___init___existing_keys(self):
+        """Keys already in the index should be added to the filter."""
+        self.assertIn(self.KEY1.bytes, self.IX_FILTERED.bloom)
+
+
+    def test___init___bloom(self):
+        """A given filter should be used as is."""
+        bf = bloom.BloomFilter(100)
+        self.assertIs(_index.FilteredIndex(self.IX, bloom=bf).bloom, bf)
+
+
+    def test___contains__(self):
+        """Test key containment."""
+        for key, expected in [(self.KEY1, True), (self.KEY2, False)]:
+            with self.subTest(key=key):
+                self.assertEqual(key in self.IX_FILTERED, expected)
+
+
+    def test___contains___filtered(self):
+        """Keys rejected by the filter should not be looked up in the index."""
+        with mock.patch.object(_store.Index, '__contains__') as contains:
+            self.assertNotIn(self.KEY2, self.IX_FILTERED)
+
+        contains.assert_not_called()
+
+
+    def test_add(self):
+        """Added entries should be found from the filter and the index."""
+        self.IX_FILTERED.add(self.KEY2, 2)
+
+        with self.subTest(test='contains'):
+            self.assertIn(self.KEY2, self.IX_FILTERED)
+
+        with self.subTest(test='get'):
+            self.assertEqual(self.IX_FILTERED.get(self.KEY2), [2, ])
+
+
+    def test_add_many(self):
+        """Add a batch of entries."""
+        self.assertEqual(
+            self.IX_FILTERED.add_many([(self.KEY1, 1), (self.KEY2, 2)]), 1
+        )
+        self.assertIn(self.KEY2, self.IX_FILTERED)
+
+
+    def test_get_invalid_key(self):
+        """Get nonexistent key should raise a ``KeyError``."""
+        with self.assertRaises(KeyError):
+            self.IX_FILTERED.get(self.KEY2)
+
+
+    def test_remove(self):
+        """Removed keys should not be found anymore."""
+        self.IX_FILTERED.remove(self.KEY1)
+        self.assertNotIn(self.KEY1, self.IX_FILTERED)
+
+
+    def test_remove_invalid_key(self):
+        """Removing nonexistent key should raise a ``KeyError``."""
+        with self.assertRaises(KeyError):
+            self.IX_FILTERED.remove(self.KEY2)
+
+
+    def test_add_many_same_key(self):
+        """Keys already in the index should not be counted again by the
+        filter.
+
+        """
+        self.IX_FILTERED.add_many([(self.KEY1, 2), (self.KEY2, 2)] * 3)
+        self.assertEqual(len(self.IX_FILTERED.bloom), 2)
+
+
+    def test_clear(self):
+        """Clearing the index should also reset the filter."""
+        self.IX_FILTERED.clear()
+
+        with self.subTest(test='len'):
+            self.assertEqual(len(self.IX_FILTERED), 0)
+
+        with self.subTest(test='bloom'):
+            self.assertEqual(len(self.IX_FILTERED.bloom), 0)
+
+        with self.subTest(test='contains'):
+            self.assertNotIn(self.KEY1.bytes, self.IX_FILTERED.bloom)
+
+
+    def test_view(self):
+        """Entries of a key should be given as a set."""
+        with self.subTest(test='view'):
+            self.assertEqual(self.IX_FILTERED.view(self.KEY1), {1})
+
+        with self.subTest(test='itervalues'):
+            self.assertEqual(list(self.IX_FILTERED.itervalues(self.KEY1)), [1])
+
+        for name in ['view', 'itervalues']:
+            with self.subTest(method=name), self.assertRaises(KeyError):
+                getattr(self.IX_FILTERED, name)(self.KEY2)
+
+
+    def test_remove_many(self):
+        """Remove a batch of entries."""
+        self.IX_FILTERED.remove_many([(self.KEY1, 1)])
+
+        with self.subTest(test='contains'):
+            self.assertNotIn(self.KEY1, self.IX_FILTERED)
+
+        with self.subTest(error='KeyError'), self.assertRaises(KeyError):
+            self.IX_FILTERED.remove_many([(self.KEY2, None)])
+
+
+    def test_discard_many(self):
+        """Keys rejected by the filter should not reach the index."""
+        seen = []
+        with mock.patch.object(
+            _store.Index, 'discard_many', autospec=True,
+            side_effect=lambda ix, pairs: seen.extend(pairs)
+        ):
+            self.IX_FILTERED.discard_many([(self.KEY1, None), (self.KEY2, 2)])
+
+        self.assertEqual(seen, [(self.KEY1, None)])
+
+
+class TestShardedIndex(unittest.TestCase):
+    """Test case for :class:`kado.store._index.ShardedIndex`."""
+
+    def setUp(self):
+        """Setup test cases for :class:`kado.store._index.ShardedIndex`."""
+        self.PAIRS = [(uuid.UUID(int=i), i % 3) for i in range(100)]
+
+        self.IX = _index.ShardedIndex(shards=4)
+        self.IX.add_many(self.PAIRS)
+
+
+    def test___init___valueerror(self):
+        """Less than one shard should raise ``ValueError``."""
+        with self.assertRaises(ValueError):
+            _index.ShardedIndex(shards=0)
+
+
+    def test___contains__(self):
+        """Test key containment."""
+        for key, expected in [
+            (uuid.UUID(int=1), True), (uuid.UUID(int=100), False),
+        ]:
+            with self.subTest(key=key):
+                self.assertEqual(key in self.IX, expected)
+
+
+    def test___iter__(self):
+        """All the keys should be iterated over."""
+        self.assertEqual(
+            sorted(self.IX), sorted(key for key, _ in self.PAIRS)
+        )
+
+
+    def test___len__(self):
+        """The length should be the number of keys of all shards."""
+        self.assertEqual(len(self.IX), len(self.PAIRS))
+
+
+    def test_count(self):
+        """Count entries of the index and of a key."""
+        self.IX.add(uuid.UUID(int=1), 5)
+
+        with self.subTest(key=None):
+            self.assertEqual(self.IX.count(), 101)
+
+        with self.subTest(key=1):
+            self.assertEqual(self.IX.count(uuid.UUID(int=1)), 2)
+
+
+    def test_factory(self):
+        """Shards should be created from the given factory."""
+        ix = _index.ShardedIndex(shards=2, factory=_index.CompactIndex)
+        ix.add(b'K' * 16, 1)
+
+        self.assertEqual(ix.get(b'K' * 16), [1, ])
+
+
+    def test_add_if_absent(self):
+        """Entries should only be added under absent keys."""
+        for key, expected in [
+            (uuid.UUID(int=1), False), (uuid.UUID(int=100), True),
+        ]:
+            with self.subTest(key=key):
+                self.assertEqual(self.IX.add_if_absent(key, 7), expected)
+
+        with self.subTest(test='get'):
+            self.assertEqual(self.IX.get(uuid.UUID(int=1)), [1, ])
+
+
+    def test_add_if_absent_threads(self):
+        """A key should be added by a single one of concurrent threads."""
+        key = uuid.UUID(int=100)
+        added = []
+        barrier = threading.Barrier(8)
+
+        def worker(value):
+            barrier.wait()
+            if self.IX.add_if_absent(key, value):
+                added.append(value)
+
+        threads = [
+            threading.Thread(target=worker, args=(i, )) for i in range(8)
+        ]
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+
+        with self.subTest(test='added'):
+            self.assertEqual(len(added), 1)
+
+        with self.subTest(test='get'):
+            self.assertEqual(self.IX.get(key), added)
+
+
+    def test_add_many_threads(self):
+        """Concurrent batches should all be registered."""
+        def worker(start):
+            self.IX.add_many(
+                (uuid.UUID(int=i), 0) for i in range(start, start + 1000)
+            )
+
+        threads = [
+            threading.Thread(target=worker, args=(1000 * (i + 1), ))
+            for i in range(4)
+        ]
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+
+        self.assertEqual(self.IX.count(), 4100)
+
+
+    def test_remove(self):
+        """Remove entries from the index."""
+        self.IX.remove(uuid.UUID(int=1))
+
+        with self.subTest(test='contains'):
+            self.assertNotIn(uuid.UUID(int=1), self.IX)
+
+        with self.subTest(test='KeyError'), self.assertRaises(KeyError):
+            self.IX.remove(uuid.UUID(int=1))
+
+
+    def test_discard_many(self):
+        """Discard a batch of entries, some of them missing."""
+        self.IX.discard_many(
+            [(key, None) for key, _ in self.PAIRS] +
+            [(uuid.UUID(int=100), None)]
+        )
+
+        self.assertEqual(len(self.IX), 0)
+
+
+class TestRefIndex(unittest.TestCase):
+    """Test case for :class:`kado.store._index.RefIndex`."""
+
+    def setUp(self):
+        """Setup test cases for :class:`kado.store._index.RefIndex`."""
+        # Items identifiers.
+        self.ITEM1 = uuid.UUID(int=1)
+        self.ITEM2 = uuid.UUID(int=2)
+
+        # Chunks identifiers, the second one being shared.
+        self.CHUNK1 = uuid.UUID(int=11)
+        self.CHUNK2 = uuid.UUID(int=12)
+        self.CHUNK3 = uuid.UUID(int=13)
+
+        self.IX = _index.RefIndex()
+        self.IX.register_many([
+            (self.ITEM1, [self.CHUNK1, self.CHUNK2]),
+            (self.ITEM2, [self.CHUNK2, self.CHUNK3]),
+        ])
+
+
+    def test_refcount(self):
+        """Count the items referencing a chunk."""
+        for key, expected in [
+            (self.CHUNK1, 1), (self.CHUNK2, 2), (uuid.UUID(int=0), 0),
+        ]:
+            with self.subTest(key=key):
+                self.assertEqual(self.IX.refcount(key), expected)
+
+
+    def test_register_item(self):
+        """Register the chunks of an item."""
+        item = _store.Item(b'kado')
+        self.IX.register(item.id, item.manifest().ids())
+
+        self.assertEqual(self.IX.get(item.chunks[0].id), [item.id, ])
+
+
+    def test_release(self):
+        """Released chunks without references should be collected."""
+        self.IX.release(self.ITEM1, [self.CHUNK1, self.CHUNK2])
+
+        with self.subTest(test='collect'):
+            self.assertEqual(self.IX.collect(), {self.CHUNK1})
+
+        with self.subTest(test='refcount'):
+            self.assertEqual(self.IX.refcount(self.CHUNK2), 1)
+
+
+    def test_release_many(self):
+        """Chunks of all the released items should be collected."""
+        self.IX.release_many([
+            (self.ITEM1, [self.CHUNK1, self.CHUNK2]),
+            (self.ITEM2, [self.CHUNK2, self.CHUNK3]),
+        ])
+
+        with self.subTest(test='collect'):
+            self.assertEqual(
+                self.IX.collect(), {self.CHUNK1, self.CHUNK2, self.CHUNK3}
+            )
+
+        with self.subTest(test='count'):
+            self.assertEqual(self.IX.count(), 0)
+
+
+    def test_release_unknown(self):
+        """Unknown references should be ignored."""
+        self.IX.release(self.ITEM1, [self.CHUNK3, uuid.UUID(int=0)])
+
+        with self.subTest(test='collect'):
+            self.assertEqual(self.IX.collect(), set())
+
+        with self.subTest(test='count'):
+            self.assertEqual(self.IX.count(), 4)
+
+
+    def test_remove(self):
+        """Removing the last reference to a chunk should free it."""
+        self.IX.remove(self.CHUNK2)
+        self.assertEqual(self.IX.collect(), {self.CHUNK2})
+
+
+    def test_clear(self):
+        """Clearing the index should free all the chunks."""
+        self.IX.clear()
+        self.assertEqual(
+            self.IX.collect(), {self.CHUNK1, self.CHUNK2, self.CHUNK3}
+        )
+
+
+    def test_collect_registered_again(self):
+        """Chunks referenced again should not be collected."""
+        self.IX.release(self.ITEM1, [self.CHUNK1])
+        self.IX.register(self.ITEM2, [self.CHUNK1])
+
+        self.assertEqual(self.IX.collect(), set())
+
+
+    def test_collect_once(self):
+        """Chunks should only be collected once."""
+        self.IX.release(self.ITEM1, [self.CHUNK1])
+        self.IX.collect()
+
+        self.assertEqual(self.IX.collect(), set())
+
+
+class TestOrderedIndex(unittest.TestCase):
+    """Test case for :class:`kado.store._index.OrderedIndex`."""
+
+    def setUp(self):
+        """Setup test cases for :class:`kado.store._index.OrderedIndex`."""
+        self.KEYS = [uuid.UUID(int=i * 0x0123456789abcdef) for i in range(300)]
+
+        # Small blocks for the keys to span several of them.
+        patcher = mock.patch.object(_index.OrderedIndex, 'BLOCK_SIZE', 16)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.IX = _index.OrderedIndex()
+        for key in reversed(self.KEYS):
+            self.IX.add(key, 1)
+
+
+    def test___iter__(self):
+        """Keys should be iterated over in sorted order."""
+        self.assertEqual(list(self.IX), self.KEYS)
+
+
+    def test_add_many(self):
+        """Keys added in batch should be iterated over in sorted order."""
+        ix = _index.OrderedIndex()
+        ix.add_many((key, 1) for key in reversed(self.KEYS))
+
+        self.assertEqual(list(ix), self.KEYS)
+
+
+    def test_add_many_insert(self):
+        """A batch of keys small next to the index should be inserted without
+        rebuilding the blocks.
+
+        """
+        # More new keys than a block holds, but few next to the index.
+        new = self.KEYS[::17]
+        ix = _index.OrderedIndex()
+        ix.add_many((key, 1) for key in self.KEYS if key not in new)
+
+        with mock.patch.object(
+            _index.OrderedIndex, '_blocks_build', autospec=True
+        ) as build:
+            ix.add_many((key, 1) for key in new)
+
+        with self.subTest(test='rebuilt'):
+            self.assertFalse(build.called)
+
+        with self.subTest(test='keys'):
+            self.assertEqual(list(ix), self.KEYS)
+
+
+    def test_remove(self):
+        """Removed keys should not be iterated over anymore."""
+        for key in self.KEYS[::2]:
+            self.IX.remove(key)
+
+        self.assertEqual(list(self.IX), self.KEYS[1::2])
+
+
+    def test_discard_many(self):
+        """Keys discarded in batch should not be iterated over anymore."""
+        self.IX.add(self.KEYS[0], 2)
+        self.IX.discard_many([(self.KEYS[0], 1), (self.KEYS[1], 1)])
+
+        self.assertEqual(list(self.IX)[:2], [self.KEYS[0], self.KEYS[2]])
+
+
+    def test_clear(self):
+        """Clear the index."""
+        self.IX.clear()
+        self.assertEqual(list(self.IX), [])
+
+
+    def test_range(self):
+        """Get the keys within a range."""
+        for lo, hi, expected in [
+            (self.KEYS[10], self.KEYS[200], self.KEYS[10:200]),
+            (None, self.KEYS[5], self.KEYS[:5]),
+            (self.KEYS[295], None, self.KEYS[295:]),
+            (uuid.UUID(int=1), self.KEYS[2], self.KEYS[1:2]),
+            (self.KEYS[3], self.KEYS[3], []),
+        ]:
+            with self.subTest(lo=lo, hi=hi):
+                self.assertEqual(list(self.IX.range(lo, hi)), expected)
+
+
+    def test_prefix_uuid(self):
+        """Get the UUID keys from the beginning of their hexadecimal form."""
+        for prefix in ['', '0', '0e', '0e90a8-', str(self.KEYS[120]), 'ff']:
+            expected = [
+                key for key in self.KEYS
+                if key.hex.startswith(prefix.replace('-', ''))
+            ]
+            with self.subTest(prefix=prefix):
+                self.assertEqual(list(self.IX.prefix(prefix)), expected)
+
+
+    def test_prefix_str(self):
+        """Get the string keys starting with a prefix."""
+        ix = _index.OrderedIndex()
+        ix.add_many([('ab', 1), ('abc', 1), ('b', 1), ('a', 1)])
+
+        self.assertEqual(list(ix.prefix('ab')), ['ab', 'abc'])
+
+
+    def test_merge(self):
+        """Walk the keys of two indexes together."""
+        ix1, ix2 = _index.OrderedIndex(), _index.OrderedIndex()
+        ix1.add_many([('a', 1), ('b', 1)])
+        ix2.add_many([('b', 2), ('c', 2)])
+
+        self.assertEqual(list(ix1.merge(ix2)), [
+            ('a', [1, ], None), ('b', [1, ], [2, ]), ('c', None, [2, ]),
+        ])
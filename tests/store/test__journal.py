@@ -0,0 +1,263 @@
+# tests/store/test__journal.py
+# ============================
+#
+# Copying
+# -------
+#
+# Copyright (c) 2018 kado authors.
+#
+# This file is part of the *kado* project.
+#
+# kado is a free software project. You can redistribute it and/or
+# modify if under the terms of the MIT License.
+#
+# This software project is distributed *as is*, WITHOUT WARRANTY OF ANY
+# KIND; including but not limited to the WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE and NONINFRINGEMENT.
+#
+# You should have received a copy of the MIT License along with kado.
+# If not, see <http://opensource.org/licenses/MIT>.
+#
+import os
+import time
+import uuid
+import shutil
+import tempfile
+import unittest
+import threading
+
+from unittest import mock
+
+from kado.store import _journal, _store
+
+
+class TestJournaledIndex(unittest.TestCase):
+    """Test case for :class:`kado.store._journal.JournaledIndex`."""
+
+    def setUp(self):
+        """Setup test cases for :class:`kado.store._journal.JournaledIndex`."""
+        self.DIR = tempfile.mkdtemp()
+
+        self.KEY1 = uuid.UUID('14c1130e-e81a-12b5-5612-ae6acfb29ae5')
+        self.KEY2 = uuid.UUID('e4ec00ad-ce69-421f-3735-73fe96da3b03')
+
+        self.IX = _journal.JournaledIndex(self.DIR)
+        self.IX.add_many([(self.KEY1, 1), (self.KEY1, 2), (self.KEY2, 1)])
+
+
+    def tearDown(self):
+        """Cleanup test cases for :class:`kado.store._journal.JournaledIndex`.
+        """
+        self.IX.close()
+        shutil.rmtree(self.DIR)
+
+
+    def reopen(self):
+        """Close the journaled index and open it again."""
+        self.IX.close()
+        self.IX = _journal.JournaledIndex(self.DIR)
+
+
+    def test_reopen(self):
+        """Logged changes should be replayed when the index is opened again."""
+        self.IX.remove(self.KEY1, 2)
+        self.IX.add(self.KEY2, 3)
+        self.reopen()
+
+        with self.subTest(test='count'):
+            self.assertEqual(self.IX.count(), 3)
+
+        with self.subTest(key=self.KEY1):
+            self.assertEqual(self.IX.get(self.KEY1), [1, ])
+
+        with self.subTest(key=self.KEY2):
+            self.assertEqual(sorted(self.IX.get(self.KEY2)), [1, 3])
+
+
+    def test_reopen_clear(self):
+        """Clearing the index should be journaled."""
+        self.IX.clear()
+        self.IX.add(self.KEY2, 3)
+        self.reopen()
+
+        self.assertEqual(list(self.IX), [self.KEY2, ])
+
+
+    def test_reopen_truncated(self):
+        """An incomplete last record should be dropped."""
+        self.IX.commit()
+        self.IX._wal.write(b'\x10\x00\x00\x00\x00')
+        self.reopen()
+
+        with self.subTest(test='count'):
+            self.assertEqual(self.IX.count(), 3)
+
+        with self.subTest(test='add'):
+            self.IX.add(self.KEY2, 3)
+            self.reopen()
+            self.assertEqual(self.IX.count(), 4)
+
+
+    def test_remove_invalid_not_logged(self):
+        """Failed changes should not be logged."""
+        with self.assertRaises(KeyError):
+            self.IX.remove(uuid.UUID(int=0))
+
+        self.assertEqual(self.IX._written, 1)
+
+
+    def test_checkpoint(self):
+        """A checkpoint should replace the previous logs by a snapshot."""
+        self.IX.checkpoint()
+        self.IX.add(self.KEY2, 3)
+
+        with self.subTest(test='files'):
+            self.assertEqual(
+                sorted(os.listdir(self.DIR)),
+                ['snapshot-0000000000000001', 'wal-0000000000000001']
+            )
+
+        with self.subTest(test='reopen'):
+            self.reopen()
+            self.assertEqual(self.IX.count(), 4)
+
+
+    def test_checkpoint_live_index(self):
+        """The snapshot should not be taken from the live index."""
+        seen = []
+        with mock.patch.object(
+            _store.Index, '__iter__', autospec=True,
+            side_effect=lambda ix: seen.append(ix) or iter(ix._mapping)
+        ):
+            self.IX.checkpoint()
+
+        with self.subTest(test='live'):
+            self.assertNotIn(self.IX.index, seen)
+
+        with self.subTest(test='reopen'):
+            self.reopen()
+            self.assertEqual(self.IX.count(), 3)
+
+
+    def test_checkpoint_changes(self):
+        """Changes should be logged while the snapshot is written."""
+        release = threading.Event()
+        write = _journal.JournaledIndex._snapshot_write
+
+        def slow_write(ix, gen):
+            release.wait()
+            write(ix, gen)
+
+        with mock.patch.object(
+            _journal.JournaledIndex, '_snapshot_write', autospec=True,
+            side_effect=slow_write
+        ):
+            self.IX.checkpoint(wait=False)
+            self.IX.add(self.KEY2, 3)
+            self.IX.commit()
+
+            release.set()
+            self.IX._checkpointer.join()
+
+        self.reopen()
+        self.assertEqual(self.IX.count(), 4)
+
+
+    def test_checkpoint_concurrent(self):
+        """Concurrent checkpoints should not write snapshots together."""
+        lock = threading.Lock()
+        running = []
+        overlaps = []
+        write = _journal.JournaledIndex._snapshot_write
+
+        def tracked_write(ix, gen):
+            with lock:
+                running.append(gen)
+                overlaps.append(len(running) > 1)
+            time.sleep(0.01)
+            with lock:
+                running.remove(gen)
+
+            write(ix, gen)
+
+        with mock.patch.object(
+            _journal.JournaledIndex, '_snapshot_write', autospec=True,
+            side_effect=tracked_write
+        ):
+            threads = [
+                threading.Thread(target=self.IX.checkpoint, args=(False, ))
+                for _ in range(4)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            self.IX._checkpointer.join()
+
+        with self.subTest(test='overlap'):
+            self.assertEqual(overlaps, [False] * 4)
+
+        with self.subTest(test='files'):
+            self.assertEqual(
+                sorted(os.listdir(self.DIR)),
+                ['snapshot-0000000000000004', 'wal-0000000000000004']
+            )
+
+        with self.subTest(test='reopen'):
+            self.reopen()
+            self.assertEqual(self.IX.count(), 3)
+
+
+    def test_checkpoint_records(self):
+        """A checkpoint should be started after the given number of changes."""
+        with _journal.JournaledIndex(
+                tempfile.mkdtemp(dir=self.DIR), checkpoint_records=10
+        ) as ix:
+            for i in range(25):
+                ix.add(uuid.UUID(int=i), i)
+            ix._checkpointer.join()
+
+            self.assertEqual(ix._gen, 2)
+
+
+    def test_checkpoint_truncated(self):
+        """An incomplete snapshot should raise ``ValueError``."""
+        self.IX.checkpoint()
+        self.IX.close()
+
+        path = os.path.join(self.DIR, 'snapshot-0000000000000001')
+        with open(path, 'r+b') as fp:
+            fp.truncate(os.path.getsize(path) - 1)
+
+        with self.assertRaises(ValueError):
+            _journal.JournaledIndex(self.DIR)
+
+
+    def test_commit_group(self):
+        """Threads committing together should share ``fsync`` calls."""
+        fsync = os.fsync
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_fsync(fd):
+            started.set()
+            release.wait()
+            fsync(fd)
+
+        with mock.patch('os.fsync', side_effect=slow_fsync) as m:
+            leader = threading.Thread(target=self.IX.commit)
+            leader.start()
+            started.wait()
+
+            # Changes logged while the leader syncs, committed together.
+            followers = []
+            for i in range(4):
+                self.IX.add(uuid.UUID(int=i), i)
+                followers.append(threading.Thread(target=self.IX.commit))
+                followers[-1].start()
+
+            release.set()
+            for th in [leader] + followers:
+                th.join()
+
+            self.assertEqual(m.call_count, 2)
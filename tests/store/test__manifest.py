@@ -0,0 +1,131 @@
+# tests/store/test__manifest.py
+# =============================
+#
+# Copying
+# -------
+#
+# Copyright (c) 2018 kado authors.
+#
+# This file is part of the *kado* project.
+#
+# kado is a free software project. You can redistribute it and/or
+# modify if under the terms of the MIT License.
+#
+# This software project is distributed *as is*, WITHOUT WARRANTY OF ANY
+# KIND; including but not limited to the WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE and NONINFRINGEMENT.
+#
+# You should have received a copy of the MIT License along with kado.
+# If not, see <http://opensource.org/licenses/MIT>.
+#
+import uuid
+import unittest
+import pkg_resources
+
+from kado.store import _manifest, _store
+
+from tests.lib import constants as tc
+
+
+class TestManifest(unittest.TestCase):
+    """Test case for :class:`kado.store._manifest.Manifest`."""
+
+    def setUp(self):
+        """Setup test cases for :class:`kado.store._manifest.Manifest`."""
+        self.ID1 = uuid.UUID('14c1130e-e81a-12b5-5612-ae6acfb29ae5')
+        self.ID2 = uuid.UUID('e4ec00ad-ce69-421f-3735-73fe96da3b03')
+
+        self.MF_EMPTY = _manifest.Manifest()
+        self.MF_TWO = _manifest.Manifest([(self.ID1, 1), (self.ID2, 2)])
+
+
+    def test___eq__(self):
+        """Manifests with the same references should be equal."""
+        self.assertEqual(
+            self.MF_TWO,
+            _manifest.Manifest([(self.ID1, 1), (self.ID2, 2)])
+        )
+
+
+    def test___eq___not_equal(self):
+        """Manifests with different references should not be equal."""
+        self.assertNotEqual(self.MF_TWO, _manifest.Manifest([(self.ID1, 1)]))
+
+
+    def test___getitem__(self):
+        """Get references from their index."""
+        for idx, expected in [(0, (self.ID1, 1)), (-1, (self.ID2, 2))]:
+            with self.subTest(index=idx):
+                self.assertEqual(self.MF_TWO[idx], expected)
+
+
+    def test___getitem___indexerror(self):
+        """Get an out of range reference should raise ``IndexError``."""
+        with self.assertRaises(IndexError):
+            self.MF_EMPTY[0]
+
+
+    def test___iter__(self):
+        """Iterate over the manifest references."""
+        self.assertEqual(list(self.MF_TWO), [(self.ID1, 1), (self.ID2, 2)])
+
+
+    def test___len__(self):
+        """The length should be the number of references."""
+        for mf, expected in [(self.MF_EMPTY, 0), (self.MF_TWO, 2)]:
+            with self.subTest(length=expected):
+                self.assertEqual(len(mf), expected)
+
+
+    def test_size(self):
+        """The size should be the sum of the chunks length."""
+        self.assertEqual(self.MF_TWO.size, 3)
+
+
+    def test_ids(self):
+        """Iterate over the manifest identifiers."""
+        self.assertEqual(list(self.MF_TWO.ids()), [self.ID1, self.ID2])
+
+
+    def test_read(self):
+        """Payloads should be fetched from the store in order."""
+        STORE = {self.ID1: b'1', self.ID2: b'22'}
+        self.assertEqual(list(self.MF_TWO.read(STORE)), [b'1', b'22'])
+
+
+    def test_to_bytes_length(self):
+        """A serialized reference should take 24 bytes."""
+        self.assertEqual(
+            len(self.MF_TWO.to_bytes()) - len(self.MF_EMPTY.to_bytes()),
+            2 * 24
+        )
+
+
+    def test_from_bytes(self):
+        """A serialized manifest should be loaded back unchanged."""
+        for mf in [self.MF_EMPTY, self.MF_TWO]:
+            with self.subTest(length=len(mf)):
+                self.assertEqual(
+                    _manifest.Manifest.from_bytes(mf.to_bytes()), mf
+                )
+
+
+    def test_from_bytes_valueerror(self):
+        """Invalid serialized data should raise ``ValueError``."""
+        for data in [b'', self.MF_TWO.to_bytes()[:-1]]:
+            with self.subTest(length=len(data)):
+                with self.assertRaises(ValueError):
+                    _manifest.Manifest.from_bytes(data)
+
+
+    def test_item_manifest(self):
+        """Item manifests should reference the item's chunks."""
+        for name in tc.DATA_CHUNKS_KADO:
+            with pkg_resources.resource_stream('tests.lib', name) as fp:
+                item = _store.Item(fp.read())
+
+            with self.subTest(file=name):
+                self.assertEqual(
+                    list(item.manifest()),
+                    [(ck.id, len(ck)) for ck in item.chunks]
+                )
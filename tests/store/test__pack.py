@@ -0,0 +1,396 @@
+# tests/store/test__pack.py
+# =========================
+#
+# Copying
+# -------
+#
+# Copyright (c) 2018 kado authors.
+#
+# This file is part of the *kado* project.
+#
+# kado is a free software project. You can redistribute it and/or
+# modify if under the terms of the MIT License.
+#
+# This software project is distributed *as is*, WITHOUT WARRANTY OF ANY
+# KIND; including but not limited to the WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE and NONINFRINGEMENT.
+#
+# You should have received a copy of the MIT License along with kado.
+# If not, see <http://opensource.org/licenses/MIT>.
+#
+import os
+import uuid
+import shutil
+import random
+import tempfile
+import unittest
+import threading
+import pkg_resources
+
+from unittest import mock
+
+from kado.store import _pack, _store
+from kado.utils import compress
+
+from tests.lib import constants as tc
+
+
+class TestPackStore(unittest.TestCase):
+    """Test case for :class:`kado.store._pack.PackStore`."""
+
+    def setUp(self):
+        """Setup test cases for :class:`kado.store._pack.PackStore`."""
+        self.DIR = tempfile.mkdtemp()
+
+        self.CHUNKS = [_store.Chunk(x * 1000) for x in [b'a', b'b', b'c']]
+
+        self.STORE = _pack.PackStore(self.DIR)
+        self.LOCATIONS = [self.STORE.put(ck) for ck in self.CHUNKS]
+
+
+    def tearDown(self):
+        """Cleanup test cases for :class:`kado.store._pack.PackStore`."""
+        self.STORE.close()
+        shutil.rmtree(self.DIR)
+
+
+    def reopen(self, **kwargs):
+        """Close the store and open it again."""
+        self.STORE.close()
+        self.STORE = _pack.PackStore(self.DIR, **kwargs)
+
+
+    def test___contains__(self):
+        """Test chunk containment."""
+        for key, expected in [
+            (self.CHUNKS[0].id, True), (uuid.UUID(int=0), False),
+        ]:
+            with self.subTest(key=key):
+                self.assertEqual(key in self.STORE, expected)
+
+
+    def test___len__(self):
+        """The length should be the number of stored chunks."""
+        self.assertEqual(len(self.STORE), 3)
+
+
+    def test_get(self):
+        """Get a chunk's payload from its identifier or location."""
+        for ck, loc in zip(self.CHUNKS, self.LOCATIONS):
+            for key in [ck.id, loc]:
+                with self.subTest(key=key):
+                    self.assertEqual(self.STORE.get(key), ck.data)
+
+
+    def test_get_invalid_key(self):
+        """Get a chunk which is not stored should raise ``KeyError``."""
+        with self.assertRaises(KeyError):
+            self.STORE.get(uuid.UUID(int=0))
+
+
+    def test_get_corrupted(self):
+        """A payload not matching its checksum should raise ``ValueError``."""
+        self.STORE.flush()
+        with open(os.path.join(self.DIR, '00000000.pack'), 'r+b') as fp:
+            fp.seek(self.LOCATIONS[1].offset + 10)
+            fp.write(b'x')
+
+        for name in ['get', 'view']:
+            with self.subTest(method=name), self.assertRaises(ValueError):
+                getattr(self.STORE, name)(self.CHUNKS[1].id)
+
+
+    def test_get_threads(self):
+        """Payloads read from many threads while chunks are written should
+        not be mixed up.
+
+        """
+        rand = random.Random(0)
+        chunks = [
+            _store.Chunk(rand.getrandbits(8 * 1024).to_bytes(1024, 'little'))
+            for _ in range(400)
+        ]
+        self.reopen(pack_size=64 << 10)
+        for ck in chunks[:200]:
+            self.STORE.put(ck)
+
+        errors = []
+
+        def read():
+            for ck in rand.sample(chunks[:200], 200) * 5:
+                if self.STORE.get(ck.id) != ck.data:
+                    errors.append(ck.id)
+
+        def write():
+            for start in range(200, 400, 10):
+                self.STORE.put_many(chunks[start:start + 10])
+                self.STORE.flush()
+
+        threads = [threading.Thread(target=read) for _ in range(8)]
+        threads.append(threading.Thread(target=write))
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        with self.subTest(test='errors'):
+            self.assertEqual(errors, [])
+
+        with self.subTest(test='written'):
+            for ck in chunks:
+                self.assertEqual(self.STORE.get(ck.id), ck.data)
+
+
+    def test_view(self):
+        """Get a chunk's payload from the mapped pack."""
+        for ck, loc in zip(self.CHUNKS, self.LOCATIONS):
+            for key in [ck.id, loc]:
+                with self.subTest(key=key):
+                    view = self.STORE.view(key)
+                    self.assertEqual(
+                        (view.readonly, view.tobytes()), (True, ck.data)
+                    )
+
+
+    def test_view_remap(self):
+        """A chunk written after the pack was mapped should be viewable."""
+        self.STORE.view(self.CHUNKS[0].id)
+        ck = _store.Chunk(b'd' * 1000)
+        self.STORE.put(ck)
+
+        self.assertEqual(self.STORE.view(ck.id), ck.data)
+
+
+    def test_view_eviction(self):
+        """Least recently used mappings should be evicted, their views
+        remaining valid.
+
+        """
+        # One chunk per pack.
+        self.STORE.close()
+        self.STORE = _pack.PackStore(
+            tempfile.mkdtemp(dir=self.DIR), pack_size=1, max_maps=2
+        )
+        for ck in self.CHUNKS:
+            self.STORE.put(ck)
+
+        views = [self.STORE.view(ck.id) for ck in self.CHUNKS]
+
+        with self.subTest(test='maps'):
+            self.assertEqual(list(self.STORE._maps), [1, 2])
+
+        with self.subTest(test='views'):
+            self.assertEqual(
+                [x.tobytes() for x in views], [ck.data for ck in self.CHUNKS]
+            )
+
+
+    def test_put_compressed(self):
+        """Compressible payloads should be stored compressed."""
+        self.reopen(codec=compress.ZLIB)
+        ck = _store.Chunk(b'd' * 1000)
+        loc = self.STORE.put(ck)
+
+        with self.subTest(test='location'):
+            self.assertEqual(
+                (loc.codec, loc.length < len(ck)), (compress.ZLIB, True)
+            )
+
+        for name, func in [('get', self.STORE.get), ('view', self.STORE.view)]:
+            with self.subTest(method=name):
+                self.assertEqual(func(ck.id), ck.data)
+
+        with self.subTest(test='reopen'):
+            self.reopen()
+            self.assertEqual(self.STORE.get(ck.id), ck.data)
+
+
+    def test_put_incompressible(self):
+        """Random payloads should be stored as is."""
+        self.reopen(codec=compress.ZLIB)
+        with pkg_resources.resource_stream(
+                'tests.lib', 'data/rand8kb.bin'
+        ) as fp:
+            ck = _store.Chunk(fp.read())
+
+        self.assertEqual(self.STORE.put(ck).codec, compress.NONE)
+
+
+    def test_put_same_chunk(self):
+        """A chunk should only be stored once."""
+        loc = self.STORE.put(_store.Chunk(b'a' * 1000))
+
+        with self.subTest(test='location'):
+            self.assertEqual(loc, self.LOCATIONS[0])
+
+        with self.subTest(test='size'):
+            self.STORE.flush()
+            self.assertEqual(
+                os.path.getsize(os.path.join(self.DIR, '00000000.pack')),
+                3 * (1000 + 29)
+            )
+
+
+    def test_put_new_pack(self):
+        """A new pack should be started once the current one is full."""
+        self.reopen(pack_size=2500)
+        loc = self.STORE.put(_store.Chunk(b'd' * 1000))
+
+        with self.subTest(test='files'):
+            self.assertEqual(
+                sorted(os.listdir(self.DIR)), ['00000000.pack', '00000001.pack']
+            )
+
+        with self.subTest(test='location'):
+            self.assertEqual(loc, _pack.Location(1, 29, 1000))
+
+        with self.subTest(test='get'):
+            self.assertEqual(self.STORE.get(loc), b'd' * 1000)
+
+
+    def test_put_new_pack_durable(self):
+        """A new pack file should be made durable in the store directory
+        before records are written to it.
+
+        """
+        self.reopen(pack_size=2500)
+
+        sizes = []
+        with mock.patch.object(
+            _pack, '_fsync_dir',
+            side_effect=lambda path: sizes.append(
+                os.path.getsize(os.path.join(path, '00000001.pack'))
+            )
+        ) as fsync_dir:
+            self.STORE.put(_store.Chunk(b'd' * 1000))
+            self.STORE.put(_store.Chunk(b'e' * 1000))
+
+        with self.subTest(test='calls'):
+            fsync_dir.assert_called_once_with(self.DIR)
+
+        with self.subTest(test='empty'):
+            self.assertEqual(sizes, [0])
+
+
+    def test_put_many(self):
+        """Store a batch of chunks, some of them already stored."""
+        chunks = [_store.Chunk(x * 1000) for x in [b'd', b'a', b'e', b'd']]
+        locs = self.STORE.put_many(chunks)
+
+        with self.subTest(test='locations'):
+            self.assertEqual(
+                locs[:3],
+                [_pack.Location(0, 3 * 1029 + 29, 1000), self.LOCATIONS[0],
+                 _pack.Location(0, 4 * 1029 + 29, 1000)]
+            )
+
+        with self.subTest(test='same chunk'):
+            self.assertEqual(locs[3], locs[0])
+
+        with self.subTest(test='get'):
+            self.assertEqual(self.STORE.get(locs[2]), b'e' * 1000)
+
+        with self.subTest(test='reopen'):
+            self.reopen()
+            self.assertEqual(len(self.STORE), 5)
+
+
+    def test_put_many_new_pack(self):
+        """A batch should be split between packs."""
+        self.reopen(pack_size=3500)
+        locs = self.STORE.put_many(
+            [_store.Chunk(x * 1000) for x in [b'd', b'e', b'f', b'g']]
+        )
+
+        with self.subTest(test='packs'):
+            self.assertEqual([x.pack for x in locs], [1, 1, 1, 2])
+
+        with self.subTest(test='get'):
+            self.assertEqual(self.STORE.get(locs[3]), b'g' * 1000)
+
+
+    def test_reopen(self):
+        """Chunks should be found back once the store is opened again."""
+        self.reopen()
+
+        for ck, loc in zip(self.CHUNKS, self.LOCATIONS):
+            with self.subTest(chunk=ck.id):
+                self.assertEqual(self.STORE.locate(ck.id), loc)
+
+
+    def test_reopen_truncated(self):
+        """An incomplete last record should be dropped."""
+        self.STORE.close()
+        path = os.path.join(self.DIR, '00000000.pack')
+        with open(path, 'r+b') as fp:
+            fp.truncate(os.path.getsize(path) - 1)
+
+        self.reopen()
+
+        with self.subTest(test='len'):
+            self.assertEqual(len(self.STORE), 2)
+
+        with self.subTest(test='put'):
+            self.STORE.put(self.CHUNKS[2])
+            self.reopen()
+            self.assertEqual(self.STORE.get(self.CHUNKS[2].id), b'c' * 1000)
+
+
+    def test_reopen_sealed(self):
+        """Payloads of sealed packs should not be read when reopened."""
+        self.reopen(pack_size=2500)
+        self.STORE.put(_store.Chunk(b'd' * 1000))
+        self.STORE.close()
+        with open(os.path.join(self.DIR, '00000000.pack'), 'r+b') as fp:
+            fp.seek(self.LOCATIONS[1].offset + 10)
+            fp.write(b'x')
+
+        with mock.patch.object(
+            _pack.zlib, 'crc32', side_effect=_pack.zlib.crc32
+        ) as crc32:
+            self.reopen()
+
+        with self.subTest(test='checked'):
+            self.assertEqual(crc32.call_count, 1)
+
+        with self.subTest(test='len'):
+            self.assertEqual(len(self.STORE), 4)
+
+        with self.subTest(test='get'), self.assertRaises(ValueError):
+            self.STORE.get(self.CHUNKS[1].id)
+
+
+    def test_reopen_readonly(self):
+        """Pack files should only be opened for reading when reopened."""
+        self.reopen(pack_size=2500)
+        self.STORE.put(_store.Chunk(b'd' * 1000))
+
+        real_open = open
+        with mock.patch.object(
+            _pack, 'open', create=True, side_effect=real_open
+        ) as fopen, mock.patch.object(_pack.os, 'truncate') as truncate:
+            self.reopen()
+
+        with self.subTest(test='modes'):
+            self.assertEqual(
+                {call[0][1] for call in fopen.call_args_list}, {'rb'}
+            )
+
+        with self.subTest(test='truncate'):
+            truncate.assert_not_called()
+
+
+    def test_item_from_manifest(self):
+        """Items should be read back from their manifest and the store."""
+        for name in tc.DATA_CHUNKS_KADO:
+            with pkg_resources.resource_stream('tests.lib', name) as fp:
+                item = _store.Item(fp.read())
+
+            for ck in item.chunks:
+                self.STORE.put(ck)
+
+            with self.subTest(file=name):
+                self.assertEqual(
+                    _store.Item.from_manifest(item.manifest(), self.STORE).data,
+                    item.data
+                )
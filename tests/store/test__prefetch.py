@@ -0,0 +1,242 @@
+# tests/store/test__prefetch.py
+# =============================
+#
+# Copying
+# -------
+#
+# Copyright (c) 2018 kado authors.
+#
+# This file is part of the *kado* project.
+#
+# kado is a free software project. You can redistribute it and/or
+# modify if under the terms of the MIT License.
+#
+# This software project is distributed *as is*, WITHOUT WARRANTY OF ANY
+# KIND; including but not limited to the WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE and NONINFRINGEMENT.
+#
+# You should have received a copy of the MIT License along with kado.
+# If not, see <http://opensource.org/licenses/MIT>.
+#
+import io
+import shutil
+import tempfile
+import unittest
+import threading
+import pkg_resources
+
+from unittest import mock
+
+from kado.store import _bundle, _manifest, _pack, _prefetch, _store
+
+from tests.lib import constants as tc
+from tests.store.test__store import CountingStore
+
+
+class SlowStore(CountingStore):
+    """Chunk store blocking fetches until released."""
+
+    def __init__(self, chunks):
+        """Constructor for :class:`tests.store.test__prefetch.SlowStore`."""
+        super().__init__(chunks)
+        self.release = threading.Event()
+
+
+    def get(self, key):
+        """Fetch a chunk's payload once released."""
+        self.release.wait()
+        return super().get(key)
+
+
+class TestPrefetcher(unittest.TestCase):
+    """Test case for :class:`kado.store._prefetch.Prefetcher`."""
+
+    def setUp(self):
+        """Setup test cases for :class:`kado.store._prefetch.Prefetcher`."""
+        self.CHUNKS = [_store.Chunk(bytes([i]) * 10) for i in range(100)]
+        self.KEYS = [ck.id for ck in self.CHUNKS]
+
+
+    def test_read(self):
+        """Payloads should be read in order."""
+        with _prefetch.Prefetcher(CountingStore(self.CHUNKS)) as pf:
+            self.assertEqual(
+                list(pf.read(self.KEYS)), [ck.data for ck in self.CHUNKS]
+            )
+
+
+    def test_read_item(self):
+        """Items should be restored from their manifest."""
+        for name in tc.DATA_CHUNKS_KADO:
+            with pkg_resources.resource_stream('tests.lib', name) as fp:
+                item = _store.Item(fp.read())
+
+            store = CountingStore(item.chunks)
+            with _prefetch.Prefetcher(store, window=2) as pf:
+                with self.subTest(file=name):
+                    self.assertEqual(
+                        b''.join(pf.read(item.manifest().ids())), item.data
+                    )
+
+
+    def test_read_fetch(self):
+        """Payloads should be fetched with the given callable."""
+        store = CountingStore(self.CHUNKS)
+        with _prefetch.Prefetcher(CountingStore([])) as pf:
+            with self.subTest(test='data'):
+                self.assertEqual(
+                    list(pf.read(self.KEYS, fetch=store.get)),
+                    [ck.data for ck in self.CHUNKS]
+                )
+
+        with self.subTest(test='fetched'):
+            self.assertEqual(store.fetched, len(self.CHUNKS))
+
+
+    def test_read_invalid_key(self):
+        """A chunk missing from the store should raise ``KeyError``."""
+        with _prefetch.Prefetcher(CountingStore(self.CHUNKS)) as pf:
+            with self.assertRaises(KeyError):
+                list(pf.read(self.KEYS[:2] + ['missing']))
+
+
+    def test_read_ahead(self):
+        """Chunks following the one being read should be fetched."""
+        store = SlowStore(self.CHUNKS)
+        with _prefetch.Prefetcher(store, workers=1, window=4) as pf:
+            it = pf.read(self.KEYS)
+            store.release.set()
+            next(it)
+            pf._executor.submit(lambda: None).result()
+            it.close()
+
+        self.assertGreaterEqual(store.fetched, 4)
+
+
+    def test_window_grow(self):
+        """The window should grow when the consumer waits."""
+        store = SlowStore(self.CHUNKS)
+        with _prefetch.Prefetcher(store, window=2, max_window=8) as pf:
+            it = pf.read(self.KEYS)
+            timer = threading.Timer(0.05, store.release.set)
+            timer.start()
+            next(it)
+            it.close()
+            timer.join()
+
+            self.assertEqual(pf.window, 4)
+
+
+    def test_window_shrink(self):
+        """The window should shrink when payloads are ready in time."""
+        store = CountingStore(self.CHUNKS)
+        with _prefetch.Prefetcher(store, workers=1, window=8) as pf:
+            it = pf.read(self.KEYS)
+            next(it)
+            window = pf.window
+
+            # Let all pending fetches complete before reading on.
+            for _ in range(_prefetch.Prefetcher.SHRINK_AFTER):
+                pf._executor.submit(lambda: None).result()
+                next(it)
+
+            self.assertLess(pf.window, window)
+
+
+class TestPrefetcherPackStore(unittest.TestCase):
+    """Test case for :class:`kado.store._prefetch.Prefetcher` reading from a
+    :class:`kado.store._pack.PackStore`.
+
+    """
+
+    def setUp(self):
+        """Setup test cases for :class:`kado.store._prefetch.Prefetcher`."""
+        self.DIR = tempfile.mkdtemp()
+
+        with pkg_resources.resource_stream(
+            'tests.lib', 'data/rand256kb.bin'
+        ) as fp:
+            self.ITEM = _store.Item(fp.read())
+
+        self.STORE = _pack.PackStore(self.DIR, pack_size=64 << 10)
+        self.STORE.put_many(self.ITEM.chunks)
+
+
+    def tearDown(self):
+        """Cleanup test cases for :class:`kado.store._prefetch.Prefetcher`."""
+        self.STORE.close()
+        shutil.rmtree(self.DIR)
+
+
+    def test_read(self):
+        """Payloads read by many threads should be read in order."""
+        keys = list(self.ITEM.manifest().ids())
+
+        with _prefetch.Prefetcher(self.STORE, workers=8) as pf:
+            for i in range(5):
+                with self.subTest(run=i):
+                    self.assertEqual(b''.join(pf.read(keys)), self.ITEM.data)
+
+
+    def test_item_open(self):
+        """Items should be streamed with their chunks fetched ahead."""
+        item = _store.Item.from_manifest(self.ITEM.manifest(), self.STORE)
+
+        threads = []
+        get = _pack.PackStore.get
+
+        def tracked_get(store, key):
+            threads.append(threading.current_thread().name)
+            return get(store, key)
+
+        with mock.patch.object(
+            _pack.PackStore, 'get', autospec=True, side_effect=tracked_get
+        ), _prefetch.Prefetcher(self.STORE) as pf:
+            with io.BufferedReader(item.open(prefetcher=pf), 1000) as fp:
+                data = b''.join(iter(lambda: fp.read(100), b''))
+
+        with self.subTest(test='data'):
+            self.assertEqual(data, self.ITEM.data)
+
+        with self.subTest(test='fetched'):
+            self.assertEqual(len(threads), len(self.ITEM.chunks))
+
+        with self.subTest(test='threads'):
+            self.assertTrue(
+                all(name.startswith('kado-prefetch') for name in threads)
+            )
+
+
+    def test_item_open_seek(self):
+        """Reading ahead should start over from the position sought."""
+        item = _store.Item.from_manifest(self.ITEM.manifest(), self.STORE)
+        data = self.ITEM.data
+
+        with _prefetch.Prefetcher(self.STORE) as pf:
+            with item.open(prefetcher=pf) as fp:
+                for offset in [len(data) // 2, 10, len(data) - 5, 0]:
+                    fp.seek(offset)
+                    with self.subTest(offset=offset):
+                        self.assertEqual(
+                            fp.read(20000), data[offset:offset + 20000]
+                        )
+
+
+    def test_item_open_other_store(self):
+        """Chunks should be fetched from the store their handle refers to."""
+        small = [_store.Chunk(bytes([i]) * 100) for i in range(20)]
+        chunks = small + self.ITEM.chunks
+
+        bundles = _bundle.BundleStore(self.STORE)
+        for ck in small:
+            bundles.put(ck)
+        bundles.flush()
+
+        manifest = _manifest.Manifest((ck.id, len(ck)) for ck in chunks)
+        item = _store.Item.from_manifest(manifest, bundles)
+
+        with _prefetch.Prefetcher(self.STORE) as pf:
+            with item.open(prefetcher=pf) as fp:
+                self.assertEqual(
+                    fp.read(), b''.join(ck.data for ck in chunks)
+                )
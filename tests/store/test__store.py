@@ -18,10 +18,20 @@
 # You should have received a copy of the MIT License along with kado.
 # If not, see <http://opensource.org/licenses/MIT>.
 #
+import gc
+import io
+import os
+import sys
 import uuid
+import shutil
+import tempfile
 import unittest
+import tracemalloc
 import pkg_resources
 
+from unittest import mock
+
+from kado import constants as c
 from kado.store import _store
 
 from tests.lib import constants as tc
@@ -204,12 +214,178 @@ class TestIndex(unittest.TestCase):
             self.IX_K1V1.get('--INVALID--')
 
 
+    def test_view_values(self):
+        """A view should expose the values stored under a key."""
+        self.assertEqual(
+            set(self.IX_K1V2.view(self.KEY1)), {self.VALUE1, self.VALUE2}
+        )
+
+
+    def test_view_contains(self):
+        """Value containment should be checked through a view."""
+        view = self.IX_K1V2.view(self.KEY1)
+
+        with self.subTest(test='in'):
+            self.assertIn(self.VALUE1, view)
+
+        with self.subTest(test='not in'):
+            self.assertNotIn('--INVALID--', view)
+
+
+    def test_view_live(self):
+        """A view should reflect values added to the key afterwards."""
+        view = self.IX_K1V1.view(self.KEY1)
+        self.IX_K1V1.add(self.KEY1, self.VALUE2)
+
+        self.assertEqual(len(view), 2)
+
+
+    def test_view_read_only(self):
+        """A view should not allow adding values."""
+        view = self.IX_K1V1.view(self.KEY1)
+        with self.assertRaises(AttributeError):
+            view.add(self.VALUE2)
+
+
+    def test_view_set_operations(self):
+        """Set operations on views should give regular sets."""
+        view = self.IX_K1V2.view(self.KEY1)
+        self.assertEqual(view & {self.VALUE1}, {self.VALUE1})
+
+
+    def test_view_invalid_key(self):
+        """View of a nonexistent key should raise a ``KeyError``."""
+        with self.assertRaises(KeyError):
+            self.IX_EMPTY.view('--INVALID--')
+
+
+    def test_itervalues(self):
+        """Iterate over the values stored under a key."""
+        self.assertEqual(
+            set(self.IX_K1V2.itervalues(self.KEY1)), {self.VALUE1, self.VALUE2}
+        )
+
+
+    def test_itervalues_invalid_key(self):
+        """Iterating a nonexistent key should raise a ``KeyError``."""
+        with self.assertRaises(KeyError):
+            self.IX_EMPTY.itervalues('--INVALID--')
+
+
+    def test_count_after_changes(self):
+        """The total count should follow index changes."""
+        self.IX_K2V2.add(self.KEY1, self.VALUE1)
+        with self.subTest(op='add existing'):
+            self.assertEqual(self.IX_K2V2.count(), 4)
+
+        self.IX_K2V2.remove(self.KEY1, self.VALUE1)
+        with self.subTest(op='remove value'):
+            self.assertEqual(self.IX_K2V2.count(), 3)
+
+        self.IX_K2V2.discard(self.KEY1, '--INVALID--')
+        with self.subTest(op='discard invalid'):
+            self.assertEqual(self.IX_K2V2.count(), 3)
+
+        self.IX_K2V2.remove(self.KEY2)
+        with self.subTest(op='remove key'):
+            self.assertEqual(self.IX_K2V2.count(), 1)
+
+        self.IX_K2V2.clear()
+        with self.subTest(op='clear'):
+            self.assertEqual(self.IX_K2V2.count(), 0)
+
+
     def test_add_same_value(self):
         """Adding twice the same value should only store it once."""
         self.IX_K1V1.add(self.KEY1, self.VALUE1)
         self.assertEqual(self.IX_K1V1.get(self.KEY1), [self.VALUE1, ])
 
 
+    def test_add_many(self):
+        """Add a batch of entries to the index."""
+        count = self.IX_EMPTY.add_many([
+            (self.KEY1, self.VALUE1),
+            (self.KEY1, self.VALUE2),
+            (self.KEY2, self.VALUE1),
+        ])
+
+        with self.subTest(test='return'):
+            self.assertEqual(count, 3)
+
+        with self.subTest(test='len'):
+            self.assertEqual(len(self.IX_EMPTY), 2)
+
+        with self.subTest(test='count'):
+            self.assertEqual(self.IX_EMPTY.count(), 3)
+
+
+    def test_add_many_same_value(self):
+        """Entries already in the index should not be counted twice."""
+        count = self.IX_K1V1.add_many([
+            (self.KEY1, self.VALUE1),
+            (self.KEY1, self.VALUE1),
+        ])
+
+        with self.subTest(test='return'):
+            self.assertEqual(count, 0)
+
+        with self.subTest(test='count'):
+            self.assertEqual(self.IX_K1V1.count(), 1)
+
+
+    def test_remove_many(self):
+        """Remove a batch of entries from the index."""
+        self.IX_K2V2.remove_many([
+            (self.KEY1, self.VALUE1),
+            (self.KEY2, None),
+        ])
+
+        with self.subTest(test='get'):
+            self.assertEqual(self.IX_K2V2.get(self.KEY1), [self.VALUE2, ])
+
+        with self.subTest(test='count'):
+            self.assertEqual(self.IX_K2V2.count(), 1)
+
+
+    def test_remove_many_invalid_key(self):
+        """Removing a batch with a nonexistent key should raise ``KeyError``."""
+        with self.assertRaises(KeyError):
+            self.IX_K1V1.remove_many([('--INVALID--', None)])
+
+
+    def test_discard_many(self):
+        """Discard a batch of entries, some of them missing."""
+        self.IX_K2V2.discard_many([
+            (self.KEY1, self.VALUE1),
+            (self.KEY1, '--INVALID--'),
+            ('--INVALID--', None),
+            (self.KEY2, None),
+        ])
+
+        with self.subTest(test='get'):
+            self.assertEqual(self.IX_K2V2.get(self.KEY1), [self.VALUE2, ])
+
+        with self.subTest(test='len'):
+            self.assertEqual(len(self.IX_K2V2), 1)
+
+        with self.subTest(test='count'):
+            self.assertEqual(self.IX_K2V2.count(), 1)
+
+
+    def test_discard_many_last_entry(self):
+        """Discarding the last value of a key should remove the key."""
+        self.IX_K1V1.discard_many([(self.KEY1, self.VALUE1)])
+        self.assertNotIn(self.KEY1, self.IX_K1V1)
+
+
+    def test_contains_many(self):
+        """Check the presence of a batch of keys."""
+        self.assertEqual(
+            self.IX_K1V1.contains_many([self.KEY1, self.KEY2, self.KEY1]),
+            [True, False, True]
+        )
+
+
     def test_remove_key(self):
         """Remove a key from the index."""
         with self.subTest(predicate=True):
@@ -302,6 +478,55 @@ class TestChunk(unittest.TestCase):
             c.data = b'2'
 
 
+    def test_view(self):
+        """A chunk's view should expose its payload read-only."""
+        TEST_DATA = b'1'
+
+        view = _store.Chunk(TEST_DATA).view()
+        with self.subTest(test='data'):
+            self.assertEqual(view, TEST_DATA)
+
+        with self.subTest(test='readonly'):
+            self.assertTrue(view.readonly)
+
+
+    @unittest.skipIf(sys.version_info < (3, 12), 'requires PEP 688.')
+    def test___buffer__(self):
+        """A chunk should be usable wherever a bytes-like object is."""
+        TEST_DATA = b'1'
+
+        self.assertEqual(memoryview(_store.Chunk(TEST_DATA)), TEST_DATA)
+
+
+    def test___slots__(self):
+        """Chunks should not carry an instance dictionary."""
+        self.assertFalse(hasattr(_store.Chunk(b'1'), '__dict__'))
+
+
+    def test_memory_footprint(self):
+        """Benchmark the memory overhead of a chunk besides its payload."""
+        # A chunk with its instance dictionary and live hash objects used to
+        # cost over 700 bytes.
+        MAX_OVERHEAD = 256
+        COUNT = 10000
+
+        payloads = [i.to_bytes(32, 'little') for i in range(COUNT)]
+
+        tracemalloc.start()
+        try:
+            start = tracemalloc.get_traced_memory()[0]
+
+            chunks = [_store.Chunk(x) for x in payloads]
+            for ck in chunks:
+                ck.id, ck.whash
+
+            end = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+
+        self.assertLess((end - start) / COUNT, MAX_OVERHEAD)
+
+
     def test__id_get(self):
         """Chunk's identifier should match data's strong hash."""
         TEST_ID = uuid.UUID('14c1130e-e81a-12b5-5612-ae6acfb29ae5')
@@ -310,6 +535,75 @@ class TestChunk(unittest.TestCase):
         self.assertEqual(c._id_get(), TEST_ID)
 
 
+class TestChunkRegistry(unittest.TestCase):
+    """Test case for :class:`kado.store._store.ChunkRegistry`."""
+
+    def test_intern_same_data(self):
+        """Interning the same data twice should give the same chunk."""
+        registry = _store.ChunkRegistry()
+
+        ck1 = registry.intern(b'1')
+        ck2 = registry.intern(bytearray(b'1'))
+        self.assertIs(ck1, ck2)
+
+
+    def test_intern_different_data(self):
+        """Interning different data should give different chunks."""
+        registry = _store.ChunkRegistry()
+
+        ck1 = registry.intern(b'1')
+        ck2 = registry.intern(b'2')
+        self.assertIsNot(ck1, ck2)
+
+
+    def test_intern_chunk(self):
+        """Interned chunks should be similar to regular chunks."""
+        TEST_DATA = b'1'
+
+        ck = _store.ChunkRegistry().intern(TEST_DATA)
+        expected = _store.Chunk(TEST_DATA)
+
+        with self.subTest(test='id'):
+            self.assertEqual(ck.id, expected.id)
+
+        with self.subTest(test='shash'):
+            self.assertEqual(ck.shash, expected.shash)
+
+        with self.subTest(test='whash'):
+            self.assertEqual(ck.whash, expected.whash)
+
+
+    def test_get(self):
+        """Registered chunks should be retrieved from their identifier."""
+        registry = _store.ChunkRegistry()
+
+        ck = registry.intern(b'1')
+        with self.subTest(test='contains'):
+            self.assertIn(ck.id, registry)
+
+        with self.subTest(test='get'):
+            self.assertIs(registry.get(ck.id), ck)
+
+
+    def test_get_invalid_key(self):
+        """Get nonexistent key should raise a ``KeyError``."""
+        with self.assertRaises(KeyError):
+            _store.ChunkRegistry().get(uuid.uuid4())
+
+
+    def test_weak_reference(self):
+        """Unreferenced chunks should be dropped from the registry."""
+        registry = _store.ChunkRegistry()
+
+        ck = registry.intern(b'1')
+        with self.subTest(predicate=True):
+            self.assertEqual(len(registry), 1)
+
+        del ck
+        gc.collect()
+        self.assertEqual(len(registry), 0)
+
+
 class TestItem(unittest.TestCase):
     """Test case for :class:`kado.store._store.Item`."""
 
@@ -340,6 +634,38 @@ class TestItem(unittest.TestCase):
                 self.assertEqual(item.shash, hashes[1])
 
 
+    def test___init___shared_chunks(self):
+        """Identical chunks should share the same object."""
+        with pkg_resources.resource_stream(
+            'tests.lib', 'data/zero256kb.bin'
+        ) as fp:
+            content = fp.read()
+
+        item1 = _store.Item(content)
+        item2 = _store.Item(content)
+
+        with self.subTest(test='item'):
+            for ck in item1.chunks:
+                self.assertIs(ck, item1.chunks[0])
+
+        with self.subTest(test='items'):
+            self.assertIs(item1.chunks[0], item2.chunks[0])
+
+
+    def test___init___no_registry(self):
+        """Without a registry, items should carry their own chunks."""
+        with mock.patch.object(_store.Item, 'registry', None):
+            item1 = _store.Item(b'1')
+            item2 = _store.Item(b'1')
+
+        self.assertIsNot(item1.chunks[0], item2.chunks[0])
+
+
+    def test___slots__(self):
+        """Items should not carry an instance dictionary."""
+        self.assertFalse(hasattr(_store.Item(b'1'), '__dict__'))
+
+
     def test___init___metadata(self):
         """Ensure the item's metadata is properly initialized."""
         TEST_META = {
@@ -354,6 +680,50 @@ class TestItem(unittest.TestCase):
                 self.assertEqual(item[k], v)
 
 
+    def test_from_file_data_files(self):
+        """Items read from files should match items built in memory."""
+        for name in tc.DATA_CHUNKS_KADO:
+            with pkg_resources.resource_stream('tests.lib', name) as fp:
+                expected = _store.Item(fp.read())
+
+            item = _store.Item.from_file(
+                pkg_resources.resource_filename('tests.lib', name)
+            )
+
+            with self.subTest(file=name, test='chunks'):
+                self.assertEqual(
+                    [ck.id for ck in item.chunks],
+                    [ck.id for ck in expected.chunks]
+                )
+
+            with self.subTest(file=name, test='whash'):
+                self.assertEqual(item.whash, expected.whash)
+
+            with self.subTest(file=name, test='shash'):
+                self.assertEqual(item.shash, expected.shash)
+
+
+    def test_from_stream_metadata(self):
+        """Items read from streams should carry given metadata."""
+        TEST_META = {'a': 'a'}
+
+        item = _store.Item.from_stream(io.BytesIO(b'1'), metadata=TEST_META)
+        with self.subTest(test='data'):
+            self.assertEqual(item.data, b'1')
+
+        with self.subTest(test='metadata'):
+            self.assertEqual(dict(item.items()), TEST_META)
+
+
+    def test_from_stream_empty(self):
+        """An empty stream should give the same item as empty data."""
+        item = _store.Item.from_stream(io.BytesIO())
+        self.assertEqual(
+            [ck.id for ck in item.chunks],
+            [ck.id for ck in _store.Item().chunks]
+        )
+
+
     def test___len___data_files(self):
         """Test item length loaded with known data files."""
         for name in tc.DATA_CHUNKS_KADO:
@@ -393,6 +763,73 @@ class TestItem(unittest.TestCase):
                     self.assertEqual(chunks[idx][3], ck.shash)
 
 
+    def test_data_set_buffer_data_files(self):
+        """Items built from buffers should match items built from bytes."""
+        for name in tc.DATA_CHUNKS_KADO:
+            with pkg_resources.resource_stream('tests.lib', name) as fp:
+                content = fp.read()
+
+            expected = _store.Item(content)
+            for data in [bytearray(content), memoryview(content)]:
+                item = _store.Item(data)
+
+                with self.subTest(file=name, type=type(data), test='chunks'):
+                    self.assertEqual(
+                        [ck.id for ck in item.chunks],
+                        [ck.id for ck in expected.chunks]
+                    )
+
+                with self.subTest(file=name, type=type(data), test='shash'):
+                    self.assertEqual(item.shash, expected.shash)
+
+
+    def test_data_set_buffer_chunks_bytes(self):
+        """Chunk payloads built from a buffer should be ``bytes`` copies."""
+        data = bytearray(b'1' * c.GHASH_CHUNK_HI * 2)
+        item = _store.Item(data)
+        data[0] = ord('2')
+
+        for idx, ck in enumerate(item.chunks):
+            with self.subTest(chunk=idx):
+                self.assertIsInstance(ck.data, bytes)
+
+        with self.subTest(test='data'):
+            self.assertEqual(item.data, b'1' * c.GHASH_CHUNK_HI * 2)
+
+
+    def test_append_bytearray(self):
+        """Appending a ``bytearray`` should be supported."""
+        item = _store.Item(b'1')
+        item.append(bytearray(b'2'))
+
+        self.assertEqual(item.data, b'12')
+
+
+    def test_views_data_files(self):
+        """Chunk views of an item should cover the item's data."""
+        for name in tc.DATA_CHUNKS_KADO:
+            with pkg_resources.resource_stream('tests.lib', name) as fp:
+                content = fp.read()
+
+            item = _store.Item(content)
+            with self.subTest(file=name):
+                self.assertEqual(b''.join(item.views()), content)
+
+
+    def test_views_writev(self):
+        """Chunk views of an item should be writable at once."""
+        with pkg_resources.resource_stream(
+            'tests.lib', 'data/rand64kb.bin'
+        ) as fp:
+            content = fp.read()
+
+        with tempfile.TemporaryFile() as fp:
+            os.writev(fp.fileno(), _store.Item(content).views())
+
+            fp.seek(0)
+            self.assertEqual(fp.read(), content)
+
+
     def test_data_set_typeerror(self):
         """If data type is not ``bytes``, ``TypeError`` must be raised."""
         item = _store.Item()
@@ -400,6 +837,169 @@ class TestItem(unittest.TestCase):
             item.data = 1
 
 
+    def test_append_data_files(self):
+        """Appended items should match items built from the whole data."""
+        for name in tc.DATA_CHUNKS_KADO:
+            with pkg_resources.resource_stream('tests.lib', name) as fp:
+                content = fp.read()
+
+            item = _store.Item(content[:len(content) // 3])
+            item.whash, item.shash    # Populate the hash trees.
+
+            item.append(content[len(content) // 3:])
+            expected = _store.Item(content)
+
+            with self.subTest(file=name, test='chunks'):
+                self.assertEqual(
+                    [ck.id for ck in item.chunks],
+                    [ck.id for ck in expected.chunks]
+                )
+
+            with self.subTest(file=name, test='whash'):
+                self.assertEqual(item.whash, expected.whash)
+
+            with self.subTest(file=name, test='shash'):
+                self.assertEqual(item.shash, expected.shash)
+
+
+    def test_append_reuse_chunks(self):
+        """Appending data should keep all chunks but the last one."""
+        with pkg_resources.resource_stream(
+            'tests.lib', 'data/rand256kb.bin'
+        ) as fp:
+            item = _store.Item(fp.read())
+
+        chunks = item.chunks.copy()
+        item.append(b'1')
+
+        for idx, ck in enumerate(chunks[:-1]):
+            with self.subTest(chunk=idx):
+                self.assertIs(item.chunks[idx], ck)
+
+
+    def test_append_empty_item(self):
+        """Appending data to an empty item should set its data."""
+        item = _store.Item()
+        item.append(b'1')
+
+        self.assertEqual(item.data, b'1')
+
+
+    def test_append_typeerror(self):
+        """If data type is not ``bytes``, ``TypeError`` must be raised."""
+        item = _store.Item()
+        with self.assertRaises(TypeError):
+            item.append(1)
+
+
+    def test_truncate_data_files(self):
+        """Truncated items should match items built from the truncated data."""
+        for name in tc.DATA_CHUNKS_KADO:
+            with pkg_resources.resource_stream('tests.lib', name) as fp:
+                content = fp.read()
+
+            item = _store.Item(content)
+            item.whash, item.shash    # Populate the hash trees.
+
+            item.truncate(len(content) // 2 + 1)
+            expected = _store.Item(content[:len(content) // 2 + 1])
+
+            with self.subTest(file=name, test='chunks'):
+                self.assertEqual(
+                    [ck.id for ck in item.chunks],
+                    [ck.id for ck in expected.chunks]
+                )
+
+            with self.subTest(file=name, test='whash'):
+                self.assertEqual(item.whash, expected.whash)
+
+            with self.subTest(file=name, test='shash'):
+                self.assertEqual(item.shash, expected.shash)
+
+
+    def test_truncate_all(self):
+        """Truncating all the data should be equivalent to an empty item."""
+        item = _store.Item(b'1')
+        item.truncate(0)
+
+        self.assertEqual(
+            [ck.id for ck in item.chunks],
+            [ck.id for ck in _store.Item().chunks]
+        )
+
+
+    def test_truncate_larger(self):
+        """Truncating to a larger size should not change the item."""
+        item = _store.Item(b'1')
+        item.truncate(2)
+
+        self.assertEqual(item.data, b'1')
+
+
+    def test_truncate_valueerror(self):
+        """A negative size should raise ``ValueError``."""
+        item = _store.Item(b'1')
+        with self.assertRaises(ValueError):
+            item.truncate(-1)
+
+
+    def test_splice_data_files(self):
+        """Spliced items should match items built from the spliced data."""
+        TEST_DATA = b'1' * 4096
+
+        for name in tc.DATA_CHUNKS_KADO:
+            with pkg_resources.resource_stream('tests.lib', name) as fp:
+                content = fp.read()
+
+            offset = len(content) // 2
+            item = _store.Item(content)
+            item.whash, item.shash    # Populate the hash trees.
+
+            item.splice(offset, 1024, TEST_DATA)
+            expected = _store.Item(
+                content[:offset] + TEST_DATA + content[offset + 1024:]
+            )
+
+            with self.subTest(file=name, test='chunks'):
+                self.assertEqual(
+                    [ck.id for ck in item.chunks],
+                    [ck.id for ck in expected.chunks]
+                )
+
+            with self.subTest(file=name, test='whash'):
+                self.assertEqual(item.whash, expected.whash)
+
+            with self.subTest(file=name, test='shash'):
+                self.assertEqual(item.shash, expected.shash)
+
+
+    def test_splice_reuse_chunks(self):
+        """Chunks away from the spliced range should be kept."""
+        with pkg_resources.resource_stream(
+            'tests.lib', 'data/rand256kb.bin'
+        ) as fp:
+            item = _store.Item(fp.read())
+
+        chunks = item.chunks.copy()
+        # Replace one byte within the ``(99125, 106020)`` chunk.
+        item.splice(100000, 1, b'1')
+
+        with self.subTest(test='head'):
+            for idx, ck in enumerate(chunks[:9]):
+                self.assertIs(item.chunks[idx], ck)
+
+        with self.subTest(test='tail'):
+            for idx, ck in enumerate(chunks[10:], 10):
+                self.assertIs(item.chunks[idx], ck)
+
+
+    def test_splice_valueerror(self):
+        """An out of range offset should raise ``ValueError``."""
+        item = _store.Item(b'1')
+        with self.assertRaises(ValueError):
+            item.splice(2, 0, b'1')
+
+
     def test_copy_data_only(self):
         """Test copy of an item with only data loaded."""
         item1 = _store.Item(b'1')
@@ -434,3 +1034,286 @@ class TestItem(unittest.TestCase):
         with self.subTest(test='metadata'):
             for k, v in item1.items():
                 self.assertEqual(item2[k], v)
+
+
+    def test_open_read_data_files(self):
+        """Reading an opened item should return the item's data."""
+        for name in tc.DATA_CHUNKS_KADO:
+            with pkg_resources.resource_stream('tests.lib', name) as fp:
+                content = fp.read()
+
+            item = _store.Item(content)
+            with self.subTest(file=name), item.open() as fp:
+                self.assertEqual(fp.read(), content)
+
+
+    def test_open_copyfileobj(self):
+        """An opened item should be usable as a regular file object."""
+        with pkg_resources.resource_stream(
+            'tests.lib', 'data/rand256kb.bin'
+        ) as fp:
+            content = fp.read()
+
+        dst = io.BytesIO()
+        with io.BufferedReader(_store.Item(content).open()) as fp:
+            shutil.copyfileobj(fp, dst)
+
+        self.assertEqual(dst.getvalue(), content)
+
+
+    def test_open_empty(self):
+        """Reading an empty item should return no data."""
+        with _store.Item().open() as fp:
+            self.assertEqual(fp.read(), b'')
+
+
+class TestItemReader(unittest.TestCase):
+    """Test case for :class:`kado.store._store.ItemReader`."""
+
+    def setUp(self):
+        """Setup test cases for :class:`kado.store._store.ItemReader`."""
+        with pkg_resources.resource_stream(
+            'tests.lib', 'data/rand128kb.bin'
+        ) as fp:
+            self.CONTENT = fp.read()
+
+        self.ITEM = _store.Item(self.CONTENT)
+
+
+    def test_readinto_across_chunks(self):
+        """A read spanning several chunks should return contiguous data."""
+        # First chunk boundary of ``rand128kb.bin`` is at 8317.
+        start, end = 8000, 20000
+
+        buffer = bytearray(end - start)
+        with self.ITEM.open() as fp:
+            fp.seek(start)
+            self.assertEqual(fp.readinto(buffer), end - start)
+
+        self.assertEqual(buffer, self.CONTENT[start:end])
+
+
+    def test_readinto_end_of_stream(self):
+        """Reading past the end of the stream should return ``0``."""
+        buffer = bytearray(16)
+        with self.ITEM.open() as fp:
+            fp.seek(0, io.SEEK_END)
+            self.assertEqual(fp.readinto(buffer), 0)
+
+
+    def test_seek_whence(self):
+        """Test seeking relative to all the reference points."""
+        with self.ITEM.open() as fp:
+            with self.subTest(whence=io.SEEK_SET):
+                self.assertEqual(fp.seek(10), 10)
+
+            with self.subTest(whence=io.SEEK_CUR):
+                self.assertEqual(fp.seek(10, io.SEEK_CUR), 20)
+
+            with self.subTest(whence=io.SEEK_END):
+                self.assertEqual(
+                    fp.seek(-10, io.SEEK_END), len(self.CONTENT) - 10
+                )
+                self.assertEqual(fp.read(), self.CONTENT[-10:])
+
+
+    def test_seek_negative_valueerror(self):
+        """Seeking before the start of the stream should raise ``ValueError``."""
+        with self.ITEM.open() as fp:
+            with self.assertRaises(ValueError):
+                fp.seek(-1)
+
+
+    def test_tell(self):
+        """The stream position should follow the data read."""
+        with self.ITEM.open() as fp:
+            fp.read(100)
+            self.assertEqual(fp.tell(), 100)
+
+
+    def test_read_closed_valueerror(self):
+        """Reading a closed stream should raise ``ValueError``."""
+        fp = self.ITEM.open()
+        fp.close()
+
+        with self.assertRaises(ValueError):
+            fp.read()
+
+
+    def test_read_mutated_item(self):
+        """Changing the item's data should not affect an opened stream."""
+        with self.ITEM.open() as fp:
+            self.ITEM.data = b'1'
+            self.assertEqual(fp.read(), self.CONTENT)
+
+
+class CountingStore(dict):
+    """Chunk store keeping track of the fetched payloads."""
+
+    def __init__(self, chunks):
+        """Constructor for :class:`tests.store.test__store.CountingStore`."""
+        super().__init__((ck.id, ck.data) for ck in chunks)
+        self.fetched = 0
+
+
+    def get(self, key):
+        """Fetch a chunk's payload from its identifier."""
+        self.fetched += 1
+        return self[key]
+
+
+class TestChunkHandle(unittest.TestCase):
+    """Test case for :class:`kado.store._store.ChunkHandle`."""
+
+    def setUp(self):
+        """Setup test cases for :class:`kado.store._store.ChunkHandle`."""
+        self.CHUNK = _store.Chunk(b'1')
+        self.STORE = CountingStore([self.CHUNK])
+        self.HANDLE = _store.ChunkHandle(self.CHUNK.id, 1, self.STORE)
+
+
+    def test___len__(self):
+        """The length should be known without fetching the payload."""
+        with self.subTest(test='length'):
+            self.assertEqual(len(self.HANDLE), 1)
+
+        with self.subTest(test='fetched'):
+            self.assertEqual(self.STORE.fetched, 0)
+
+
+    def test_id(self):
+        """The identifier should be known without fetching the payload."""
+        with self.subTest(test='id'):
+            self.assertEqual(self.HANDLE.id, self.CHUNK.id)
+
+        with self.subTest(test='fetched'):
+            self.assertEqual(self.STORE.fetched, 0)
+
+
+    def test_data(self):
+        """The payload should be fetched from the store."""
+        with self.subTest(test='data'):
+            self.assertEqual(self.HANDLE.data, self.CHUNK.data)
+
+        with self.subTest(test='fetched'):
+            self.assertEqual(self.STORE.fetched, 1)
+
+
+    def test_data_notimplementederror(self):
+        """It should not be possible to reset data of a chunk handle."""
+        with self.assertRaises(NotImplementedError):
+            self.HANDLE.data = b'2'
+
+
+    def test_hash(self):
+        """Hashes should match the ones of the referenced chunk."""
+        with self.subTest(test='shash'):
+            self.assertEqual(self.HANDLE.shash, self.CHUNK.shash)
+
+        with self.subTest(test='whash'):
+            self.assertEqual(self.HANDLE.whash, self.CHUNK.whash)
+
+
+    def test___eq__(self):
+        """Handles should be compared without fetching their payload."""
+        handle = _store.ChunkHandle(self.CHUNK.id, 1, self.STORE)
+
+        with self.subTest(test='equal'):
+            self.assertEqual(self.HANDLE, handle)
+
+        with self.subTest(test='set'):
+            self.assertEqual(len({self.HANDLE, handle}), 1)
+
+        with self.subTest(test='fetched'):
+            self.assertEqual(self.STORE.fetched, 0)
+
+
+    def test_location(self):
+        """The location should be used to fetch the payload when given."""
+        STORE = {'LOCATION': b'1'}
+
+        handle = _store.ChunkHandle(self.CHUNK.id, 1, STORE, 'LOCATION')
+        self.assertEqual(handle.data, b'1')
+
+
+class TestItemFromManifest(unittest.TestCase):
+    """Test case for :meth:`kado.store._store.Item.from_manifest`."""
+
+    def setUp(self):
+        """Setup test cases for :meth:`kado.store._store.Item.from_manifest`."""
+        with pkg_resources.resource_stream(
+            'tests.lib', 'data/rand256kb.bin'
+        ) as fp:
+            self.CONTENT = fp.read()
+
+        item = _store.Item(self.CONTENT)
+
+        self.MANIFEST = item.manifest()
+        self.STORE = CountingStore(item.chunks)
+        self.SHASH = item.shash
+
+
+    def test___len__(self):
+        """The item length should be known without fetching any payload."""
+        item = _store.Item.from_manifest(self.MANIFEST, self.STORE)
+
+        with self.subTest(test='length'):
+            self.assertEqual(len(item), len(self.CONTENT))
+
+        with self.subTest(test='fetched'):
+            self.assertEqual(self.STORE.fetched, 0)
+
+
+    def test_data(self):
+        """The item's data should be fetched from the store."""
+        item = _store.Item.from_manifest(self.MANIFEST, self.STORE)
+        self.assertEqual(item.data, self.CONTENT)
+
+
+    def test_open(self):
+        """Streaming the item should fetch its payloads as they are read."""
+        item = _store.Item.from_manifest(self.MANIFEST, self.STORE)
+
+        with item.open() as fp:
+            fp.read(10)
+
+            with self.subTest(test='fetched'):
+                self.assertEqual(self.STORE.fetched, 1)
+
+            with self.subTest(test='data'):
+                self.assertEqual(fp.read(), self.CONTENT[10:])
+
+
+    def test_open_small_reads(self):
+        """Each payload should be fetched once when streamed in small reads."""
+        item = _store.Item.from_manifest(self.MANIFEST, self.STORE)
+
+        for size in [io.DEFAULT_BUFFER_SIZE, 1000]:
+            self.STORE.fetched = 0
+            with io.BufferedReader(item.open(), size) as fp:
+                data = b''.join(iter(lambda: fp.read(100), b''))
+
+            with self.subTest(size=size, test='data'):
+                self.assertEqual(data, self.CONTENT)
+
+            with self.subTest(size=size, test='fetched'):
+                self.assertEqual(self.STORE.fetched, len(self.MANIFEST))
+
+
+    def test_shash(self):
+        """The item's hash should match the one of the original item."""
+        item = _store.Item.from_manifest(self.MANIFEST, self.STORE)
+        self.assertEqual(item.shash, self.SHASH)
+
+
+    def test_copy(self):
+        """Copying the item should not fetch any payload."""
+        item = _store.Item.from_manifest(self.MANIFEST, self.STORE)
+
+        copy = item.copy()
+        with self.subTest(test='chunks'):
+            for ck1, ck2 in zip(copy.chunks, item.chunks):
+                self.assertIs(ck1, ck2)
+
+        with self.subTest(test='fetched'):
+            self.assertEqual(self.STORE.fetched, 0)
@@ -18,17 +18,61 @@
 # You should have received a copy of the MIT License along with kado.
 # If not, see <http://opensource.org/licenses/MIT>.
 #
+import array
 import unittest
 
 from kado.store import mixin
 
 
+class HasID(mixin.HasID):
+    """Concrete :class:`kado.store.mixin.HasID` with its instance storage."""
+    __slots__ = ('_id', )
+
+
+class HasData(mixin.HasData):
+    """Concrete :class:`kado.store.mixin.HasData` with its instance storage."""
+    __slots__ = ('_data', '_shash', '_whash')
+
+
+class HasMetadata(mixin.HasMetadata):
+    """Concrete :class:`kado.store.mixin.HasMetadata` with its instance
+    storage.
+
+    """
+    __slots__ = ('_metadata', )
+
+
+class TestDigest(unittest.TestCase):
+    """Test case for :class:`kado.store.mixin.Digest`."""
+
+    def test_digest(self):
+        """The digest should be returned as plain bytes."""
+        d = mixin.Digest(b'\x01\x02')
+        self.assertEqual(d.digest(), b'\x01\x02')
+
+
+    def test_hexdigest(self):
+        """The hexadecimal digest should match the bytes value."""
+        d = mixin.Digest(b'\x01\x02')
+        self.assertEqual(d.hexdigest(), '0102')
+
+
+class TestSlots(unittest.TestCase):
+    """Mixins should not add any instance dictionary."""
+
+    def test_no_dict(self):
+        """Concrete classes should not carry a ``__dict__``."""
+        for obj in [HasID(), HasData(), HasMetadata()]:
+            with self.subTest(cls=type(obj).__name__):
+                self.assertFalse(hasattr(obj, '__dict__'))
+
+
 class TestHasID(unittest.TestCase):
     """Test case for :class:`kado.store.mixin.HasID`."""
 
     def test_id_read_only(self):
         """The `id` property should be read-only."""
-        _id = mixin.HasID()
+        _id = HasID()
         with self.assertRaises(AttributeError):
             _id.id = 'ID'
 
@@ -40,7 +84,7 @@ class TestHasData(unittest.TestCase):
         """Test data initialization with expected data type."""
         TEST_DATA = b'1'
 
-        d = mixin.HasData(data=TEST_DATA)
+        d = HasData(data=TEST_DATA)
         self.assertEqual(d.data, TEST_DATA)
 
 
@@ -48,7 +92,7 @@ class TestHasData(unittest.TestCase):
         """Initialization with parameters should be equivalent to ``b''``."""
         EMPTY_DATA = b''
 
-        d = mixin.HasData()
+        d = HasData()
         self.assertEqual(d.data, EMPTY_DATA)
 
 
@@ -57,7 +101,7 @@ class TestHasData(unittest.TestCase):
         TEST_DATA = None
 
         with self.assertRaises(TypeError):
-            mixin.HasData(data=TEST_DATA)
+            HasData(data=TEST_DATA)
 
 
     def test___init___type_error(self):
@@ -65,29 +109,29 @@ class TestHasData(unittest.TestCase):
         TEST_DATA = 1
 
         with self.assertRaises(TypeError):
-            mixin.HasData(data=TEST_DATA)
+            HasData(data=TEST_DATA)
 
 
     def test___eq___b1_equal(self):
         """Test equality of two objects carrying ``b'1'``."""
         TEST_DATA = b'1'
 
-        d0 = mixin.HasData(data=TEST_DATA)
-        d1 = mixin.HasData(data=TEST_DATA)
+        d0 = HasData(data=TEST_DATA)
+        d1 = HasData(data=TEST_DATA)
         self.assertEqual(d0, d1)
 
 
     def test___eq___not_equal(self):
         """Test inequality of two objects carrying different data."""
-        d0 = mixin.HasData(data=b'1')
-        d1 = mixin.HasData(data=b'2')
+        d0 = HasData(data=b'1')
+        d1 = HasData(data=b'2')
         self.assertNotEqual(d0, d1)
 
 
     def test___eq___empty_equal(self):
         """Test equality of two empty data."""
-        d0 = mixin.HasData()
-        d1 = mixin.HasData()
+        d0 = HasData()
+        d1 = HasData()
         self.assertEqual(d0, d1)
 
 
@@ -95,13 +139,13 @@ class TestHasData(unittest.TestCase):
         """Comparing with an object carrying ``b'1'`` with a bytes object."""
         TEST_DATA = b'1'
 
-        d = mixin.HasData(data=TEST_DATA)
+        d = HasData(data=TEST_DATA)
         self.assertEqual(d, TEST_DATA)
 
 
     def test___eq___invalid_type(self):
         """Comparing with an invalid type should raise a ``TypeError``."""
-        d = mixin.HasData(data=b'1')
+        d = HasData(data=b'1')
         with self.assertRaises(TypeError):
             self.assertEqual(d, 1)
 
@@ -110,13 +154,13 @@ class TestHasData(unittest.TestCase):
         """Test length of data ``b'1'``."""
         TEST_DATA = b'1'
 
-        d = mixin.HasData(data=TEST_DATA)
+        d = HasData(data=TEST_DATA)
         self.assertEqual(len(d), 1)
 
 
     def test___len___empty(self):
         """Test length of empty data."""
-        d = mixin.HasData()
+        d = HasData()
         self.assertEqual(len(d), 0)
 
 
@@ -124,7 +168,7 @@ class TestHasData(unittest.TestCase):
         """Test ``data`` property to return carried data."""
         TEST_DATA = b'1'
 
-        d = mixin.HasData(data=TEST_DATA)
+        d = HasData(data=TEST_DATA)
         self.assertEqual(d.data, TEST_DATA)
 
 
@@ -133,16 +177,54 @@ class TestHasData(unittest.TestCase):
         INIT_DATA = b'1'
         NEW_DATA = b'2'
 
-        d = mixin.HasData(data=INIT_DATA)
+        d = HasData(data=INIT_DATA)
         d.data = NEW_DATA
         self.assertEqual(d.data, NEW_DATA)
 
 
+    def test_data_set_bytearray(self):
+        """A ``bytearray`` should be accepted and stored as ``bytes``."""
+        TEST_DATA = bytearray(b'1')
+
+        d = HasData()
+        d.data = TEST_DATA
+        with self.subTest(test='data'):
+            self.assertEqual(d.data, b'1')
+
+        with self.subTest(test='type'):
+            self.assertIsInstance(d.data, bytes)
+
+
+    def test_data_set_bytearray_mutated(self):
+        """Changing a ``bytearray`` after it was set should not alter data."""
+        TEST_DATA = bytearray(b'1')
+
+        d = HasData(data=TEST_DATA)
+        TEST_DATA[0] = ord('2')
+        self.assertEqual(d.data, b'1')
+
+
+    def test_data_set_memoryview(self):
+        """A ``memoryview`` should be accepted as data."""
+        TEST_DATA = memoryview(b'0123')[1:3]
+
+        d = HasData(data=TEST_DATA)
+        self.assertEqual(d.data, b'12')
+
+
+    def test_data_set_buffer_format(self):
+        """Buffers of other formats than bytes should be stored as bytes."""
+        TEST_DATA = array.array('H', [1, 2, 3])
+
+        d = HasData(data=TEST_DATA)
+        self.assertEqual(d.data, TEST_DATA.tobytes())
+
+
     def test_data_set_none(self):
         """Set ``data`` property to ``None`` should raise a ``TypeError``."""
         TEST_DATA = None
 
-        d = mixin.HasData()
+        d = HasData()
         with self.assertRaises(TypeError):
             d.data = TEST_DATA
 
@@ -151,7 +233,7 @@ class TestHasData(unittest.TestCase):
         """Invalid data type should raise a ``TypeError``."""
         TEST_DATA = 1
 
-        d = mixin.HasData()
+        d = HasData()
         with self.assertRaises(TypeError):
             d.data = TEST_DATA
 
@@ -163,7 +245,7 @@ class TestHasData(unittest.TestCase):
             '14c1130ee81a12b55612ae6acfb29ae54d4dfa75f2551c55ccdaf1e14369d31e'
         )
 
-        d = mixin.HasData(data=TEST_DATA)
+        d = HasData(data=TEST_DATA)
         self.assertEqual(d.shash, SHASH_DATA)
 
 
@@ -174,7 +256,7 @@ class TestHasData(unittest.TestCase):
             'bc400036267d04573773bf75f69a253116d1e5b298e90fd6452787960870d8a9'
         )
 
-        d = mixin.HasData(data=TEST_DATA)
+        d = HasData(data=TEST_DATA)
         self.assertEqual(d.shash, SHASH_DATA)
 
 
@@ -190,19 +272,29 @@ class TestHasData(unittest.TestCase):
             'e4ec00adce69421f373573fe96da3b036a5530dc10983006bdcb6f910a0bd0c2'
         )
 
-        d = mixin.HasData(data=TEST_DATA1)
+        d = HasData(data=TEST_DATA1)
         self.assertEqual(d.shash, SHASH_DATA1)
 
         d.data = TEST_DATA2
         self.assertEqual(d.shash, SHASH_DATA2)
 
 
+    def test_shash_digest_only(self):
+        """Only the digest should be retained once data was hashed."""
+        d = HasData(data=b'1')
+        d.shash, d.whash
+
+        for h in [d._shash, d._whash]:
+            with self.subTest(digest=h):
+                self.assertIsInstance(h, mixin.Digest)
+
+
     def test_whash_b1(self):
         """Test weak hash value of data ``b'1'``."""
         TEST_DATA = b'1'
         WHASH_DATA = '66b3d38e379784f0'
 
-        d = mixin.HasData(data=TEST_DATA)
+        d = HasData(data=TEST_DATA)
         self.assertEqual(d.whash, WHASH_DATA)
 
 
@@ -211,7 +303,7 @@ class TestHasData(unittest.TestCase):
         TEST_DATA = b''
         WHASH_DATA = 'd7822edb70574ea2'
 
-        d = mixin.HasData(data=TEST_DATA)
+        d = HasData(data=TEST_DATA)
         self.assertEqual(d.whash, WHASH_DATA)
 
 
@@ -223,7 +315,7 @@ class TestHasData(unittest.TestCase):
         TEST_DATA2 = b'2'
         WHASH_DATA2 = 'a2c94a523dd3e9f6'
 
-        d = mixin.HasData(data=TEST_DATA1)
+        d = HasData(data=TEST_DATA1)
         self.assertEqual(d.whash, WHASH_DATA1)
 
         d.data = TEST_DATA2
@@ -235,14 +327,14 @@ class TestHasMetadata(unittest.TestCase):
 
     def test___setitem___typeerror(self):
         """A key type other than ``str`` should raise a ``TypeError``."""
-        m = mixin.HasMetadata()
+        m = HasMetadata()
         with self.assertRaises(TypeError):
             m[1] = '1'
 
 
     def test___setitem___valueerror(self):
         """A value type other than ``str`` should raise a ``TypeError``."""
-        m = mixin.HasMetadata()
+        m = HasMetadata()
         with self.assertRaises(ValueError):
             m['1'] = 1
 
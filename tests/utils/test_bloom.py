@@ -0,0 +1,102 @@
+# tests/utils/test_bloom.py
+# =========================
+#
+# Copying
+# -------
+#
+# Copyright (c) 2018 kado authors.
+#
+# This file is part of the *kado* project.
+#
+# kado is a free software project. You can redistribute it and/or
+# modify if under the terms of the MIT License.
+#
+# This software project is distributed *as is*, WITHOUT WARRANTY OF ANY
+# KIND; including but not limited to the WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE and NONINFRINGEMENT.
+#
+# You should have received a copy of the MIT License along with kado.
+# If not, see <http://opensource.org/licenses/MIT>.
+#
+import unittest
+
+from kado.utils import bloom
+
+
+class TestBloomFilter(unittest.TestCase):
+    """Test case for :class:`kado.utils.bloom.BloomFilter`."""
+
+    def setUp(self):
+        """Setup test cases for :class:`kado.utils.bloom.BloomFilter`."""
+        self.KEYS = [i.to_bytes(16, 'little') for i in range(1000)]
+        self.MISSING = [i.to_bytes(16, 'little') for i in range(1000, 11000)]
+
+        self.BF = bloom.BloomFilter(len(self.KEYS), 0.01)
+        for key in self.KEYS:
+            self.BF.add(key)
+
+
+    def test___init___valueerror(self):
+        """An error rate out of ``]0, 1[`` should raise ``ValueError``."""
+        for rate in [0, 1, -0.5]:
+            with self.subTest(error_rate=rate), self.assertRaises(ValueError):
+                bloom.BloomFilter(error_rate=rate)
+
+
+    def test___contains__(self):
+        """Added keys should always be found."""
+        for key in self.KEYS:
+            with self.subTest(key=key):
+                self.assertIn(key, self.BF)
+
+
+    def test___contains___error_rate(self):
+        """Missing keys should be found close to the error rate."""
+        found = sum(key in self.BF for key in self.MISSING)
+        self.assertLess(found / len(self.MISSING), 0.02)
+
+
+    def test___len__(self):
+        """The length should be close to the number of added keys."""
+        self.assertGreaterEqual(len(self.BF), 0.98 * len(self.KEYS))
+
+
+    def test_add_same_key(self):
+        """Adding a key already in the filter should not count it again."""
+        length = len(self.BF)
+
+        for key in self.KEYS:
+            with self.subTest(key=key):
+                self.assertFalse(self.BF.add(key))
+
+        self.assertEqual(len(self.BF), length)
+
+
+    def test_clear(self):
+        """Clear the filter."""
+        self.BF.clear()
+
+        with self.subTest(test='len'):
+            self.assertEqual(len(self.BF), 0)
+
+        with self.subTest(test='contains'):
+            self.assertNotIn(self.KEYS[0], self.BF)
+
+
+    def test_from_bytes(self):
+        """A serialized filter should be loaded back unchanged."""
+        bf = bloom.BloomFilter.from_bytes(self.BF.to_bytes())
+
+        with self.subTest(test='to_bytes'):
+            self.assertEqual(bf.to_bytes(), self.BF.to_bytes())
+
+        with self.subTest(test='contains'):
+            self.assertTrue(all(key in bf for key in self.KEYS))
+
+
+    def test_from_bytes_valueerror(self):
+        """Invalid serialized data should raise ``ValueError``."""
+        for data in [b'', self.BF.to_bytes()[:-1]]:
+            with self.subTest(length=len(data)):
+                with self.assertRaises(ValueError):
+                    bloom.BloomFilter.from_bytes(data)
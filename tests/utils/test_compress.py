@@ -0,0 +1,107 @@
+# tests/utils/test_compress.py
+# ============================
+#
+# Copying
+# -------
+#
+# Copyright (c) 2018 kado authors.
+#
+# This file is part of the *kado* project.
+#
+# kado is a free software project. You can redistribute it and/or
+# modify if under the terms of the MIT License.
+#
+# This software project is distributed *as is*, WITHOUT WARRANTY OF ANY
+# KIND; including but not limited to the WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE and NONINFRINGEMENT.
+#
+# You should have received a copy of the MIT License along with kado.
+# If not, see <http://opensource.org/licenses/MIT>.
+#
+import unittest
+import pkg_resources
+
+from unittest import mock
+
+from kado.utils import compress
+
+from tests.lib import constants as tc
+
+
+#: Compressible data.
+TEXT_DATA = b'kado is a free software project. ' * 256
+
+
+class TestCompress(unittest.TestCase):
+    """Test case for :func:`kado.utils.compress.compress`."""
+
+    def test_compress_roundtrip(self):
+        """Compressed data should be decompressed back unchanged."""
+        for codec in [compress.NONE, compress.ZLIB, compress.LZMA]:
+            with self.subTest(codec=codec):
+                self.assertEqual(
+                    compress.decompress(
+                        compress.compress(TEXT_DATA, codec), codec
+                    ),
+                    TEXT_DATA
+                )
+
+
+    def test_compress_unavailable(self):
+        """Unknown or missing codecs should raise ``ValueError``."""
+        with mock.patch.object(compress, 'zstandard', None):
+            for codec in [compress.ZSTD, 42]:
+                with self.subTest(codec=codec):
+                    with self.assertRaises(ValueError):
+                        compress.compress(TEXT_DATA, codec)
+
+
+class TestProbe(unittest.TestCase):
+    """Test case for :func:`kado.utils.compress.probe`."""
+
+    def test_probe_text(self):
+        """Text data should be deemed compressible."""
+        self.assertTrue(compress.probe(TEXT_DATA))
+
+
+    def test_probe_data(self):
+        """Random data should be deemed incompressible, zeros compressible."""
+        for name in tc.DATA_CHUNKS_KADO:
+            with pkg_resources.resource_stream('tests.lib', name) as fp:
+                data = fp.read()
+
+            with self.subTest(file=name):
+                self.assertEqual(
+                    compress.probe(data), name.startswith('data/zero')
+                )
+
+
+    def test_probe_small(self):
+        """Small data should not be compressed."""
+        self.assertFalse(compress.probe(b'a' * (compress.MIN_SIZE - 1)))
+
+
+class TestPack(unittest.TestCase):
+    """Test case for :func:`kado.utils.compress.pack`."""
+
+    def test_pack_compressible(self):
+        """Compressible data should be compressed."""
+        codec, data = compress.pack(TEXT_DATA, compress.ZLIB)
+
+        with self.subTest(test='codec'):
+            self.assertEqual(codec, compress.ZLIB)
+
+        with self.subTest(test='data'):
+            self.assertLess(len(data), len(TEXT_DATA))
+
+
+    def test_pack_incompressible(self):
+        """Incompressible data should be kept as is."""
+        with pkg_resources.resource_stream(
+                'tests.lib', 'data/rand64kb.bin'
+        ) as fp:
+            data = fp.read()
+
+        self.assertEqual(
+            compress.pack(data, compress.LZMA), (compress.NONE, data)
+        )
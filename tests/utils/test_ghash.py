@@ -18,6 +18,7 @@
 # You should have received a copy of the MIT License along with kado.
 # If not, see <http://opensource.org/licenses/MIT>.
 #
+import io
 import unittest
 import pkg_resources
 
@@ -188,3 +189,85 @@ class TestRead(unittest.TestCase):
 
             with self.subTest(file=name):
                 self.assertEqual(chop, read)
+
+
+class ShortReader(io.RawIOBase):
+    """Raw stream returning at most ``size`` bytes per read."""
+
+    def __init__(self, data, size, blocking=True):
+        self.data = io.BytesIO(data)
+        self.size = size
+        self.blocking = blocking
+
+
+    def readable(self):
+        return True
+
+
+    def readinto(self, b):
+        if not self.blocking:
+            return None
+
+        data = self.data.read(min(len(b), self.size))
+        b[:len(data)] = data
+        return len(data)
+
+
+class TestStream(unittest.TestCase):
+    """Test case for :func:`kado.utils.ghash.stream`."""
+
+    def test_stream_eq_chop(self):
+        """``stream`` and ``chop`` should return the exact same data."""
+        for name in tc.DATA_CHUNKS_SHA256:
+            with pkg_resources.resource_stream('tests.lib', name) as fp:
+                content = fp.read()
+
+            chop = [
+                (start, end, hashlib.sha256(data).hexdigest())
+                for start, end, data in ghash.chop(content)
+            ]
+
+            stream = [
+                (start, end, hashlib.sha256(data).hexdigest())
+                for start, end, data in ghash.stream(io.BytesIO(content))
+            ]
+
+            with self.subTest(file=name):
+                self.assertEqual(chop, stream)
+
+
+    def test_stream_empty(self):
+        """An empty stream should not give any chunk."""
+        self.assertEqual(list(ghash.stream(io.BytesIO())), [])
+
+
+    def test_stream_short_reads(self):
+        """Short reads should not change the chunks."""
+        for name in tc.DATA_CHUNKS_SHA256:
+            with pkg_resources.resource_stream('tests.lib', name) as fp:
+                content = fp.read()
+
+            chop = [
+                (start, end, hashlib.sha256(data).hexdigest())
+                for start, end, data in ghash.chop(content)
+            ]
+
+            for size in [1000, 5000]:
+                stream = [
+                    (start, end, hashlib.sha256(data).hexdigest())
+                    for start, end, data in ghash.stream(
+                        ShortReader(content, size)
+                    )
+                ]
+
+                with self.subTest(file=name, size=size):
+                    self.assertEqual(chop, stream)
+
+
+    def test_stream_blockingioerror(self):
+        """A non-blocking stream without data should raise
+        ``BlockingIOError``.
+
+        """
+        with self.assertRaises(BlockingIOError):
+            list(ghash.stream(ShortReader(b'data', 1, blocking=False)))